@@ -1,6 +1,15 @@
 from fastapi import APIRouter
 
-from app.api.v1.endpoints import auth, users, vehicles, maintenance, sms, admin
+from app.api.v1.endpoints import (
+    auth,
+    users,
+    vehicles,
+    maintenance,
+    dashboard,
+    batch,
+    sms,
+    admin,
+)
 
 api_router = APIRouter()
 api_router.include_router(auth.router, prefix="/auth", tags=["authentication"])
@@ -9,5 +18,7 @@ api_router.include_router(vehicles.router, prefix="/vehicles", tags=["vehicles"]
 api_router.include_router(
     maintenance.router, prefix="/maintenance", tags=["maintenance"]
 )
+api_router.include_router(dashboard.router, prefix="/dashboard", tags=["dashboard"])
+api_router.include_router(batch.router, prefix="/batch", tags=["batch"])
 api_router.include_router(sms.router, prefix="/sms", tags=["sms"])
 api_router.include_router(admin.router, prefix="/admin", tags=["admin"])
@@ -1,24 +1,33 @@
-from fastapi import APIRouter, HTTPException, Depends
-from typing import List
-from app.utils.deps import get_current_user
-from app.models.user import User, UserWithVehicleCount
+from fastapi import APIRouter, HTTPException, Depends, Query
+from typing import List, Optional
+from app.utils.deps import get_current_principal
+from app.models.user import TokenUser, UserWithVehicleCount
 from app.models.recommendation import ClaudeAPILog
+from app.core.metrics import metrics_registry
+from app.core.responses import ResponseSerializer
+from app.core.security import password_hasher
+from app.services.carapi_service import carapi_service
+from app.services.catalog_snapshot import catalog_snapshot_store
 from app.services.neo4j_service import neo4j_service
+from app.services.user_cache import user_cache
 from app.cron_scheduler import run_manual_reminder_check
 import logging
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
+user_list_serializer = ResponseSerializer(List[UserWithVehicleCount])
+claude_log_list_serializer = ResponseSerializer(List[ClaudeAPILog])
+
 
 @router.post("/trigger-reminders")
-async def trigger_reminders(current_user: User = Depends(get_current_user)):
+async def trigger_reminders(current_user: TokenUser = Depends(get_current_principal)):
     """
     Manually trigger the reminder check process.
     Only accessible to authenticated users for testing purposes.
     """
     try:
-        logger.info(f"User {current_user.id} triggered manual reminder check")
+        logger.info("User %s triggered manual reminder check", current_user.id)
         sms_count, maintenance_count = await run_manual_reminder_check()
 
         return {
@@ -29,13 +38,15 @@ async def trigger_reminders(current_user: User = Depends(get_current_user)):
         }
 
     except Exception as e:
-        logger.error(f"Error triggering reminders: {e}")
+        logger.error("Error triggering reminders: %s", e)
         raise HTTPException(
             status_code=500, detail=f"Failed to trigger reminders: {str(e)}"
         )
 
 
-def check_admin_role(current_user: User = Depends(get_current_user)) -> User:
+def check_admin_role(
+    current_user: TokenUser = Depends(get_current_principal),
+) -> TokenUser:
     """Check if the current user has admin role"""
     if current_user.role != "admin":
         raise HTTPException(
@@ -45,13 +56,13 @@ def check_admin_role(current_user: User = Depends(get_current_user)) -> User:
 
 
 @router.get("/users", response_model=List[UserWithVehicleCount])
-async def list_users(current_admin: User = Depends(check_admin_role)):
+async def list_users(current_admin: TokenUser = Depends(check_admin_role)):
     """
     Get all users with their vehicle counts.
     Only accessible to admin users.
     """
     try:
-        logger.info(f"Admin {current_admin.id} listing all users")
+        logger.info("Admin %s listing all users", current_admin.id)
         users_data = await neo4j_service.get_all_users_with_vehicle_count()
 
         # Convert to UserWithVehicleCount objects
@@ -59,10 +70,11 @@ async def list_users(current_admin: User = Depends(check_admin_role)):
         for user_data in users_data:
             users.append(UserWithVehicleCount(**user_data))
 
-        return users
+        # Already validated above; skip response_model re-validation
+        return user_list_serializer.response(users)
 
     except Exception as e:
-        logger.error(f"Error listing users: {e}")
+        logger.error("Error listing users: %s", e)
         raise HTTPException(
             status_code=500, detail=f"Failed to retrieve users: {str(e)}"
         )
@@ -70,19 +82,74 @@ async def list_users(current_admin: User = Depends(check_admin_role)):
 
 @router.get("/claude-logs", response_model=List[ClaudeAPILog])
 async def get_claude_logs(
-    limit: int = 100, current_admin: User = Depends(check_admin_role)
+    limit: int = 100, current_admin: TokenUser = Depends(check_admin_role)
 ):
     """
     Get Claude API logs.
     Only accessible to admin users.
     """
     try:
-        logger.info(f"Admin {current_admin.id} retrieving Claude API logs")
+        logger.info("Admin %s retrieving Claude API logs", current_admin.id)
         logs = await neo4j_service.get_claude_api_logs(limit=limit)
-        return logs
+        return claude_log_list_serializer.response(logs)
 
     except Exception as e:
-        logger.error(f"Error retrieving Claude logs: {e}")
+        logger.error("Error retrieving Claude logs: %s", e)
         raise HTTPException(
             status_code=500, detail=f"Failed to retrieve Claude logs: {str(e)}"
         )
+
+
+@router.get("/user-cache")
+async def get_user_cache_stats(current_admin: TokenUser = Depends(check_admin_role)):
+    """
+    Get hit/miss metrics for the authenticated-user cache.
+    Only accessible to admin users.
+    """
+    return user_cache.stats()
+
+
+@router.get("/password-hasher")
+async def get_password_hasher_stats(
+    current_admin: TokenUser = Depends(check_admin_role),
+):
+    """
+    Get queue and concurrency metrics for the password hashing pool.
+    Only accessible to admin users.
+    """
+    return password_hasher.stats()
+
+
+@router.get("/latency")
+async def get_latency_summary(current_admin: TokenUser = Depends(check_admin_role)):
+    """
+    Get p50/p99 request latency per route template.
+    Only accessible to admin users.
+    """
+    return metrics_registry.latency_summary()
+
+
+@router.post("/catalog-snapshot", status_code=202)
+async def rebuild_catalog_snapshot(
+    years: Optional[List[int]] = Query(None),
+    current_admin: TokenUser = Depends(check_admin_role),
+):
+    """
+    Start rebuilding the offline vehicle catalog snapshot from CarAPI
+    (all years unless `years` is given). Runs in the background.
+    Only accessible to admin users.
+    """
+    logger.info("Admin %s started a catalog snapshot rebuild", current_admin.id)
+    started = catalog_snapshot_store.start_rebuild(carapi_service, years)
+    return {"started": started, **catalog_snapshot_store.status()}
+
+
+@router.get("/catalog-snapshot")
+async def get_catalog_snapshot_status(
+    current_admin: TokenUser = Depends(check_admin_role),
+):
+    """
+    Get size, build time and rebuild state of the catalog snapshot.
+    Only accessible to admin users.
+    """
+    return catalog_snapshot_store.status()
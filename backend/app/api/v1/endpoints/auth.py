@@ -2,22 +2,30 @@ import logging
 from datetime import datetime, timedelta
 from typing import Any
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordRequestForm
 from pydantic import ValidationError
 
 from app.core import security
 from app.core.config import settings
-from app.models.user import UserCreate, User
+from app.core.rate_limit import login_rate_limiter, registration_rate_limiter
+from app.models.user import RefreshTokenRequest, UserCreate, User
 from app.services.neo4j_service import neo4j_service
+from app.services.write_behind import timestamp_write_buffer
+from app.utils.deps import decode_token, enforce_rate_limit
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
 
 @router.post("/login", response_model=dict)
-async def login(form_data: OAuth2PasswordRequestForm = Depends()) -> Any:
+async def login(
+    request: Request, form_data: OAuth2PasswordRequestForm = Depends()
+) -> Any:
     """Authenticate user and return access token"""
+    # Throttle before bcrypt or the database are touched
+    await enforce_rate_limit(login_rate_limiter, request, form_data.username)
+
     user = await neo4j_service.authenticate_user(form_data.username, form_data.password)
     if not user:
         raise HTTPException(
@@ -26,26 +34,79 @@ async def login(form_data: OAuth2PasswordRequestForm = Depends()) -> Any:
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    # Update last_login timestamp
-    try:
-        await neo4j_service.update_user(user.id, {"last_login": datetime.utcnow()})
-    except Exception as e:
-        logger.warning(f"Failed to update last_login for user {user.id}: {e}")
-        # Continue login process even if last_login update fails
+    # Update last_login timestamp; written in the next write-behind batch
+    timestamp_write_buffer.record(user.id, "last_login", datetime.utcnow())
+
+    return _issue_tokens(user)
+
 
-    access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+def _issue_tokens(user: Any) -> dict:
+    """Build the token response for an authenticated user"""
+    if not settings.AUTH_STATELESS_TOKENS:
+        access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+        return {
+            "access_token": security.create_access_token(
+                user.email, expires_delta=access_token_expires
+            ),
+            "token_type": "bearer",
+        }
+
+    access_token_expires = timedelta(
+        minutes=settings.STATELESS_ACCESS_TOKEN_EXPIRE_MINUTES
+    )
     return {
         "access_token": security.create_access_token(
-            user.email, expires_delta=access_token_expires
+            user.email,
+            expires_delta=access_token_expires,
+            claims=security.user_token_claims(user),
         ),
+        "refresh_token": security.create_refresh_token(user.email, user.id),
         "token_type": "bearer",
+        "expires_in": int(access_token_expires.total_seconds()),
     }
 
 
+@router.post("/refresh", response_model=dict)
+async def refresh_access_token(token_request: RefreshTokenRequest) -> Any:
+    """Exchange a refresh token for a new access/refresh token pair"""
+    if not settings.AUTH_STATELESS_TOKENS:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Refresh tokens are not enabled",
+        )
+
+    payload = decode_token(
+        token_request.refresh_token, token_type=security.REFRESH_TOKEN_TYPE
+    )
+
+    # Claims are re-read from the database so role/status changes take effect
+    user = await neo4j_service.get_user_by_email(payload["sub"])
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Could not validate credentials",
+        )
+
+    # Rotate: the presented refresh token can only be used once
+    security.token_revocation_list.revoke(payload["jti"], float(payload["exp"]))
+    return _issue_tokens(user)
+
+
+@router.post("/logout")
+async def logout(token_request: RefreshTokenRequest) -> Any:
+    """Revoke a refresh token"""
+    payload = decode_token(
+        token_request.refresh_token, token_type=security.REFRESH_TOKEN_TYPE
+    )
+    security.token_revocation_list.revoke(payload["jti"], float(payload["exp"]))
+    return {"message": "Successfully logged out"}
+
+
 @router.post("/register", response_model=User)
-async def register(user_data: UserCreate) -> Any:
+async def register(request: Request, user_data: UserCreate) -> Any:
     """Register a new user"""
-    logger.info(f"Registration attempt for email: {user_data.email}")
+    await enforce_rate_limit(registration_rate_limiter, request, user_data.email)
+    logger.info("Registration attempt for email: %s", user_data.email)
 
     # Validate user data explicitly (FastAPI should handle this, but let's be explicit)
     try:
@@ -59,7 +120,7 @@ async def register(user_data: UserCreate) -> Any:
 
         if not user_data.password or len(user_data.password) < 1:
             logger.warning(
-                f"Registration failed: Empty password for email {user_data.email}"
+                "Registration failed: Empty password for email %s", user_data.email
             )
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -68,7 +129,7 @@ async def register(user_data: UserCreate) -> Any:
 
         if len(user_data.password) < 6:
             logger.warning(
-                f"Registration failed: Password too short for email {user_data.email}"
+                "Registration failed: Password too short for email %s", user_data.email
             )
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -76,7 +137,9 @@ async def register(user_data: UserCreate) -> Any:
             )
 
     except ValidationError as e:
-        logger.error(f"Validation error during registration for {user_data.email}: {e}")
+        logger.error(
+            "Validation error during registration for %s: %s", user_data.email, e
+        )
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Validation error: {str(e)}",
@@ -87,7 +150,7 @@ async def register(user_data: UserCreate) -> Any:
         existing_user = await neo4j_service.get_user_by_email(user_data.email)
         if existing_user:
             logger.warning(
-                f"Registration failed: Email {user_data.email} already registered"
+                "Registration failed: Email %s already registered", user_data.email
             )
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -98,7 +161,7 @@ async def register(user_data: UserCreate) -> Any:
         raise
     except Exception as e:
         logger.error(
-            f"Database error checking existing user for {user_data.email}: {e}"
+            "Database error checking existing user for %s: %s", user_data.email, e
         )
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -107,9 +170,9 @@ async def register(user_data: UserCreate) -> Any:
 
     # Create the user
     try:
-        logger.info(f"Creating user for email: {user_data.email}")
+        logger.info("Creating user for email: %s", user_data.email)
         user_in_db = await neo4j_service.create_user(user_data)
-        logger.info(f"User created successfully with ID: {user_in_db.id}")
+        logger.info("User created successfully with ID: %s", user_in_db.id)
 
         # Return user without password
         return User(
@@ -131,7 +194,7 @@ async def register(user_data: UserCreate) -> Any:
         # Re-raise HTTP exceptions without modification
         raise
     except Exception as e:
-        logger.error(f"Failed to create user for {user_data.email}: {e}")
+        logger.error("Failed to create user for %s: %s", user_data.email, e)
         # Check if it's a database constraint error (like unique constraint violation)
         error_str = str(e).lower()
         if (
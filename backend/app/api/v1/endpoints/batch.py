@@ -0,0 +1,217 @@
+import re
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.encoders import jsonable_encoder
+from pydantic import ValidationError
+
+from app.api.v1.endpoints import maintenance, users, vehicles
+from app.core.config import settings
+from app.models.batch import (
+    BatchOperation,
+    BatchOperationResult,
+    BatchRequest,
+    BatchResponse,
+)
+from app.models.maintenance import MaintenanceCreate
+from app.models.user import TokenUser, User, UserUpdate
+from app.models.vehicle import VehicleCreate, VehicleUpdate
+from app.services.neo4j_service import neo4j_service
+from app.utils.deps import get_current_principal
+
+router = APIRouter()
+
+
+class _BatchContext:
+    """Auth state shared by every operation in one batch"""
+
+    def __init__(self, principal: TokenUser):
+        self.principal = principal
+        self._user: Optional[User] = None
+
+    async def user(self) -> User:
+        # Only profile operations need the full user; load it once, on demand
+        if self._user is None:
+            self._user = await neo4j_service.get_user_by_id(self.principal.id)
+            if self._user is None:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
+                )
+        return self._user
+
+    def replace_user(self, user: User) -> None:
+        self._user = user
+
+
+Handler = Callable[..., Awaitable[Any]]
+
+
+async def _read_vehicle(ctx: _BatchContext, body: Any, vehicle_id: str) -> Any:
+    return await vehicles.read_vehicle(vehicle_id, ctx.principal)
+
+
+async def _create_vehicle(ctx: _BatchContext, body: Any) -> Any:
+    return await vehicles.create_vehicle(
+        VehicleCreate.model_validate(body or {}), ctx.principal
+    )
+
+
+async def _update_vehicle(ctx: _BatchContext, body: Any, vehicle_id: str) -> Any:
+    return await vehicles.update_vehicle(
+        vehicle_id, VehicleUpdate.model_validate(body or {}), ctx.principal
+    )
+
+
+async def _delete_vehicle(ctx: _BatchContext, body: Any, vehicle_id: str) -> Any:
+    return await vehicles.delete_vehicle(vehicle_id, ctx.principal)
+
+
+async def _create_maintenance_record(ctx: _BatchContext, body: Any) -> Any:
+    return await maintenance.create_maintenance_record(
+        MaintenanceCreate.model_validate(body or {}), ctx.principal
+    )
+
+
+async def _read_user_me(ctx: _BatchContext, body: Any) -> Any:
+    return await ctx.user()
+
+
+async def _update_user_me(ctx: _BatchContext, body: Any) -> Any:
+    updated = await users.update_user_me(
+        UserUpdate.model_validate(body or {}), await ctx.user()
+    )
+    ctx.replace_user(updated)
+    return updated
+
+
+async def _sms_opt_out(ctx: _BatchContext, body: Any) -> Any:
+    return await users.sms_opt_out(await ctx.user())
+
+
+async def _sms_opt_in(ctx: _BatchContext, body: Any) -> Any:
+    return await users.sms_opt_in(await ctx.user())
+
+
+# (method, path pattern, handler); path parameters become keyword arguments
+_ROUTES: List[Tuple[str, "re.Pattern[str]", Handler]] = [
+    (method, re.compile(pattern), handler)
+    for method, pattern, handler in [
+        ("POST", r"/vehicles", _create_vehicle),
+        ("GET", r"/vehicles/(?P<vehicle_id>[^/]+)", _read_vehicle),
+        ("PUT", r"/vehicles/(?P<vehicle_id>[^/]+)", _update_vehicle),
+        ("DELETE", r"/vehicles/(?P<vehicle_id>[^/]+)", _delete_vehicle),
+        ("POST", r"/maintenance/records", _create_maintenance_record),
+        ("GET", r"/users/me", _read_user_me),
+        ("PUT", r"/users/me", _update_user_me),
+        ("POST", r"/users/me/sms-opt-out", _sms_opt_out),
+        ("POST", r"/users/me/sms-opt-in", _sms_opt_in),
+    ]
+]
+
+
+def _resolve(operation: BatchOperation) -> Tuple[Handler, Dict[str, str]]:
+    path = operation.path.split("?", 1)[0]
+    if path.startswith(settings.API_V1_STR):
+        path = path[len(settings.API_V1_STR) :]
+    path = "/" + path.strip("/")
+
+    for method, pattern, handler in _ROUTES:
+        match = pattern.fullmatch(path)
+        if match and method == operation.method:
+            return handler, match.groupdict()
+    raise HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND,
+        detail=f"Operation not supported in a batch: {operation.method} {path}",
+    )
+
+
+async def _execute(
+    ctx: _BatchContext, operation: BatchOperation
+) -> BatchOperationResult:
+    try:
+        handler, params = _resolve(operation)
+        body = await handler(ctx, operation.body, **params)
+        return BatchOperationResult(
+            ref=operation.ref, status=status.HTTP_200_OK, body=jsonable_encoder(body)
+        )
+    except HTTPException as e:
+        return BatchOperationResult(
+            ref=operation.ref, status=e.status_code, body={"detail": e.detail}
+        )
+    except ValidationError as e:
+        return BatchOperationResult(
+            ref=operation.ref,
+            status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            body={"detail": jsonable_encoder(e.errors())},
+        )
+
+
+class _BatchAborted(Exception):
+    """Raised inside the transaction to roll back an atomic batch"""
+
+
+async def _run_atomic(
+    ctx: _BatchContext, operations: List[BatchOperation]
+) -> BatchResponse:
+    """All operations in one transaction; the first failure rolls back the
+    batch and the rest are reported as not executed"""
+    results: List[BatchOperationResult] = []
+    try:
+        with neo4j_service.transaction():
+            for operation in operations:
+                result = await _execute(ctx, operation)
+                results.append(result)
+                if result.status >= 400:
+                    raise _BatchAborted()
+    except _BatchAborted:
+        results.extend(
+            BatchOperationResult(
+                ref=operation.ref,
+                status=status.HTTP_424_FAILED_DEPENDENCY,
+                body={"detail": "Not executed: an earlier operation failed"},
+            )
+            for operation in operations[len(results) :]
+        )
+        return BatchResponse(results=results, committed=False)
+    return BatchResponse(results=results, committed=True)
+
+
+async def _run_each(
+    ctx: _BatchContext, operations: List[BatchOperation]
+) -> BatchResponse:
+    """One transaction per operation; a failed one rolls back only itself"""
+    results: List[BatchOperationResult] = []
+    for operation in operations:
+        try:
+            with neo4j_service.transaction():
+                result = await _execute(ctx, operation)
+                if result.status >= 400:
+                    raise _BatchAborted()
+        except _BatchAborted:
+            pass
+        results.append(result)
+    return BatchResponse(results=results, committed=True)
+
+
+@router.post("", response_model=BatchResponse)
+async def run_batch(
+    batch: BatchRequest, current_user: TokenUser = Depends(get_current_principal)
+) -> Any:
+    """Run an ordered list of vehicle/maintenance/profile operations under one
+    authentication, in one transaction (atomic) or one transaction each"""
+    if len(batch.operations) > settings.BATCH_MAX_OPERATIONS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"A batch may contain at most {settings.BATCH_MAX_OPERATIONS} "
+            "operations",
+        )
+
+    ctx = _BatchContext(current_user)
+    run = _run_atomic if batch.atomic else _run_each
+    try:
+        return await run(ctx, batch.operations)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to run batch: {str(e)}",
+        )
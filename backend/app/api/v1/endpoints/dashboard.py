@@ -0,0 +1,37 @@
+from typing import Any
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+
+from app.models.dashboard import Dashboard
+from app.models.user import TokenUser
+from app.services.neo4j_service import neo4j_service
+from app.utils.deps import get_current_principal
+from app.utils.etag import etag_matches, make_etag, not_modified, set_etag
+
+router = APIRouter()
+
+
+@router.get("", response_model=Dashboard)
+async def read_dashboard(
+    request: Request,
+    response: Response,
+    recent_records: int = Query(3, ge=0, le=20),
+    current_user: TokenUser = Depends(get_current_principal),
+) -> Any:
+    """Get vehicles, recent maintenance, spend and recommendation status in one call"""
+    try:
+        # The user's version is bumped by every vehicle, maintenance and
+        # recommendation write, so it covers everything on the dashboard
+        version = await neo4j_service.get_user_data_version(current_user.id)
+        etag = make_etag("dashboard", current_user.id, version, recent_records)
+        if etag_matches(request, etag):
+            return not_modified(etag)
+
+        dashboard = await neo4j_service.get_dashboard(current_user.id, recent_records)
+        set_etag(response, etag)
+        return dashboard
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to load dashboard: {str(e)}",
+        )
@@ -1,37 +1,73 @@
-from typing import Any, List
+from typing import Any, List, Optional
 import uuid
 from datetime import datetime
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
 
+from app.core.responses import FastJSONResponse, ResponseSerializer
 from app.models.maintenance import (
     Maintenance,
     MaintenanceCreate,
     MaintenanceUpdate,
     MaintenanceSchedule,
 )
-from app.models.user import User
+from app.models.user import TokenUser
 from app.services.neo4j_service import neo4j_service
-from app.utils.deps import get_current_user
+from app.utils.deps import get_current_principal
+from app.utils.etag import etag_matches, make_etag, not_modified, set_etag
+from app.utils.fields import fields_etag_part, parse_fields
 
 router = APIRouter()
 
+maintenance_list_serializer = ResponseSerializer(List[Maintenance])
+
+MAINTENANCE_FIELDS = list(Maintenance.model_fields)
+
 
 @router.get("/records/{vehicle_id}", response_model=List[Maintenance])
 async def read_maintenance_records(
-    vehicle_id: str, current_user: User = Depends(get_current_user)
+    vehicle_id: str,
+    request: Request,
+    fields: Optional[str] = Query(
+        None, description="Comma-separated record fields to return (id is implied)"
+    ),
+    current_user: TokenUser = Depends(get_current_principal),
 ) -> Any:
     """Get all maintenance records for a vehicle"""
+    selected = parse_fields(fields, MAINTENANCE_FIELDS)
     try:
-        # Verify user owns the vehicle
-        vehicles = await neo4j_service.get_user_vehicles(current_user.id)
-        if not any(v.id == vehicle_id for v in vehicles):
+        # Verify user owns the vehicle and get its version in one lookup
+        version = await neo4j_service.get_vehicle_data_version(
+            vehicle_id, current_user.id
+        )
+        if version is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND, detail="Vehicle not found"
             )
 
+        etag = make_etag(
+            "maintenance",
+            vehicle_id,
+            version,
+            fields_etag_part(selected),
+        )
+        if etag_matches(request, etag):
+            return not_modified(etag)
+
+        if selected:
+            # Sparse fieldset: only the requested properties leave Neo4j
+            rows = await neo4j_service.get_maintenance_record_fields(
+                vehicle_id, selected
+            )
+            sparse_response = FastJSONResponse(rows)
+            set_etag(sparse_response, etag)
+            return sparse_response
+
         records = await neo4j_service.get_maintenance_records(vehicle_id)
-        return records
+        # Records were validated when loaded; skip response_model re-validation
+        trusted_response = maintenance_list_serializer.response(records)
+        set_etag(trusted_response, etag)
+        return trusted_response
     except HTTPException:
         raise
     except Exception as e:
@@ -43,7 +79,7 @@ async def read_maintenance_records(
 
 @router.post("/records", response_model=Maintenance)
 async def create_maintenance_record(
-    record: MaintenanceCreate, current_user: User = Depends(get_current_user)
+    record: MaintenanceCreate, current_user: TokenUser = Depends(get_current_principal)
 ) -> Any:
     """Create a new maintenance record"""
     try:
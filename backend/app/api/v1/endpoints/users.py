@@ -1,10 +1,13 @@
-from typing import Any
+from datetime import datetime
+from typing import Any, Literal
 
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
 
-from app.models.user import User, UserUpdate
+from app.models.user import TokenUser, User, UserUpdate
+from app.services.export_service import export_service
 from app.services.neo4j_service import neo4j_service
-from app.utils.deps import get_current_user
+from app.utils.deps import get_current_principal, get_current_user
 
 router = APIRouter()
 
@@ -39,6 +42,29 @@ async def update_user_me(
     return updated_user
 
 
+@router.get("/me/export")
+async def export_user_me(
+    format: Literal["ndjson", "csv"] = "ndjson",
+    current_user: TokenUser = Depends(get_current_principal),
+) -> Any:
+    """Stream all vehicles, maintenance records and recommendations of the current user"""
+    filename = f"carlog-export-{datetime.utcnow():%Y%m%d}.{format}"
+    headers = {"Content-Disposition": f'attachment; filename="{filename}"'}
+
+    if format == "csv":
+        return StreamingResponse(
+            export_service.stream_csv(current_user.id),
+            media_type="text/csv",
+            headers=headers,
+        )
+
+    return StreamingResponse(
+        export_service.stream_ndjson(current_user.id),
+        media_type="application/x-ndjson",
+        headers=headers,
+    )
+
+
 @router.delete("/me")
 async def delete_user_me(current_user: User = Depends(get_current_user)) -> Any:
     """Delete current user account"""
@@ -1,23 +1,82 @@
-from typing import Any, List
+import asyncio
+import math
+import re
+from typing import Any, List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import (
+    APIRouter,
+    Depends,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    status,
+)
 
-from app.models.vehicle import Vehicle, VehicleCreate, VehicleUpdate
-from app.models.user import User
+from app.core.config import settings
+from app.core.responses import FastJSONResponse, ResponseSerializer
+from app.models.vehicle import (
+    Vehicle,
+    VehicleCreate,
+    VehicleUpdate,
+    VinDecode,
+    VinDecodeBatchRequest,
+    VinDecodeResult,
+)
+from app.models.user import TokenUser
 from app.services.neo4j_service import neo4j_service
-from app.services.carapi_service import carapi_service
-from app.services.claude_service import claude_service
-from app.utils.deps import get_current_user
+from app.services.carapi_service import CarAPIError, carapi_service
+from app.services.catalog_snapshot import catalog_snapshot_store
+from app.services.claude_service import ClaudeRateLimitError, claude_service
+from app.services.vehicle_normalizer import vehicle_normalizer
+from app.utils.circuit_breaker import CircuitOpenError
+from app.utils.deps import get_current_principal
+from app.utils.etag import etag_matches, make_etag, not_modified, set_etag
+from app.utils.fields import fields_etag_part, parse_fields
+from app.utils.concurrency_limiter import QueueFullError
 
 router = APIRouter()
 
+vehicle_list_serializer = ResponseSerializer(List[Vehicle])
+
+VEHICLE_FIELDS = list(Vehicle.model_fields)
+
 
 @router.get("/", response_model=List[Vehicle])
-async def read_vehicles(current_user: User = Depends(get_current_user)) -> Any:
+async def read_vehicles(
+    request: Request,
+    fields: Optional[str] = Query(
+        None, description="Comma-separated vehicle fields to return (id is implied)"
+    ),
+    current_user: TokenUser = Depends(get_current_principal),
+) -> Any:
     """Get all vehicles for the current user"""
+    selected = parse_fields(fields, VEHICLE_FIELDS)
     try:
+        version = await neo4j_service.get_user_data_version(current_user.id)
+        etag = make_etag(
+            "vehicles",
+            current_user.id,
+            version,
+            fields_etag_part(selected),
+        )
+        if etag_matches(request, etag):
+            return not_modified(etag)
+
+        if selected:
+            # Sparse fieldset: only the requested properties leave Neo4j
+            rows = await neo4j_service.get_user_vehicle_fields(
+                current_user.id, selected
+            )
+            sparse_response = FastJSONResponse(rows)
+            set_etag(sparse_response, etag)
+            return sparse_response
+
         vehicles = await neo4j_service.get_user_vehicles(current_user.id)
-        return vehicles
+        # Vehicles were validated when loaded; skip response_model re-validation
+        trusted_response = vehicle_list_serializer.response(vehicles)
+        set_etag(trusted_response, etag)
+        return trusted_response
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -27,10 +86,16 @@ async def read_vehicles(current_user: User = Depends(get_current_user)) -> Any:
 
 @router.post("/", response_model=Vehicle)
 async def create_vehicle(
-    vehicle: VehicleCreate, current_user: User = Depends(get_current_user)
+    vehicle: VehicleCreate, current_user: TokenUser = Depends(get_current_principal)
 ) -> Any:
     """Create a new vehicle for the current user"""
     try:
+        # Free-text brand/model ("chevy") -> canonical names and CarAPI ids
+        vehicle = vehicle.model_copy(
+            update=vehicle_normalizer.normalize(
+                vehicle.model_dump(include={"brand", "brand_id", "model", "model_id"})
+            )
+        )
         new_vehicle = await neo4j_service.create_vehicle(current_user.id, vehicle)
         return new_vehicle
     except Exception as e:
@@ -42,7 +107,7 @@ async def create_vehicle(
 
 @router.get("/{vehicle_id}", response_model=Vehicle)
 async def read_vehicle(
-    vehicle_id: str, current_user: User = Depends(get_current_user)
+    vehicle_id: str, current_user: TokenUser = Depends(get_current_principal)
 ) -> Any:
     """Get a specific vehicle by ID"""
     try:
@@ -65,7 +130,7 @@ async def read_vehicle(
 async def update_vehicle(
     vehicle_id: str,
     vehicle: VehicleUpdate,
-    current_user: User = Depends(get_current_user),
+    current_user: TokenUser = Depends(get_current_principal),
 ) -> Any:
     """Update a vehicle"""
     try:
@@ -77,6 +142,18 @@ async def update_vehicle(
                 detail="No update data provided",
             )
 
+        current = None
+        if (
+            "model" in update_data
+            and "brand" not in update_data
+            and vehicle_normalizer.index() is not None
+        ):
+            # The new model has to be matched under the stored brand
+            current = await neo4j_service.get_vehicle_by_id(vehicle_id, current_user.id)
+        update_data = vehicle_normalizer.normalize(
+            update_data, current.model_dump() if current else None
+        )
+
         updated_vehicle = await neo4j_service.update_vehicle(
             vehicle_id, current_user.id, update_data
         )
@@ -96,7 +173,7 @@ async def update_vehicle(
 
 @router.delete("/{vehicle_id}")
 async def delete_vehicle(
-    vehicle_id: str, current_user: User = Depends(get_current_user)
+    vehicle_id: str, current_user: TokenUser = Depends(get_current_principal)
 ) -> Any:
     """Delete a vehicle"""
     try:
@@ -115,69 +192,180 @@ async def delete_vehicle(
         )
 
 
+def _carapi_failure(e: Exception, detail: str) -> HTTPException:
+    if isinstance(e, CircuitOpenError):
+        # Upstream is known to be down and nothing is cached; fail fast
+        return HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Vehicle data service is temporarily unavailable",
+            headers={"Retry-After": str(int(e.retry_after))},
+        )
+    if isinstance(e, CarAPIError) and e.status_code == 429:
+        # Still rate limited after retries; tell the client when to come back
+        return HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Vehicle data service is busy, please try again shortly",
+            headers={"Retry-After": str(math.ceil(e.retry_after or 5))},
+        )
+    return HTTPException(
+        status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        detail=f"{detail}: {str(e)}",
+    )
+
+
 # CarAPI endpoints for vehicle data
 @router.get("/carapi/years")
-async def get_years(current_user: User = Depends(get_current_user)) -> Any:
+async def get_years(current_user: TokenUser = Depends(get_current_principal)) -> Any:
     """Get available years from CarAPI"""
     try:
         years = await carapi_service.get_years()
         return {"data": years}
     except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to fetch years: {str(e)}",
-        )
+        raise _carapi_failure(e, "Failed to fetch years")
 
 
 @router.get("/carapi/makes")
-async def get_makes(year: int, current_user: User = Depends(get_current_user)) -> Any:
+async def get_makes(
+    year: int, current_user: TokenUser = Depends(get_current_principal)
+) -> Any:
     """Get available makes for a specific year"""
     try:
         makes = await carapi_service.get_makes(year)
         return {"data": makes}
     except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to fetch makes for year {year}: {str(e)}",
-        )
+        raise _carapi_failure(e, f"Failed to fetch makes for year {year}")
 
 
 @router.get("/carapi/models")
 async def get_models(
-    year: int, make: str, current_user: User = Depends(get_current_user)
+    year: int, make: str, current_user: TokenUser = Depends(get_current_principal)
 ) -> Any:
     """Get available models for a specific year and make"""
     try:
         models = await carapi_service.get_models(year, make)
         return {"data": models}
     except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to fetch models for {year} {make}: {str(e)}",
-        )
+        raise _carapi_failure(e, f"Failed to fetch models for {year} {make}")
 
 
 @router.get("/carapi/trims")
 async def get_trims(
-    year: int, make: str, model: str, current_user: User = Depends(get_current_user)
+    year: int,
+    make: str,
+    model: str,
+    current_user: TokenUser = Depends(get_current_principal),
 ) -> Any:
     """Get available trims for a specific year, make, and model"""
     try:
         trims = await carapi_service.get_trims(year, make, model)
         return {"data": trims}
     except Exception as e:
+        raise _carapi_failure(e, f"Failed to fetch trims for {year} {make} {model}")
+
+
+# 17 characters; I, O and Q are never used in VINs
+_VIN_PATTERN = re.compile(r"[A-HJ-NPR-Z0-9]{17}")
+# CarAPI statuses meaning the VIN itself was not recognised
+_VIN_REJECTED_STATUSES = (400, 404, 422)
+
+
+def _normalize_vin(vin: str) -> str:
+    normalized = vin.strip().upper()
+    if not _VIN_PATTERN.fullmatch(normalized):
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to fetch trims for {year} {make} {model}: {str(e)}",
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Invalid VIN: {vin}",
+        )
+    return normalized
+
+
+async def _decode_vin(vin: str) -> VinDecode:
+    vin = _normalize_vin(vin)
+    try:
+        return VinDecode.model_validate(await carapi_service.decode_vin(vin))
+    except CarAPIError as e:
+        # Only CarAPI rejecting the VIN itself; 429 and auth failures are ours
+        if e.status_code in _VIN_REJECTED_STATUSES:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"VIN could not be decoded: {vin}",
+            )
+        raise _carapi_failure(e, f"Failed to decode VIN {vin}")
+    except Exception as e:
+        raise _carapi_failure(e, f"Failed to decode VIN {vin}")
+
+
+@router.get("/vin/{vin}", response_model=VinDecode)
+async def decode_vin(
+    vin: str, current_user: TokenUser = Depends(get_current_principal)
+) -> Any:
+    """Decode a VIN into year/brand/model/trim fields for a new vehicle"""
+    return await _decode_vin(vin)
+
+
+@router.post("/vin/decode", response_model=List[VinDecodeResult])
+async def decode_vins(
+    request: VinDecodeBatchRequest,
+    current_user: TokenUser = Depends(get_current_principal),
+) -> Any:
+    """Decode many VINs at once for fleet onboarding; results are per VIN and
+    in request order"""
+    if len(request.vins) > settings.VIN_DECODE_BATCH_MAX:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {settings.VIN_DECODE_BATCH_MAX} VINs per request",
+        )
+
+    semaphore = asyncio.Semaphore(settings.VIN_DECODE_CONCURRENCY)
+
+    async def decode_one(vin: str) -> VinDecodeResult:
+        async with semaphore:
+            try:
+                vehicle = await _decode_vin(vin)
+            except HTTPException as e:
+                return VinDecodeResult(vin=vin, status=e.status_code, detail=e.detail)
+        return VinDecodeResult(vin=vehicle.vin, status=200, vehicle=vehicle)
+
+    return await asyncio.gather(*(decode_one(vin) for vin in request.vins))
+
+
+@router.get("/catalog/search")
+async def search_catalog(
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(10, ge=1, le=50),
+    current_user: TokenUser = Depends(get_current_principal),
+) -> Any:
+    """Typeahead over the offline catalog snapshot, e.g. "2019 hon civ"
+    (never calls CarAPI)"""
+    snapshot = catalog_snapshot_store.get()
+    if snapshot is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Vehicle catalog snapshot has not been built",
         )
+    return {"data": snapshot.search(q, limit)}
 
 
 @router.get("/{vehicle_id}/recommendations")
 async def get_vehicle_recommendations(
-    vehicle_id: str, current_user: User = Depends(get_current_user)
+    vehicle_id: str,
+    request: Request,
+    response: Response,
+    current_user: TokenUser = Depends(get_current_principal),
 ) -> Any:
     """Get AI-powered maintenance recommendations for a specific vehicle"""
     try:
+        version = await neo4j_service.get_vehicle_data_version(
+            vehicle_id, current_user.id
+        )
+        if version is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="Vehicle not found"
+            )
+        etag = make_etag("recommendations", vehicle_id, version)
+        if etag_matches(request, etag):
+            return not_modified(etag)
+
         # Get the vehicle
         vehicle = await neo4j_service.get_vehicle_by_id(vehicle_id, current_user.id)
         if not vehicle:
@@ -190,6 +378,7 @@ async def get_vehicle_recommendations(
             vehicle_id
         )
         if cached_recommendation:
+            set_etag(response, etag)
             return {
                 "vehicle_id": vehicle_id,
                 "recommendations": cached_recommendation.recommendations,
@@ -226,6 +415,12 @@ async def get_vehicle_recommendations(
             maintenance_count=maintenance_count,
         )
 
+        # Saving bumped the vehicle's version; tag the response with the new one
+        version = await neo4j_service.get_vehicle_data_version(
+            vehicle_id, current_user.id
+        )
+        set_etag(response, make_etag("recommendations", vehicle_id, version))
+
         return {
             "vehicle_id": vehicle_id,
             "recommendations": recommendations,
@@ -234,6 +429,20 @@ async def get_vehicle_recommendations(
         }
     except HTTPException:
         raise
+    except QueueFullError:
+        # Too many recommendation requests already waiting on Claude
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Recommendations are busy, please try again shortly",
+            headers={"Retry-After": "5"},
+        )
+    except ClaudeRateLimitError as e:
+        # Claude kept answering 429/529 through every retry
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Recommendations are busy, please try again shortly",
+            headers={"Retry-After": str(max(1, math.ceil(e.retry_after)))},
+        )
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -1,4 +1,4 @@
-from typing import List, Union
+from typing import Dict, List, Union
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from pydantic import Field, model_validator
 
@@ -10,6 +10,46 @@ class Settings(BaseSettings):
     SECRET_KEY: str = "your-secret-key-here-change-in-production"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 8  # 8 days
 
+    # Stateless auth: short-lived access tokens carry id/role/account_active
+    # claims and are renewed with refresh tokens, so most requests skip Neo4j
+    AUTH_STATELESS_TOKENS: bool = False
+    STATELESS_ACCESS_TOKEN_EXPIRE_MINUTES: int = 15
+    REFRESH_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 30  # 30 days
+
+    # Password hashing: bcrypt cost factor (existing hashes are upgraded on
+    # login when it changes) and size of the worker pool that runs bcrypt
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 4
+
+    # Login/registration throttling, in attempts per minute (0 disables a limit).
+    # Set RATE_LIMIT_REDIS_URL to share buckets between workers (needs `redis`).
+    RATE_LIMIT_ENABLED: bool = True
+    LOGIN_RATE_LIMIT_PER_IP: int = 20
+    LOGIN_RATE_LIMIT_PER_ACCOUNT: int = 5
+    REGISTER_RATE_LIMIT_PER_IP: int = 5
+    REGISTER_RATE_LIMIT_PER_ACCOUNT: int = 3
+    RATE_LIMIT_REDIS_URL: str = ""
+
+    # How often buffered last_login/notification timestamps are written
+    TIMESTAMP_FLUSH_INTERVAL_SECONDS: float = 5.0
+
+    # Maximum sub-operations accepted by one POST /batch request
+    BATCH_MAX_OPERATIONS: int = 100
+
+    # Resolved-user cache used by get_current_user (0 disables it)
+    USER_CACHE_TTL_SECONDS: int = 60
+    USER_CACHE_MAX_SIZE: int = 10000
+
+    # Logging goes through a bounded queue drained by a background thread.
+    # LOG_SAMPLE_RATES maps logger-name prefixes to the fraction of DEBUG/INFO
+    # records kept; LOG_RATE_LIMIT_PER_MINUTE caps repeats of one message
+    # template per logger (0 disables), so error storms cannot flood output.
+    LOG_LEVEL: str = "INFO"
+    LOG_FORMAT: str = "json"  # "json" or "text"
+    LOG_QUEUE_SIZE: int = 10000
+    LOG_SAMPLE_RATES: Dict[str, float] = {"app.services.neo4j_service": 0.1}
+    LOG_RATE_LIMIT_PER_MINUTE: int = 60
+
     BACKEND_CORS_ORIGINS: Union[str, List[str]] = Field(default="http://localhost:3000")
 
     @model_validator(mode="after")
@@ -42,9 +82,64 @@ class Settings(BaseSettings):
     CARAPI_TOKEN: str = ""
     CARAPI_SECRET: str = ""
     CARAPI_BASE_URL: str = "https://carapi.app/api"
+    # Per-attempt timeouts; transient failures (timeouts, 429, 5xx) are retried
+    # up to CARAPI_MAX_RETRIES times with jittered exponential backoff
+    CARAPI_TIMEOUT_SECONDS: float = 5.0
+    CARAPI_CONNECT_TIMEOUT_SECONDS: float = 2.0
+    CARAPI_MAX_CONNECTIONS: int = 20
+    CARAPI_MAX_KEEPALIVE_CONNECTIONS: int = 10
+    CARAPI_MAX_RETRIES: int = 2
+    CARAPI_RETRY_BACKOFF_SECONDS: float = 0.25
+    # A 429 asking to wait longer than this is not retried inline
+    CARAPI_MAX_RETRY_WAIT_SECONDS: float = 5.0
+    # Consecutive failed requests before failing fast, and for how long
+    CARAPI_BREAKER_FAILURE_THRESHOLD: int = 5
+    CARAPI_BREAKER_RECOVERY_SECONDS: float = 30.0
+    # Renew the CarAPI JWT this long before its exp claim
+    CARAPI_TOKEN_REFRESH_MARGIN_SECONDS: int = 3600
+    # Year/make/model/trim catalog cache: memory LRU backed by a SQLite file
+    # (empty path = memory only). Entries older than the TTL are served while
+    # being refreshed in the background; past MAX_STALE they are refetched
+    # inline, falling back to the stale copy if CarAPI is failing.
+    CARAPI_CACHE_PATH: str = "data/carapi_catalog.sqlite3"
+    CARAPI_CACHE_MAX_ENTRIES: int = 5000
+    CARAPI_CACHE_TTL_SECONDS: int = 60 * 60 * 24 * 30  # 30 days
+    CARAPI_CACHE_MAX_STALE_SECONDS: int = 60 * 60 * 24 * 365  # 1 year
+    # Background warming of models/trims for the most-picked makes/models
+    CARAPI_PREFETCH_ENABLED: bool = True
+    CARAPI_PREFETCH_TOP_N: int = 3
+    CARAPI_PREFETCH_CONCURRENCY: int = 2
+    # Permanent VIN -> vehicle fields cache, and bulk decode limits
+    CARAPI_VIN_CACHE_PATH: str = "data/carapi_vin.sqlite3"
+    CARAPI_VIN_CACHE_MAX_ENTRIES: int = 10000
+    VIN_DECODE_BATCH_MAX: int = 100
+    VIN_DECODE_CONCURRENCY: int = 4
+    # Offline year/make/model/trim snapshot behind /vehicles/catalog/search,
+    # built by scripts/build_catalog_snapshot.py or POST /admin/catalog-snapshot
+    CARAPI_SNAPSHOT_PATH: str = "data/carapi_catalog_snapshot.json"
+    CARAPI_SNAPSHOT_CONCURRENCY: int = 4
 
     # Claude API Configuration
     CLAUDE_API_KEY: str = ""
+    # Point at benchmarks/mock_upstreams (with CARAPI_BASE_URL) to run offline
+    CLAUDE_API_URL: str = "https://api.anthropic.com/v1/messages"
+    CLAUDE_TIMEOUT_SECONDS: float = 30.0
+    CLAUDE_MAX_CONNECTIONS: int = 10
+    CLAUDE_MAX_KEEPALIVE_CONNECTIONS: int = 5
+    # At most MAX_CONCURRENCY calls in flight; up to MAX_QUEUE more wait and
+    # the rest are turned away with a 503
+    CLAUDE_MAX_CONCURRENCY: int = 4
+    CLAUDE_MAX_QUEUE: int = 50
+    # 429/529 responses are retried after retry-after (capped at
+    # MAX_RETRY_WAIT), or jittered exponential backoff when it is absent
+    CLAUDE_MAX_RETRIES: int = 3
+    CLAUDE_RETRY_BACKOFF_SECONDS: float = 1.0
+    CLAUDE_MAX_RETRY_WAIT_SECONDS: float = 30.0
+
+    # Shared outbound HTTP pools: idle connections are kept this long, and
+    # HTTP/2 is used when enabled and the h2 package is installed
+    HTTP_KEEPALIVE_EXPIRY_SECONDS: float = 30.0
+    HTTP2_ENABLED: bool = False
 
     model_config = SettingsConfigDict(case_sensitive=True, env_file=".env")
 
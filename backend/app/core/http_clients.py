@@ -0,0 +1,127 @@
+import email.utils
+import logging
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Dict, Optional
+
+if TYPE_CHECKING:
+    import httpx
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class UpstreamConfig:
+    """Connection pool and timeout settings for one outbound API"""
+
+    max_connections: int
+    max_keepalive_connections: int
+    timeout: float
+    connect_timeout: float
+    keepalive_expiry: float = 30.0
+    http2: bool = False
+
+
+def retry_after_seconds(headers: Any) -> Optional[float]:
+    """Seconds to wait from a retry-after header (delta seconds or HTTP date)"""
+    value = headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, when.timestamp() - time.time())
+
+
+class _UpstreamCounters:
+    def __init__(self) -> None:
+        self.requests = 0
+
+    async def on_request(self, request: "httpx.Request") -> None:
+        self.requests += 1
+
+
+class HTTPClientRegistry:
+    """One pooled ``httpx.AsyncClient`` per upstream, shared by all requests.
+
+    Services register their upstream when constructed; the clients are built
+    on application startup (or on first use outside the app, e.g. in scripts)
+    and closed on shutdown, so TLS connections are reused across calls and
+    none outlive the process's event loop.
+    """
+
+    def __init__(self) -> None:
+        self._configs: Dict[str, UpstreamConfig] = {}
+        self._clients: Dict[str, "httpx.AsyncClient"] = {}
+        self._counters: Dict[str, _UpstreamCounters] = {}
+
+    def register(self, name: str, config: UpstreamConfig) -> None:
+        self._configs[name] = config
+
+    def get(self, name: str) -> "httpx.AsyncClient":
+        client = self._clients.get(name)
+        if client is None or client.is_closed:
+            client = self._clients[name] = self._create(name)
+        return client
+
+    def _create(self, name: str) -> "httpx.AsyncClient":
+        # httpx is imported here to keep app startup fast
+        import httpx
+
+        config = self._configs[name]
+        http2 = config.http2
+        if http2:
+            try:
+                import h2  # noqa: F401
+            except ImportError:
+                logger.warning("HTTP/2 requested for %s but h2 is not installed", name)
+                http2 = False
+
+        counters = self._counters.setdefault(name, _UpstreamCounters())
+        return httpx.AsyncClient(
+            timeout=httpx.Timeout(config.timeout, connect=config.connect_timeout),
+            limits=httpx.Limits(
+                max_connections=config.max_connections,
+                max_keepalive_connections=config.max_keepalive_connections,
+                keepalive_expiry=config.keepalive_expiry,
+            ),
+            http2=http2,
+            event_hooks={"request": [counters.on_request]},
+        )
+
+    def start(self) -> None:
+        """Build every registered client up front"""
+        for name in self._configs:
+            self.get(name)
+
+    async def close(self, name: str) -> None:
+        client = self._clients.pop(name, None)
+        if client is not None:
+            await client.aclose()
+
+    async def close_all(self) -> None:
+        for name in list(self._clients):
+            await self.close(name)
+
+    def stats(self) -> Dict[str, float]:
+        stats: Dict[str, float] = {}
+        for name, counters in self._counters.items():
+            connections = []
+            client = self._clients.get(name)
+            if client is not None:
+                # httpcore keeps its pool on the transport; not public API
+                pool = getattr(client._transport, "_pool", None)
+                connections = list(getattr(pool, "connections", []))
+            idle = sum(1 for connection in connections if connection.is_idle())
+            stats[f"{name}_connections"] = len(connections)
+            stats[f"{name}_idle_connections"] = idle
+            stats[f"{name}_requests"] = counters.requests
+        return stats
+
+
+http_clients = HTTPClientRegistry()
@@ -0,0 +1,206 @@
+import copy
+import json
+import logging
+import logging.handlers
+import queue
+import random
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+from app.core.config import settings
+
+# Attributes every LogRecord has; anything else was passed via `extra=` and is
+# emitted as a structured field.
+_RECORD_ATTRS = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line with the record's `extra` fields merged in"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exc_info"] = record.exc_text
+        if record.stack_info:
+            entry["stack_info"] = record.stack_info
+        return json.dumps(entry, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """Drops a share of chatty records and caps repeats of the same message.
+
+    Sampling only applies below WARNING, by the longest matching logger-name
+    prefix in `sample_rates`. The rate limit is a token bucket per (logger,
+    level, message template); the next record let through after a burst
+    carries a `suppressed` count of what was dropped.
+    """
+
+    def __init__(
+        self,
+        sample_rates: Optional[Dict[str, float]] = None,
+        rate_limit_per_minute: int = 0,
+        max_keys: int = 10000,
+    ):
+        super().__init__()
+        self.sample_rates = sorted(
+            (sample_rates or {}).items(), key=lambda item: len(item[0]), reverse=True
+        )
+        self.rate_limit_per_minute = rate_limit_per_minute
+        self.max_keys = max_keys
+        self._buckets: Dict[Tuple[str, int, str], List[float]] = {}
+        self._lock = threading.Lock()
+        self.sampled_out = 0
+        self.rate_limited = 0
+
+    def _sample_rate(self, name: str) -> float:
+        for prefix, rate in self.sample_rates:
+            if name == prefix or name.startswith(prefix + "."):
+                return rate
+        return 1.0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno < logging.WARNING:
+            rate = self._sample_rate(record.name)
+            if rate < 1.0 and random.random() >= rate:
+                self.sampled_out += 1
+                return False
+
+        if self.rate_limit_per_minute <= 0:
+            return True
+
+        # The unformatted template groups "Neo4j error on vehicle %s" storms
+        key = (record.name, record.levelno, str(record.msg))
+        capacity = float(self.rate_limit_per_minute)
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                if len(self._buckets) >= self.max_keys:
+                    self._buckets.clear()
+                bucket = self._buckets[key] = [capacity, now, 0]
+            else:
+                bucket[0] = min(capacity, bucket[0] + (now - bucket[1]) * capacity / 60)
+                bucket[1] = now
+
+            if bucket[0] < 1:
+                bucket[2] += 1
+                self.rate_limited += 1
+                return False
+
+            bucket[0] -= 1
+            if bucket[2]:
+                record.suppressed = int(bucket[2])
+                bucket[2] = 0
+        return True
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """Hands records to the listener thread; drops them when the queue is full.
+
+    Only `msg % args` is resolved on the calling thread (so mutable arguments
+    are captured as they were); JSON encoding, tracebacks and stream I/O all
+    happen on the listener thread.
+    """
+
+    def __init__(self, log_queue: "queue.Queue[logging.LogRecord]"):
+        super().__init__(log_queue)
+        self.enqueued = 0
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            # Traceback objects pin frames; render them before handing off
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+            self.enqueued += 1
+        except queue.Full:
+            self.dropped += 1
+
+
+class LoggingPipeline:
+    """Root logging setup: filter -> bounded queue -> listener thread -> stream"""
+
+    def __init__(self) -> None:
+        self.handler: Optional[NonBlockingQueueHandler] = None
+        self.filter: Optional[SamplingFilter] = None
+        self.listener: Optional[logging.handlers.QueueListener] = None
+        self._output: Optional[logging.Handler] = None
+
+    def configure(self) -> None:
+        """Install the queue handler on the root logger and start the listener"""
+        if self.handler is not None:
+            self.start()
+            return
+
+        log_queue: "queue.Queue[logging.LogRecord]" = queue.Queue(
+            maxsize=settings.LOG_QUEUE_SIZE
+        )
+        self._output = logging.StreamHandler(sys.stderr)
+        if settings.LOG_FORMAT == "json":
+            self._output.setFormatter(JsonFormatter())
+        else:
+            self._output.setFormatter(
+                logging.Formatter(
+                    "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+                )
+            )
+
+        self.filter = SamplingFilter(
+            settings.LOG_SAMPLE_RATES, settings.LOG_RATE_LIMIT_PER_MINUTE
+        )
+        self.handler = NonBlockingQueueHandler(log_queue)
+        self.handler.addFilter(self.filter)
+
+        root = logging.getLogger()
+        root.setLevel(settings.LOG_LEVEL.upper())
+        root.addHandler(self.handler)
+        self.start()
+
+    def start(self) -> None:
+        if self.handler is None or self.listener is not None:
+            return
+        self.listener = logging.handlers.QueueListener(
+            self.handler.queue, self._output, respect_handler_level=True
+        )
+        self.listener.start()
+
+    def stop(self) -> None:
+        """Drain the queue and stop the listener thread"""
+        if self.listener is not None:
+            self.listener.stop()
+            self.listener = None
+
+    def stats(self) -> Dict[str, float]:
+        if self.handler is None or self.filter is None:
+            return {}
+        return {
+            "queued": self.handler.queue.qsize(),
+            "enqueued": self.handler.enqueued,
+            "dropped": self.handler.dropped,
+            "sampled_out": self.filter.sampled_out,
+            "rate_limited": self.filter.rate_limited,
+        }
+
+
+logging_pipeline = LoggingPipeline()
@@ -0,0 +1,296 @@
+import asyncio
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Coroutine, Dict, Iterator, List, Optional, Tuple
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Request phases reported in Server-Timing and the latency histograms. "app" is
+# whatever is left of the total once the named phases are subtracted.
+PHASES = ("auth", "db", "external", "serialize")
+
+LATENCY_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+
+class Histogram:
+    """Cumulative-bucket latency histogram in the Prometheus layout"""
+
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q: float) -> float:
+        """Estimate a quantile by linear interpolation inside its bucket"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        lower = 0.0
+        for i, bound in enumerate(self.buckets):
+            if seen + self.counts[i] >= rank:
+                if not self.counts[i]:
+                    return bound
+                return lower + (bound - lower) * (rank - seen) / self.counts[i]
+            seen += self.counts[i]
+            lower = bound
+        return self.buckets[-1]
+
+
+class _PhaseTimer:
+    """Exclusive ("self") time per phase for one request"""
+
+    def __init__(self) -> None:
+        self.totals: Dict[str, float] = {}
+        # [name, running since]; only the top frame is running, the others
+        # are paused (None) until the frames above them exit
+        self._stack: List[List] = []
+
+    def _stop(self, frame: List, now: float) -> None:
+        if frame[1] is not None:
+            self.totals[frame[0]] = self.totals.get(frame[0], 0.0) + now - frame[1]
+            frame[1] = None
+
+    def enter(self, name: str) -> List:
+        now = time.perf_counter()
+        if self._stack:
+            self._stop(self._stack[-1], now)
+        frame = [name, now]
+        self._stack.append(frame)
+        return frame
+
+    def exit(self, frame: List) -> None:
+        # Concurrent tasks of one request (gather) can leave phases out of
+        # order, so close the caller's own frame rather than the top one
+        now = time.perf_counter()
+        self._stop(frame, now)
+        index = next(
+            i for i in range(len(self._stack) - 1, -1, -1) if self._stack[i] is frame
+        )
+        del self._stack[index]
+        if index == len(self._stack) and self._stack:
+            self._stack[-1][1] = now
+
+
+_current_timer: ContextVar[Optional[_PhaseTimer]] = ContextVar(
+    "request_phase_timer", default=None
+)
+
+
+@contextmanager
+def timed_phase(name: str) -> Iterator[None]:
+    """Attribute the enclosed time to a request phase.
+
+    Nested phases are exclusive: time spent in an inner phase is not also
+    counted for the outer one. Outside a request this is a no-op.
+    """
+    timer = _current_timer.get()
+    if timer is None:
+        yield
+        return
+    frame = timer.enter(name)
+    try:
+        yield
+    finally:
+        timer.exit(frame)
+
+
+def create_background_task(coro: Coroutine[Any, Any, Any]) -> "asyncio.Task[Any]":
+    """Start a task that may outlive the current request.
+
+    It runs in an empty context, so it neither writes into the request's
+    phase timer after the response is sent nor joins any other per-request
+    state (such as an open Neo4j transaction).
+    """
+    return asyncio.create_task(coro, context=contextvars.Context())
+
+
+class MetricsRegistry:
+    """Per-route latency histograms plus pluggable gauge collectors"""
+
+    def __init__(self) -> None:
+        self._latency: Dict[Tuple[str, str, str], Histogram] = {}
+        self._requests: Dict[Tuple[str, str, str], int] = {}
+        self._collectors: Dict[str, Callable[[], Dict[str, float]]] = {}
+        self._lock = threading.Lock()
+
+    def observe_request(
+        self,
+        method: str,
+        route: str,
+        status_code: int,
+        total: float,
+        phases: Dict[str, float],
+    ) -> None:
+        with self._lock:
+            status_key = (method, route, str(status_code))
+            self._requests[status_key] = self._requests.get(status_key, 0) + 1
+            for phase, value in phases.items():
+                key = (method, route, phase)
+                histogram = self._latency.get(key)
+                if histogram is None:
+                    histogram = self._latency[key] = Histogram()
+                histogram.observe(value)
+
+    def register_collector(
+        self, name: str, collector: Callable[[], Dict[str, float]]
+    ) -> None:
+        """Expose a component's stats() dict as gauges named carlog_<name>_<stat>"""
+        self._collectors[name] = collector
+
+    def latency_summary(self) -> List[Dict]:
+        """p50/p99 of total latency per route"""
+        with self._lock:
+            return [
+                {
+                    "method": method,
+                    "route": route,
+                    "count": histogram.count,
+                    "p50_ms": round(histogram.quantile(0.5) * 1000, 3),
+                    "p99_ms": round(histogram.quantile(0.99) * 1000, 3),
+                    "mean_ms": round(histogram.sum / histogram.count * 1000, 3),
+                }
+                for (method, route, phase), histogram in sorted(self._latency.items())
+                if phase == "total" and histogram.count
+            ]
+
+    def render_prometheus(self) -> str:
+        lines = [
+            "# HELP carlog_http_requests_total HTTP requests by route and status.",
+            "# TYPE carlog_http_requests_total counter",
+        ]
+        with self._lock:
+            for (method, route, status_code), count in sorted(self._requests.items()):
+                lines.append(
+                    f'carlog_http_requests_total{{method="{method}",route="{route}",'
+                    f'status="{status_code}"}} {count}'
+                )
+
+            lines.append(
+                "# HELP carlog_http_request_duration_seconds "
+                "Request latency by route and phase."
+            )
+            lines.append("# TYPE carlog_http_request_duration_seconds histogram")
+            for (method, route, phase), histogram in sorted(self._latency.items()):
+                labels = f'method="{method}",route="{route}",phase="{phase}"'
+                cumulative = 0
+                for bound, count in zip(histogram.buckets, histogram.counts):
+                    cumulative += count
+                    lines.append(
+                        f"carlog_http_request_duration_seconds_bucket"
+                        f'{{{labels},le="{bound}"}} {cumulative}'
+                    )
+                lines.append(
+                    f"carlog_http_request_duration_seconds_bucket"
+                    f'{{{labels},le="+Inf"}} {histogram.count}'
+                )
+                lines.append(
+                    f"carlog_http_request_duration_seconds_sum{{{labels}}} "
+                    f"{histogram.sum:.6f}"
+                )
+                lines.append(
+                    f"carlog_http_request_duration_seconds_count{{{labels}}} "
+                    f"{histogram.count}"
+                )
+
+        for name, collector in sorted(self._collectors.items()):
+            try:
+                stats = collector()
+            except Exception:
+                continue
+            for stat, value in stats.items():
+                if isinstance(value, bool) or not isinstance(value, (int, float)):
+                    continue
+                metric = f"carlog_{name}_{stat}"
+                lines.append(f"# TYPE {metric} gauge")
+                lines.append(f"{metric} {value}")
+
+        return "\n".join(lines) + "\n"
+
+
+metrics_registry = MetricsRegistry()
+
+
+class TimingMiddleware:
+    """Times every HTTP request by route template and phase.
+
+    Adds a Server-Timing header to each response and feeds the latency
+    histograms exposed on /metrics.
+    """
+
+    def __init__(self, app: ASGIApp, registry: MetricsRegistry = metrics_registry):
+        self.app = app
+        self.registry = registry
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timer = _PhaseTimer()
+        token = _current_timer.set(timer)
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = MutableHeaders(scope=message)
+                headers.append(
+                    "Server-Timing",
+                    self._server_timing(timer.totals, time.perf_counter() - started),
+                )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current_timer.reset(token)
+            total = time.perf_counter() - started
+            route = scope.get("route")
+            # Route templates keep label cardinality bounded; raw paths would not
+            route_path = getattr(route, "path", None) or "unmatched"
+            phases = {phase: timer.totals.get(phase, 0.0) for phase in PHASES}
+            phases["app"] = max(0.0, total - sum(phases.values()))
+            phases["total"] = total
+            self.registry.observe_request(
+                scope["method"], route_path, status_code, total, phases
+            )
+
+    @staticmethod
+    def _server_timing(totals: Dict[str, float], elapsed: float) -> str:
+        entries = [
+            f"{phase};dur={totals.get(phase, 0.0) * 1000:.2f}" for phase in PHASES
+        ]
+        entries.append(f"total;dur={elapsed * 1000:.2f}")
+        return ", ".join(entries)
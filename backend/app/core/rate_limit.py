@@ -0,0 +1,173 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, List, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class InMemoryRateLimitBackend:
+    """Token buckets held in a bounded LRU map of key -> [tokens, updated_at]"""
+
+    def __init__(self, max_keys: int = 100000):
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    async def take(self, key: str, capacity: float, refill_per_second: float) -> float:
+        """Take one token; return 0 if allowed, otherwise seconds until retry"""
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = [capacity, now]
+                self._buckets[key] = bucket
+                if len(self._buckets) > self.max_keys:
+                    # Dropping the oldest bucket only ever forgives a client
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(key)
+                bucket[0] = min(
+                    capacity, bucket[0] + (now - bucket[1]) * refill_per_second
+                )
+                bucket[1] = now
+
+            if bucket[0] >= 1:
+                bucket[0] -= 1
+                return 0.0
+            return (1 - bucket[0]) / refill_per_second
+
+    def reset(self) -> None:
+        with self._lock:
+            self._buckets.clear()
+
+
+# Atomic token bucket for the shared backend; mirrors InMemoryRateLimitBackend
+_REDIS_TOKEN_BUCKET = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local bucket = redis.call('HMGET', KEYS[1], 't', 'u')
+local tokens = tonumber(bucket[1]) or capacity
+local updated = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - updated) * rate)
+local retry = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    retry = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 't', tokens, 'u', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+return tostring(retry)
+"""
+
+
+class RedisRateLimitBackend:
+    """Token buckets shared by all workers through Redis.
+
+    Requires the optional ``redis`` package. If Redis is unreachable the
+    request is checked against a local in-memory bucket instead, so an outage
+    degrades to per-worker limits rather than blocking logins.
+    """
+
+    def __init__(self, url: str, prefix: str = "carlog:ratelimit:"):
+        self.url = url
+        self.prefix = prefix
+        self._client: Any = None
+        self._script: Any = None
+        self._fallback = InMemoryRateLimitBackend()
+
+    def _get_script(self) -> Any:
+        if self._script is None:
+            import redis.asyncio as redis  # optional dependency
+
+            self._client = redis.from_url(self.url)
+            self._script = self._client.register_script(_REDIS_TOKEN_BUCKET)
+        return self._script
+
+    async def take(self, key: str, capacity: float, refill_per_second: float) -> float:
+        try:
+            script = self._get_script()
+            retry_after = await script(
+                keys=[self.prefix + key],
+                args=[capacity, refill_per_second, time.time()],
+            )
+            return float(retry_after)
+        except Exception as e:
+            logger.warning("Shared rate limit backend unavailable: %s", e)
+            return await self._fallback.take(key, capacity, refill_per_second)
+
+    def reset(self) -> None:
+        self._fallback.reset()
+
+
+def _create_backend() -> Any:
+    if settings.RATE_LIMIT_REDIS_URL:
+        return RedisRateLimitBackend(settings.RATE_LIMIT_REDIS_URL)
+    return InMemoryRateLimitBackend()
+
+
+rate_limit_backend = _create_backend()
+
+
+class RateLimiter:
+    """Per-IP and per-account limits for one action, in attempts per minute"""
+
+    def __init__(
+        self,
+        name: str,
+        per_ip_per_minute: int,
+        per_account_per_minute: int,
+        backend: Any = None,
+    ):
+        self.name = name
+        self.per_ip_per_minute = per_ip_per_minute
+        self.per_account_per_minute = per_account_per_minute
+        self.backend = backend
+        self.allowed = 0
+        self.rejected = 0
+
+    async def _take(self, key: str, per_minute: int) -> float:
+        if per_minute <= 0:
+            return 0.0
+        backend = self.backend or rate_limit_backend
+        return await backend.take(
+            f"{self.name}:{key}", float(per_minute), per_minute / 60.0
+        )
+
+    async def hit(self, client_ip: Optional[str], account: Optional[str]) -> float:
+        """Record an attempt; return 0 if allowed, otherwise seconds until retry"""
+        if not settings.RATE_LIMIT_ENABLED:
+            return 0.0
+
+        retry_after = 0.0
+        if client_ip:
+            retry_after = await self._take(f"ip:{client_ip}", self.per_ip_per_minute)
+        # An IP that is already blocked does not drain the account's bucket
+        if not retry_after and account:
+            retry_after = await self._take(
+                f"account:{account.strip().lower()}", self.per_account_per_minute
+            )
+
+        if retry_after:
+            self.rejected += 1
+        else:
+            self.allowed += 1
+        return retry_after
+
+
+login_rate_limiter = RateLimiter(
+    "login",
+    per_ip_per_minute=settings.LOGIN_RATE_LIMIT_PER_IP,
+    per_account_per_minute=settings.LOGIN_RATE_LIMIT_PER_ACCOUNT,
+)
+
+registration_rate_limiter = RateLimiter(
+    "register",
+    per_ip_per_minute=settings.REGISTER_RATE_LIMIT_PER_IP,
+    per_account_per_minute=settings.REGISTER_RATE_LIMIT_PER_ACCOUNT,
+)
@@ -0,0 +1,45 @@
+from typing import Any, Dict, Optional
+
+from fastapi import Response
+from fastapi.responses import ORJSONResponse
+from pydantic import TypeAdapter
+
+from app.core.metrics import timed_phase
+
+
+class FastJSONResponse(ORJSONResponse):
+    """Default response class: orjson rendering, timed as the serialize phase"""
+
+    def render(self, content: Any) -> bytes:
+        with timed_phase("serialize"):
+            return super().render(content)
+
+
+class ResponseSerializer:
+    """Precomputed JSON serializer for a response type.
+
+    Handlers that return objects they built themselves (already validated when
+    the models were created) can skip FastAPI's response_model re-validation
+    and jsonable_encoder pass: pydantic's compiled serializer writes the JSON
+    bytes directly. Keep response_model on the route for the OpenAPI schema.
+    """
+
+    def __init__(self, response_type: Any):
+        self.adapter = TypeAdapter(response_type)
+
+    def dump(self, content: Any) -> bytes:
+        with timed_phase("serialize"):
+            return self.adapter.dump_json(content)
+
+    def response(
+        self,
+        content: Any,
+        status_code: int = 200,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> Response:
+        return Response(
+            content=self.dump(content),
+            status_code=status_code,
+            headers=headers,
+            media_type="application/json",
+        )
@@ -1,18 +1,46 @@
+import asyncio
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional, Union
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Callable, Dict, Optional, Tuple, TypeVar, Union
 
 from jose import jwt
-from passlib.context import CryptContext
 
 from app.core.config import settings
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+if TYPE_CHECKING:
+    from passlib.context import CryptContext
+
+
+@lru_cache(maxsize=None)
+def get_pwd_context() -> "CryptContext":
+    """The bcrypt context, built on first use to keep passlib off the import path"""
+    from passlib.context import CryptContext
+
+    # Pinning min/max to the configured cost makes needs_update() flag any hash
+    # produced with a different cost, so it is rehashed on the next login
+    return CryptContext(
+        schemes=["bcrypt"],
+        deprecated="auto",
+        bcrypt__default_rounds=settings.BCRYPT_ROUNDS,
+        bcrypt__min_rounds=settings.BCRYPT_ROUNDS,
+        bcrypt__max_rounds=settings.BCRYPT_ROUNDS,
+    )
+
 
 ALGORITHM = "HS256"
 
+ACCESS_TOKEN_TYPE = "access"
+REFRESH_TOKEN_TYPE = "refresh"
+
 
 def create_access_token(
-    subject: Union[str, int], expires_delta: Optional[timedelta] = None
+    subject: Union[str, int],
+    expires_delta: Optional[timedelta] = None,
+    claims: Optional[Dict[str, Any]] = None,
 ) -> str:
     if expires_delta:
         expire = datetime.utcnow() + expires_delta
@@ -21,13 +49,197 @@ def create_access_token(
             minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES
         )
     to_encode = {"exp": expire, "sub": str(subject)}
+    if claims:
+        # iat is kept as a float so revocations within the same second still apply
+        to_encode.update(claims, iat=time.time(), type=ACCESS_TOKEN_TYPE)
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
 
+def create_refresh_token(subject: Union[str, int], user_id: str) -> str:
+    expire = datetime.utcnow() + timedelta(
+        minutes=settings.REFRESH_TOKEN_EXPIRE_MINUTES
+    )
+    to_encode = {
+        "exp": expire,
+        "sub": str(subject),
+        "uid": user_id,
+        "iat": time.time(),
+        "jti": str(uuid.uuid4()),
+        "type": REFRESH_TOKEN_TYPE,
+    }
+    return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=ALGORITHM)
+
+
+def user_token_claims(user: Any) -> Dict[str, Any]:
+    """Claims embedded in stateless access tokens"""
+    return {
+        "uid": user.id,
+        "role": user.role or "user",
+        "account_active": (
+            user.account_active if user.account_active is not None else True
+        ),
+    }
+
+
+class TokenRevocationList:
+    """In-memory list of revoked refresh tokens and per-user revocation times"""
+
+    def __init__(self):
+        self._revoked_jtis: Dict[str, float] = {}
+        self._user_revoked_at: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def revoke(self, jti: str, expires_at: float) -> None:
+        """Revoke a single token until its own expiry"""
+        with self._lock:
+            self._revoked_jtis[jti] = expires_at
+            self._purge()
+
+    def is_revoked(self, jti: Optional[str]) -> bool:
+        if not jti:
+            return False
+        with self._lock:
+            return jti in self._revoked_jtis
+
+    def revoke_user_tokens(self, user_id: str) -> None:
+        """Reject every token for the user issued before now"""
+        with self._lock:
+            self._user_revoked_at[user_id] = time.time()
+            self._purge()
+
+    def is_user_revoked(self, user_id: Optional[str], issued_at: Any) -> bool:
+        if not user_id:
+            return False
+        with self._lock:
+            revoked_at = self._user_revoked_at.get(user_id)
+        if revoked_at is None:
+            return False
+        try:
+            return float(issued_at) <= revoked_at
+        except (TypeError, ValueError):
+            return True
+
+    def reset(self) -> None:
+        with self._lock:
+            self._revoked_jtis.clear()
+            self._user_revoked_at.clear()
+
+    def _purge(self) -> None:
+        now = time.time()
+        self._revoked_jtis = {
+            jti: exp for jti, exp in self._revoked_jtis.items() if exp > now
+        }
+        # Nothing issued before this horizon can still be valid
+        horizon = now - settings.REFRESH_TOKEN_EXPIRE_MINUTES * 60
+        self._user_revoked_at = {
+            uid: ts for uid, ts in self._user_revoked_at.items() if ts > horizon
+        }
+
+
+token_revocation_list = TokenRevocationList()
+
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    return get_pwd_context().verify(plain_password, hashed_password)
 
 
 def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+    return get_pwd_context().hash(password)
+
+
+T = TypeVar("T")
+
+
+class PasswordHasher:
+    """Runs bcrypt in a bounded thread pool so it never blocks the event loop.
+
+    bcrypt releases the GIL while hashing, so threads give real parallelism.
+    The pool size is the concurrency cap; callers beyond it wait in the
+    executor queue, which is reported by stats().
+    """
+
+    def __init__(self, max_workers: int):
+        self.max_workers = max_workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self.queued = 0
+        self.active = 0
+        self.completed = 0
+        self.max_queued = 0
+        self.total_wait_seconds = 0.0
+        self.total_run_seconds = 0.0
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix="password-hash"
+            )
+        return self._executor
+
+    async def _run(self, func: Callable[..., T], *args: Any) -> T:
+        submitted_at = time.perf_counter()
+        with self._lock:
+            self.queued += 1
+            self.max_queued = max(self.max_queued, self.queued)
+
+        def task() -> T:
+            started_at = time.perf_counter()
+            with self._lock:
+                self.queued -= 1
+                self.active += 1
+                self.total_wait_seconds += started_at - submitted_at
+            try:
+                return func(*args)
+            finally:
+                with self._lock:
+                    self.active -= 1
+                    self.completed += 1
+                    self.total_run_seconds += time.perf_counter() - started_at
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._get_executor(), task)
+
+    async def hash(self, password: str) -> str:
+        return await self._run(get_pwd_context().hash, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._run(
+            get_pwd_context().verify, plain_password, hashed_password
+        )
+
+    async def verify_and_update(
+        self, plain_password: str, hashed_password: str
+    ) -> Tuple[bool, Optional[str]]:
+        """Verify a password and return a new hash if the stored one is outdated"""
+        return await self._run(
+            get_pwd_context().verify_and_update, plain_password, hashed_password
+        )
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "queued": self.queued,
+                "active": self.active,
+                "completed": self.completed,
+                "max_queued": self.max_queued,
+                "avg_wait_ms": (
+                    self.total_wait_seconds / self.completed * 1000
+                    if self.completed
+                    else 0.0
+                ),
+                "avg_run_ms": (
+                    self.total_run_seconds / self.completed * 1000
+                    if self.completed
+                    else 0.0
+                ),
+            }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+
+password_hasher = PasswordHasher(max_workers=settings.PASSWORD_HASH_WORKERS)
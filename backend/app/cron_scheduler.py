@@ -1,10 +1,10 @@
 import logging
-from apscheduler.schedulers.asyncio import AsyncIOScheduler
-from apscheduler.triggers.cron import CronTrigger
+from typing import TYPE_CHECKING, Optional
 
-from app.services.neo4j_service import Neo4jService
-from app.services.sms_service import SMSService
-from app.services.reminder_service import ReminderService
+if TYPE_CHECKING:
+    from apscheduler.schedulers.asyncio import AsyncIOScheduler
+
+    from app.services.reminder_service import ReminderService
 
 
 logger = logging.getLogger(__name__)
@@ -14,16 +14,20 @@ class CronScheduler:
     """Manages scheduled tasks for the application"""
 
     def __init__(self):
-        self.scheduler = AsyncIOScheduler()
+        # APScheduler, Twilio and the reminder services are imported on start()
+        # so that importing the app (tests, CLI scripts) stays cheap
+        self.scheduler: Optional["AsyncIOScheduler"] = None
         self.logger = logger
 
     def start(self):
         """Start the scheduler"""
         try:
+            from apscheduler.schedulers.asyncio import AsyncIOScheduler
+            from apscheduler.triggers.cron import CronTrigger
+
             # Initialize services
-            neo4j_service = Neo4jService()
-            sms_service = SMSService()
-            reminder_service = ReminderService(neo4j_service, sms_service)
+            reminder_service = _create_reminder_service()
+            self.scheduler = AsyncIOScheduler()
 
             # Schedule daily reminder check at 9 AM
             self.scheduler.add_job(
@@ -40,18 +44,20 @@ class CronScheduler:
             self.logger.info("Cron scheduler started successfully")
 
         except Exception as e:
-            self.logger.error(f"Failed to start cron scheduler: {e}")
+            self.logger.error("Failed to start cron scheduler: %s", e)
             raise
 
     def stop(self):
         """Stop the scheduler"""
+        if self.scheduler is None:
+            return
         try:
             self.scheduler.shutdown(wait=True)
             self.logger.info("Cron scheduler stopped")
         except Exception as e:
-            self.logger.error(f"Error stopping cron scheduler: {e}")
+            self.logger.error("Error stopping cron scheduler: %s", e)
 
-    async def _run_reminder_check(self, reminder_service: ReminderService):
+    async def _run_reminder_check(self, reminder_service: "ReminderService"):
         """Run the daily reminder check"""
         try:
             self.logger.info("Starting daily reminder check")
@@ -60,11 +66,20 @@ class CronScheduler:
                 maintenance_count,
             ) = await reminder_service.process_scheduled_reminders()
             self.logger.info(
-                f"Daily reminder check completed: "
-                f"{sms_count} SMS reminders, {maintenance_count} maintenance notifications sent"
+                "Daily reminder check completed: %s SMS reminders, %s maintenance notifications sent",
+                sms_count,
+                maintenance_count,
             )
         except Exception as e:
-            self.logger.error(f"Error in daily reminder check: {e}")
+            self.logger.error("Error in daily reminder check: %s", e)
+
+
+def _create_reminder_service() -> "ReminderService":
+    from app.services.neo4j_service import Neo4jService
+    from app.services.reminder_service import ReminderService
+    from app.services.sms_service import SMSService
+
+    return ReminderService(Neo4jService(), SMSService())
 
 
 # Global scheduler instance
@@ -74,9 +89,7 @@ scheduler = CronScheduler()
 async def run_manual_reminder_check():
     """Run a manual reminder check - useful for testing"""
     try:
-        neo4j_service = Neo4jService()
-        sms_service = SMSService()
-        reminder_service = ReminderService(neo4j_service, sms_service)
+        reminder_service = _create_reminder_service()
 
         logger.info("Running manual reminder check")
         (
@@ -84,11 +97,12 @@ async def run_manual_reminder_check():
             maintenance_count,
         ) = await reminder_service.process_scheduled_reminders()
         logger.info(
-            f"Manual reminder check completed: "
-            f"{sms_count} SMS reminders, {maintenance_count} maintenance notifications sent"
+            "Manual reminder check completed: %s SMS reminders, %s maintenance notifications sent",
+            sms_count,
+            maintenance_count,
         )
         return sms_count, maintenance_count
 
     except Exception as e:
-        logger.error(f"Error in manual reminder check: {e}")
+        logger.error("Error in manual reminder check: %s", e)
         raise
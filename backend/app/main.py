@@ -2,17 +2,28 @@ import logging
 from fastapi import FastAPI, Request, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.exceptions import RequestValidationError
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 from pydantic import ValidationError
 
 from app.api.v1.api import api_router
 from app.core.config import settings
+from app.core.http_clients import http_clients
+from app.core.logging_config import logging_pipeline
+from app.core.metrics import TimingMiddleware, metrics_registry
+from app.core.rate_limit import login_rate_limiter, registration_rate_limiter
+from app.core.responses import FastJSONResponse
+from app.core.security import password_hasher
 from app.cron_scheduler import scheduler
+from app.services.carapi_service import carapi_service
+from app.services.catalog_cache import catalog_cache, vin_decode_cache
+from app.services.catalog_snapshot import catalog_snapshot_store
+from app.services.claude_service import claude_service
+from app.services.user_cache import user_cache
+from app.services.vehicle_normalizer import vehicle_normalizer
+from app.services.write_behind import timestamp_write_buffer
 
 # Configure logging
-logging.basicConfig(
-    level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-)
+logging_pipeline.configure()
 
 logger = logging.getLogger(__name__)
 
@@ -20,6 +31,7 @@ app = FastAPI(
     title="CarLog API",
     description="Car maintenance tracking application API",
     version="0.1.0",
+    default_response_class=FastJSONResponse,
 )
 
 app.add_middleware(
@@ -30,13 +42,49 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Added last so it is outermost and times the whole middleware stack
+app.add_middleware(TimingMiddleware)
+
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
+metrics_registry.register_collector("logging", logging_pipeline.stats)
+metrics_registry.register_collector("user_cache", user_cache.stats)
+metrics_registry.register_collector("carapi_catalog_cache", catalog_cache.stats)
+metrics_registry.register_collector("carapi_vin_cache", vin_decode_cache.stats)
+metrics_registry.register_collector("carapi", carapi_service.stats)
+metrics_registry.register_collector("carapi_breaker", carapi_service.breaker.stats)
+metrics_registry.register_collector("carapi_prefetch", carapi_service.prefetcher.stats)
+metrics_registry.register_collector("vehicle_normalizer", vehicle_normalizer.stats)
+metrics_registry.register_collector("claude", claude_service.stats)
+metrics_registry.register_collector("http_pool", http_clients.stats)
+metrics_registry.register_collector("password_hasher", password_hasher.stats)
+metrics_registry.register_collector("timestamp_buffer", timestamp_write_buffer.stats)
+metrics_registry.register_collector(
+    "rate_limit_login",
+    lambda: {
+        "allowed": login_rate_limiter.allowed,
+        "rejected": login_rate_limiter.rejected,
+    },
+)
+metrics_registry.register_collector(
+    "rate_limit_register",
+    lambda: {
+        "allowed": registration_rate_limiter.allowed,
+        "rejected": registration_rate_limiter.rejected,
+    },
+)
+
 
 @app.exception_handler(RequestValidationError)
 async def validation_exception_handler(request: Request, exc: RequestValidationError):
     """Custom handler for validation errors"""
-    logger.error(f"Validation error on {request.url}: {exc}")
+    logger.warning(
+        "Validation error on %s %s: %s",
+        request.method,
+        request.url.path,
+        exc,
+        extra={"status_code": 422},
+    )
     return JSONResponse(
         status_code=422,
         content={
@@ -50,7 +98,13 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
 @app.exception_handler(ValidationError)
 async def pydantic_validation_exception_handler(request: Request, exc: ValidationError):
     """Custom handler for Pydantic validation errors"""
-    logger.error(f"Pydantic validation error on {request.url}: {exc}")
+    logger.warning(
+        "Pydantic validation error on %s %s: %s",
+        request.method,
+        request.url.path,
+        exc,
+        extra={"status_code": 400},
+    )
     return JSONResponse(
         status_code=400,
         content={
@@ -64,7 +118,16 @@ async def pydantic_validation_exception_handler(request: Request, exc: Validatio
 @app.exception_handler(HTTPException)
 async def http_exception_handler(request: Request, exc: HTTPException):
     """Custom handler for HTTP exceptions"""
-    logger.error(f"HTTP exception on {request.url}: {exc.status_code} - {exc.detail}")
+    # Client errors are routine (expired tokens, 404s); only 5xx are errors
+    logger.log(
+        logging.ERROR if exc.status_code >= 500 else logging.INFO,
+        "HTTP exception on %s %s: %s - %s",
+        request.method,
+        request.url.path,
+        exc.status_code,
+        exc.detail,
+        extra={"status_code": exc.status_code},
+    )
     return JSONResponse(
         status_code=exc.status_code,
         content={
@@ -72,13 +135,22 @@ async def http_exception_handler(request: Request, exc: HTTPException):
             "status_code": exc.status_code,
             "url": str(request.url),
         },
+        headers=getattr(exc, "headers", None),
     )
 
 
 @app.exception_handler(Exception)
 async def general_exception_handler(request: Request, exc: Exception):
     """Custom handler for general exceptions"""
-    logger.error(f"Unexpected error on {request.url}: {type(exc).__name__}: {exc}")
+    logger.error(
+        "Unexpected error on %s %s: %s: %s",
+        request.method,
+        request.url.path,
+        type(exc).__name__,
+        exc,
+        exc_info=exc,
+        extra={"status_code": 500},
+    )
     return JSONResponse(
         status_code=500,
         content={
@@ -91,21 +163,40 @@ async def general_exception_handler(request: Request, exc: Exception):
 
 @app.on_event("startup")
 async def startup_event():
-    """Start the cron scheduler on application startup"""
+    """Start background tasks and the cron scheduler on application startup"""
+    logging_pipeline.start()
+    timestamp_write_buffer.start()
+    http_clients.start()
+    await catalog_snapshot_store.load()
     try:
         scheduler.start()
         logger.info("Application startup complete, cron scheduler started")
     except Exception as e:
-        logger.error(f"Failed to start cron scheduler: {e}")
+        logger.error("Failed to start cron scheduler: %s", e)
 
 
 @app.on_event("shutdown")
 async def shutdown_event():
-    """Stop the cron scheduler on application shutdown"""
+    """Stop the cron scheduler and flush buffered writes on application shutdown"""
     scheduler.stop()
+    await timestamp_write_buffer.stop()
+    password_hasher.shutdown()
+    await http_clients.close_all()
+    catalog_cache.close()
+    vin_decode_cache.close()
     logger.info("Application shutdown complete")
+    logging_pipeline.stop()
 
 
 @app.get("/")
 async def root():
     return {"message": "Welcome to CarLog API"}
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus scrape endpoint"""
+    return PlainTextResponse(
+        metrics_registry.render_prometheus(),
+        media_type="text/plain; version=0.0.4",
+    )
@@ -0,0 +1,30 @@
+from typing import Any, List, Literal, Optional
+from pydantic import BaseModel
+
+
+class BatchOperation(BaseModel):
+    method: Literal["GET", "POST", "PUT", "DELETE"]
+    # Path relative to the API root, e.g. "/vehicles/{id}" or "/maintenance/records"
+    path: str
+    body: Optional[Any] = None
+    # Opaque client reference echoed back in the matching result
+    ref: Optional[str] = None
+
+
+class BatchRequest(BaseModel):
+    operations: List[BatchOperation]
+    # All-or-nothing: stop at the first failure and roll everything back.
+    # Otherwise each operation commits or fails on its own.
+    atomic: bool = True
+
+
+class BatchOperationResult(BaseModel):
+    ref: Optional[str] = None
+    status: int
+    body: Any = None
+
+
+class BatchResponse(BaseModel):
+    results: List[BatchOperationResult]
+    # False when an atomic batch was rolled back
+    committed: bool
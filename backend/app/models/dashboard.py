@@ -0,0 +1,25 @@
+from datetime import date, datetime
+from typing import List, Optional
+from pydantic import BaseModel
+
+from app.models.maintenance import Maintenance
+from app.models.vehicle import Vehicle
+
+
+class DashboardVehicle(BaseModel):
+    vehicle: Vehicle
+    recent_maintenance: List[Maintenance]
+    maintenance_count: int
+    total_spend: float
+    last_service_date: Optional[date] = None
+    recommendation_generated_at: Optional[datetime] = None
+    # True when the latest recommendation was generated at the vehicle's
+    # current mileage and maintenance count, i.e. it would be served from cache
+    recommendation_fresh: bool = False
+
+
+class Dashboard(BaseModel):
+    vehicles: List[DashboardVehicle]
+    vehicle_count: int
+    maintenance_count: int
+    total_spend: float
@@ -80,3 +80,16 @@ class UserInDB(UserInDBBase):
 
 class UserWithVehicleCount(User):
     vehicle_count: int = 0
+
+
+class TokenUser(BaseModel):
+    """Identity resolved from a token; enough for ownership and role checks"""
+
+    id: str
+    email: EmailStr
+    role: Optional[Literal["admin", "manager", "user"]] = "user"
+    account_active: Optional[bool] = True
+
+
+class RefreshTokenRequest(BaseModel):
+    refresh_token: str
@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import List, Optional
 from pydantic import BaseModel, ConfigDict
 
 
@@ -55,3 +55,29 @@ class VehicleInDBBase(VehicleBase):
 
 class Vehicle(VehicleInDBBase):
     pass
+
+
+class VinDecode(BaseModel):
+    """Vehicle fields decoded from a VIN, ready for VehicleCreate"""
+
+    model_config = ConfigDict(protected_namespaces=())
+
+    vin: str
+    year: int
+    brand: str
+    brand_id: Optional[int] = None
+    model: str
+    model_id: Optional[int] = None
+    trim: Optional[str] = None
+    trim_id: Optional[int] = None
+
+
+class VinDecodeBatchRequest(BaseModel):
+    vins: List[str]
+
+
+class VinDecodeResult(BaseModel):
+    vin: str
+    status: int
+    vehicle: Optional[VinDecode] = None
+    detail: Optional[str] = None
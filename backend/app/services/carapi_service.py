@@ -1,35 +1,112 @@
-import httpx
+import asyncio
 import logging
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any
+import random
+import time
+from typing import TYPE_CHECKING, Dict, List, Optional, Any
 from app.core.config import settings
+from app.core.http_clients import UpstreamConfig, http_clients, retry_after_seconds
+from app.core.metrics import timed_phase
+from app.services.catalog_cache import (
+    CatalogCache,
+    catalog_cache,
+    catalog_key,
+    vin_decode_cache,
+)
+from app.services.catalog_prefetch import CatalogPrefetcher, CountMinSketch
+from app.utils.circuit_breaker import CLOSED, CircuitBreaker
+from app.utils.singleflight import SingleFlight
+
+if TYPE_CHECKING:
+    import httpx
 
 logger = logging.getLogger(__name__)
 
 
+class CarAPIError(Exception):
+    """CarAPI answered with an error or could not be reached"""
+
+    def __init__(
+        self,
+        message: str,
+        retryable: bool = False,
+        status_code: Optional[int] = None,
+        retry_after: Optional[float] = None,
+    ):
+        super().__init__(message)
+        # Timeouts, connection errors, 429 and 5xx are worth another attempt
+        self.retryable = retryable
+        self.status_code = status_code
+        # From CarAPI's retry-after header, when it sent one
+        self.retry_after = retry_after
+
+
 class CarAPIService:
-    def __init__(self):
+    def __init__(
+        self,
+        cache: Optional[CatalogCache] = None,
+        vin_cache: Optional[CatalogCache] = None,
+    ):
+        self.cache = cache or catalog_cache
+        self.vin_cache = vin_cache or vin_decode_cache
         self.base_url = settings.CARAPI_BASE_URL
         self.token = settings.CARAPI_TOKEN
         self.secret = settings.CARAPI_SECRET
         self._jwt_token: Optional[str] = None
-        self._jwt_expires: Optional[datetime] = None
-        self._client = httpx.AsyncClient(timeout=30.0)
+        self._jwt_expires_at: float = 0.0  # epoch seconds, from the JWT's exp
+        # Serialises logins so an expired token triggers exactly one refresh
+        self._auth_lock = asyncio.Lock()
+        self.token_refreshes = 0
+        # Identical concurrent lookups share one upstream call
+        self.flights = SingleFlight()
+        # Fails fast while carapi.app is down instead of tying up workers
+        self.breaker = CircuitBreaker(
+            "CarAPI",
+            failure_threshold=settings.CARAPI_BREAKER_FAILURE_THRESHOLD,
+            recovery_seconds=settings.CARAPI_BREAKER_RECOVERY_SECONDS,
+        )
+        self.retries = 0
+        # Learns which makes/models get picked and warms their children
+        self.prefetcher = CatalogPrefetcher(
+            CountMinSketch(),
+            top_n=settings.CARAPI_PREFETCH_TOP_N,
+            concurrency=settings.CARAPI_PREFETCH_CONCURRENCY,
+            enabled=settings.CARAPI_PREFETCH_ENABLED,
+        )
+
+        http_clients.register(
+            "carapi",
+            UpstreamConfig(
+                max_connections=settings.CARAPI_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.CARAPI_MAX_KEEPALIVE_CONNECTIONS,
+                timeout=settings.CARAPI_TIMEOUT_SECONDS,
+                connect_timeout=settings.CARAPI_CONNECT_TIMEOUT_SECONDS,
+                keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY_SECONDS,
+                http2=settings.HTTP2_ENABLED,
+            ),
+        )
+
+    @property
+    def _client(self) -> "httpx.AsyncClient":
+        # Shared pooled client, built on startup rather than at import
+        return http_clients.get("carapi")
 
     async def _authenticate(self) -> str:
         """Authenticate with CarAPI and get JWT token"""
         try:
             auth_data = {"api_token": self.token, "api_secret": self.secret}
 
-            response = await self._client.post(
-                f"{self.base_url}/auth/login",
-                json=auth_data,
-                headers={"Content-Type": "application/json"},
-            )
+            with timed_phase("external"):
+                response = await self._client.post(
+                    f"{self.base_url}/auth/login",
+                    json=auth_data,
+                    headers={"Content-Type": "application/json"},
+                )
 
             if response.status_code != 200:
                 logger.error(
-                    f"CarAPI authentication failed: {response.status_code} - {response.text}"
+                    "CarAPI authentication failed: %s - %s",
+                    response.status_code,
+                    response.text,
                 )
                 raise Exception(f"CarAPI authentication failed: {response.status_code}")
 
@@ -39,70 +116,247 @@ class CarAPIService:
             if not jwt_token:
                 raise Exception("No JWT token received from CarAPI")
 
-            # Cache the token for 6 days (CarAPI tokens last 7 days)
             self._jwt_token = jwt_token
-            self._jwt_expires = datetime.now() + timedelta(days=6)
+            self._jwt_expires_at = self._token_expiry(jwt_token)
+            self.token_refreshes += 1
 
             logger.info("CarAPI authentication successful")
             return jwt_token
 
         except Exception as e:
-            logger.error(f"CarAPI authentication error: {str(e)}")
+            logger.error("CarAPI authentication error: %s", e)
             raise
 
+    @staticmethod
+    def _token_expiry(jwt_token: str) -> float:
+        """Expiry of a CarAPI token from its own (unverified) exp claim"""
+        from jose import jwt
+
+        try:
+            return float(jwt.get_unverified_claims(jwt_token)["exp"])
+        except Exception:
+            # Opaque or malformed token: CarAPI tokens last 7 days, assume 6
+            logger.warning("CarAPI token has no readable exp claim")
+            return time.time() + 6 * 24 * 3600
+
+    def _token_is_usable(self) -> bool:
+        # Refresh ahead of expiry so no request goes out with a dying token
+        return self._jwt_token is not None and time.time() < (
+            self._jwt_expires_at - settings.CARAPI_TOKEN_REFRESH_MARGIN_SECONDS
+        )
+
     async def _get_jwt_token(self) -> str:
         """Get valid JWT token, refreshing if necessary"""
-        if (
-            self._jwt_token is None
-            or self._jwt_expires is None
-            or datetime.now() >= self._jwt_expires
-        ):
-            await self._authenticate()
+        if not self._token_is_usable():
+            async with self._auth_lock:
+                # Another coroutine may have refreshed while we waited
+                if not self._token_is_usable():
+                    await self._authenticate()
 
         if self._jwt_token is None:
             raise Exception("Failed to obtain JWT token")
 
         return self._jwt_token
 
+    async def _replace_rejected_token(self, rejected: str) -> str:
+        """Get a new token after CarAPI rejected ``rejected`` with a 401"""
+        async with self._auth_lock:
+            if self._jwt_token is not None and self._jwt_token != rejected:
+                # Already replaced by a concurrent request; reuse it
+                return self._jwt_token
+            logger.info("CarAPI token rejected, refreshing...")
+            return await self._authenticate()
+
     async def _make_request(
         self, endpoint: str, params: Optional[Dict] = None
     ) -> Dict[str, Any]:
-        """Make authenticated request to CarAPI"""
+        """Make authenticated request to CarAPI, coalescing identical calls"""
+        return await self.flights.do(
+            catalog_key(endpoint, params),
+            lambda: self._request_upstream(endpoint, params),
+        )
+
+    async def _request_upstream(
+        self, endpoint: str, params: Optional[Dict] = None
+    ) -> Dict[str, Any]:
+        """Make authenticated request to CarAPI through the circuit breaker"""
+        self.breaker.before_call()
         try:
-            jwt_token = await self._get_jwt_token()
-            headers = {
-                "Authorization": f"Bearer {jwt_token}",
-                "Content-Type": "application/json",
-            }
+            data = await self._get_with_retries(endpoint, params)
+        except CarAPIError as e:
+            logger.error("CarAPI request error: %s", e)
+            if e.retryable:
+                self.breaker.record_failure()
+            else:
+                # CarAPI answered (e.g. 404); it is up, the request was bad
+                self.breaker.record_success()
+            raise
+        except Exception as e:
+            logger.error("CarAPI request error: %s", e)
+            self.breaker.record_failure()
+            raise
+        self.breaker.record_success()
+        return data
+
+    async def _get_with_retries(
+        self, endpoint: str, params: Optional[Dict] = None
+    ) -> Dict[str, Any]:
+        """GET with bounded retries and full-jitter exponential backoff.
+
+        A 429's retry-after is honoured as the minimum wait; when it exceeds
+        CARAPI_MAX_RETRY_WAIT_SECONDS the error is raised at once instead.
+        """
+        import httpx
+
+        attempt = 0
+        while True:
+            try:
+                response = await self._get(endpoint, params)
+                if response.status_code == 200:
+                    return response.json()
+                logger.error(
+                    "CarAPI request failed: %s - %s",
+                    response.status_code,
+                    response.text,
+                )
+                error = CarAPIError(
+                    f"CarAPI request failed: {response.status_code}",
+                    retryable=response.status_code == 429
+                    or response.status_code >= 500,
+                    status_code=response.status_code,
+                    retry_after=retry_after_seconds(response.headers),
+                )
+            except httpx.TransportError as e:
+                error = CarAPIError(
+                    f"CarAPI request failed: {e.__class__.__name__}", retryable=True
+                )
+
+            if not error.retryable or attempt >= settings.CARAPI_MAX_RETRIES:
+                raise error
+            delay = max(
+                error.retry_after or 0.0,
+                random.uniform(0, settings.CARAPI_RETRY_BACKOFF_SECONDS * 2**attempt),
+            )
+            if delay > settings.CARAPI_MAX_RETRY_WAIT_SECONDS:
+                raise error
+            attempt += 1
+            self.retries += 1
+            logger.warning(
+                "Retrying CarAPI %s in %.2fs (attempt %s): %s",
+                endpoint,
+                delay,
+                attempt,
+                error,
+            )
+            await asyncio.sleep(delay)
 
+    async def _get(
+        self, endpoint: str, params: Optional[Dict] = None
+    ) -> "httpx.Response":
+        """One authenticated GET, renewing the token once on a 401"""
+        jwt_token = await self._get_jwt_token()
+        headers = {
+            "Authorization": f"Bearer {jwt_token}",
+            "Content-Type": "application/json",
+        }
+
+        with timed_phase("external"):
             response = await self._client.get(
                 f"{self.base_url}/{endpoint}", params=params, headers=headers
             )
 
-            if response.status_code == 401:
-                # Token might be expired, retry with fresh token
-                logger.info("CarAPI token expired, refreshing...")
-                self._jwt_token = None
-                jwt_token = await self._get_jwt_token()
-                headers["Authorization"] = f"Bearer {jwt_token}"
+        if response.status_code == 401:
+            # Token might be expired or revoked, retry once with a fresh one
+            jwt_token = await self._replace_rejected_token(jwt_token)
+            headers["Authorization"] = f"Bearer {jwt_token}"
 
+            with timed_phase("external"):
                 response = await self._client.get(
                     f"{self.base_url}/{endpoint}", params=params, headers=headers
                 )
 
-            if response.status_code != 200:
-                logger.error(
-                    f"CarAPI request failed: {response.status_code} - {response.text}"
-                )
-                raise Exception(f"CarAPI request failed: {response.status_code}")
+        return response
 
-            return response.json()
+    async def get_years(self) -> List[Dict[str, Any]]:
+        """Get available years (cached)"""
+        return await self.cache.get_or_fetch(catalog_key("years"), self._fetch_years)
+
+    async def get_makes(self, year: int, track: bool = True) -> List[Dict[str, Any]]:
+        """Get available makes for a specific year (cached)"""
+        makes = await self._cached_makes(year)
+        if track:
+            self._prefetch_models(year, makes)
+        return makes
+
+    async def get_models(
+        self, year: int, make: str, track: bool = True
+    ) -> List[Dict[str, Any]]:
+        """Get available models for a specific year and make (cached)"""
+        if track:
+            self.prefetcher.record_make(make)
+        models = await self._cached_models(year, make)
+        if track:
+            self._prefetch_trims(year, make, models)
+        return models
+
+    async def get_trims(
+        self, year: int, make: str, model: str, track: bool = True
+    ) -> List[Dict[str, Any]]:
+        """Get available trims for a specific year, make, and model (cached)"""
+        if track:
+            self.prefetcher.record_model(make, model)
+        return await self._cached_trims(year, make, model)
+
+    async def _cached_makes(self, year: int) -> List[Dict[str, Any]]:
+        return await self.cache.get_or_fetch(
+            catalog_key("makes", {"year": year}), lambda: self._fetch_makes(year)
+        )
+
+    async def _cached_models(self, year: int, make: str) -> List[Dict[str, Any]]:
+        return await self.cache.get_or_fetch(
+            catalog_key("models", {"year": year, "make": make}),
+            lambda: self._fetch_models(year, make),
+        )
+
+    async def _cached_trims(
+        self, year: int, make: str, model: str
+    ) -> List[Dict[str, Any]]:
+        return await self.cache.get_or_fetch(
+            catalog_key("trims", {"year": year, "make": make, "model": model}),
+            lambda: self._fetch_trims(year, make, model),
+        )
+
+    def _prefetch_models(self, year: int, makes: List[Dict[str, Any]]) -> None:
+        """Warm models for the most-picked makes in ``makes``"""
+        if self.breaker.state != CLOSED:
+            return
+        names = {m["make"]: self.prefetcher.make_key(m["make"]) for m in makes}
+        for make in self.prefetcher.popular(names):
+            key = catalog_key("models", {"year": year, "make": make})
+            self.prefetcher.schedule(
+                key,
+                lambda key=key: self.cache.is_fresh(key),
+                lambda make=make: self._cached_models(year, make),
+            )
 
-        except Exception as e:
-            logger.error(f"CarAPI request error: {str(e)}")
-            raise
+    def _prefetch_trims(
+        self, year: int, make: str, models: List[Dict[str, Any]]
+    ) -> None:
+        """Warm trims for the most-picked models in ``models``"""
+        if self.breaker.state != CLOSED:
+            return
+        names = {
+            m["model"]: self.prefetcher.model_key(make, m["model"]) for m in models
+        }
+        for model in self.prefetcher.popular(names):
+            key = catalog_key("trims", {"year": year, "make": make, "model": model})
+            self.prefetcher.schedule(
+                key,
+                lambda key=key: self.cache.is_fresh(key),
+                lambda model=model: self._cached_trims(year, make, model),
+            )
 
-    async def get_years(self) -> List[Dict[str, Any]]:
+    async def _fetch_years(self) -> List[Dict[str, Any]]:
         """Get available years from CarAPI"""
         try:
             data = await self._make_request("years")
@@ -120,11 +374,11 @@ class CarAPIService:
             return years_sorted
 
         except Exception as e:
-            logger.error(f"Error fetching years: {str(e)}")
+            logger.error("Error fetching years: %s", e)
             raise
 
-    async def get_makes(self, year: int) -> List[Dict[str, Any]]:
-        """Get available makes for a specific year"""
+    async def _fetch_makes(self, year: int) -> List[Dict[str, Any]]:
+        """Get available makes for a specific year from CarAPI"""
         try:
             params = {"year": year}
             data = await self._make_request("makes", params)
@@ -146,11 +400,11 @@ class CarAPIService:
             return makes_sorted
 
         except Exception as e:
-            logger.error(f"Error fetching makes for year {year}: {str(e)}")
+            logger.error("Error fetching makes for year %s: %s", year, e)
             raise
 
-    async def get_models(self, year: int, make: str) -> List[Dict[str, Any]]:
-        """Get available models for a specific year and make"""
+    async def _fetch_models(self, year: int, make: str) -> List[Dict[str, Any]]:
+        """Get available models for a specific year and make from CarAPI"""
         try:
             params = {"year": year, "make": make}
             data = await self._make_request("models/v2", params)
@@ -172,11 +426,13 @@ class CarAPIService:
             return models_sorted
 
         except Exception as e:
-            logger.error(f"Error fetching models for {year} {make}: {str(e)}")
+            logger.error("Error fetching models for %s %s: %s", year, make, e)
             raise
 
-    async def get_trims(self, year: int, make: str, model: str) -> List[Dict[str, Any]]:
-        """Get available trims for a specific year, make, and model"""
+    async def _fetch_trims(
+        self, year: int, make: str, model: str
+    ) -> List[Dict[str, Any]]:
+        """Get available trims for a specific year, make, and model from CarAPI"""
         try:
             params = {"year": year, "make": make, "model": model}
             data = await self._make_request("trims/v2", params)
@@ -199,12 +455,55 @@ class CarAPIService:
             return trims_sorted
 
         except Exception as e:
-            logger.error(f"Error fetching trims for {year} {make} {model}: {str(e)}")
+            logger.error("Error fetching trims for %s %s %s: %s", year, make, model, e)
             raise
 
+    async def decode_vin(self, vin: str) -> Dict[str, Any]:
+        """Decode a normalised VIN into vehicle fields (cached permanently)"""
+        return await self.vin_cache.get_or_fetch(
+            catalog_key(f"vin/{vin}"), lambda: self._fetch_vin(vin)
+        )
+
+    async def _fetch_vin(self, vin: str) -> Dict[str, Any]:
+        """Decode a VIN with CarAPI"""
+        try:
+            data = await self._make_request(f"vin/{vin}")
+
+            # The matched trim carries the CarAPI ids used by our pickers:
+            # trim id, make_model id (models/v2) and make id
+            trims = data.get("trims") or []
+            match = next(
+                (t for t in trims if t.get("name") == data.get("trim")),
+                trims[0] if trims else {},
+            )
+            make_model = match.get("make_model") or {}
+
+            return {
+                "vin": vin,
+                "year": data["year"],
+                "brand": data["make"],
+                "brand_id": make_model.get("make_id"),
+                "model": data["model"],
+                "model_id": match.get("make_model_id"),
+                "trim": data.get("trim") or match.get("name"),
+                "trim_id": match.get("id"),
+            }
+
+        except Exception as e:
+            logger.error("Error decoding VIN %s: %s", vin, e)
+            raise
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            **self.flights.stats(),
+            "retries": self.retries,
+            "token_refreshes": self.token_refreshes,
+            "token_ttl_seconds": max(0.0, self._jwt_expires_at - time.time()),
+        }
+
     async def close(self):
         """Close the HTTP client"""
-        await self._client.aclose()
+        await http_clients.close("carapi")
 
 
 # Global instance
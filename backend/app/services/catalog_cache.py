@@ -0,0 +1,259 @@
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, Optional, Set, Tuple
+
+from app.core.config import settings
+from app.core.metrics import create_background_task
+
+logger = logging.getLogger(__name__)
+
+
+def catalog_key(endpoint: str, params: Optional[Dict[str, Any]] = None) -> str:
+    """Stable cache key for an endpoint and its query parameters"""
+    if not params:
+        return endpoint
+    query = "&".join(f"{name}={params[name]}" for name in sorted(params))
+    return f"{endpoint}?{query}"
+
+
+class CatalogCache:
+    """Two-tier cache for CarAPI catalog data (years/makes/models/trims).
+
+    An in-memory LRU sits in front of a SQLite file, so the catalog survives
+    restarts. Entries are fresh for ``ttl_seconds``; after that they are still
+    served immediately while a background task refreshes them
+    (stale-while-revalidate). Entries older than ``max_stale_seconds`` are
+    refetched inline, but if upstream fails the stale value is served anyway.
+
+    Only the memory tier is touched on the event loop. SQLite reads, writes
+    and commits all run on one dedicated thread, which owns the connection;
+    writes are queued without waiting, and ``close`` drains them.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_entries: int,
+        ttl_seconds: float,
+        max_stale_seconds: float,
+    ):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_stale_seconds = max_stale_seconds
+        self._memory: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        self._disk_thread: Optional[ThreadPoolExecutor] = None
+        self._refreshing: Set[str] = set()
+        self._tasks: Set[asyncio.Task] = set()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.stale_served = 0
+        self.refreshes = 0
+        self.refresh_failures = 0
+
+    def _disk(self) -> Optional[ThreadPoolExecutor]:
+        if not self.path:
+            return None
+        with self._lock:
+            if self._disk_thread is None:
+                self._disk_thread = ThreadPoolExecutor(
+                    max_workers=1, thread_name_prefix="catalog-cache"
+                )
+            return self._disk_thread
+
+    # The methods below run on the disk thread only
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._db is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._db = sqlite3.connect(self.path)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS catalog ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, fetched_at REAL NOT NULL)"
+            )
+        return self._db
+
+    def _read(self, key: str) -> Optional[Tuple[float, Any]]:
+        try:
+            row = (
+                self._connection()
+                .execute("SELECT fetched_at, value FROM catalog WHERE key = ?", (key,))
+                .fetchone()
+            )
+        except sqlite3.Error as e:
+            logger.warning("Catalog cache read failed for %s: %s", key, e)
+            return None
+        return (row[0], json.loads(row[1])) if row else None
+
+    def _write(self, key: str, entry: Tuple[float, Any]) -> None:
+        try:
+            db = self._connection()
+            with db:
+                db.execute(
+                    "INSERT OR REPLACE INTO catalog (key, value, fetched_at) "
+                    "VALUES (?, ?, ?)",
+                    (key, json.dumps(entry[1]), entry[0]),
+                )
+        except sqlite3.Error as e:
+            logger.warning("Catalog cache write failed for %s: %s", key, e)
+
+    def _delete_all(self) -> None:
+        db = self._connection()
+        with db:
+            db.execute("DELETE FROM catalog")
+
+    def _close_connection(self) -> None:
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    async def get(self, key: str) -> Optional[Tuple[float, Any]]:
+        """Return (fetched_at, value) from memory, then disk, or None"""
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return entry
+
+        disk = self._disk()
+        if disk is not None:
+            entry = await asyncio.get_running_loop().run_in_executor(
+                disk, self._read, key
+            )
+
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+                return None
+            # A set() while we were reading holds the newer value
+            entry = self._memory.setdefault(key, entry)
+            self._remember(key, entry)
+            self.disk_hits += 1
+            return entry
+
+    def is_fresh(self, key: str) -> bool:
+        """Whether ``key`` is in memory and within its TTL, without counting a
+        hit or miss (an entry only on disk is loaded by the next get)"""
+        with self._lock:
+            entry = self._memory.get(key)
+        return entry is not None and time.time() - entry[0] < self.ttl_seconds
+
+    def set(self, key: str, value: Any, fetched_at: Optional[float] = None) -> None:
+        """Store in memory now and queue the disk write"""
+        entry = (fetched_at if fetched_at is not None else time.time(), value)
+        with self._lock:
+            self._remember(key, entry)
+        disk = self._disk()
+        if disk is not None:
+            disk.submit(self._write, key, entry)
+
+    def _remember(self, key: str, entry: Tuple[float, Any]) -> None:
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    async def get_or_fetch(self, key: str, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """Serve ``key`` from cache, calling ``fetch`` on a miss or when stale"""
+        entry = await self.get(key)
+        if entry is None:
+            value = await fetch()
+            self.set(key, value)
+            return value
+
+        fetched_at, value = entry
+        age = time.time() - fetched_at
+        if age < self.ttl_seconds:
+            return value
+
+        if age < self.max_stale_seconds:
+            self.stale_served += 1
+            self._refresh_in_background(key, fetch)
+            return value
+
+        try:
+            value = await fetch()
+        except Exception as e:
+            # Too old to serve without trying, but better than an error
+            logger.warning("Serving expired catalog entry %s: %s", key, e)
+            self.stale_served += 1
+            return value
+        self.set(key, value)
+        return value
+
+    def _refresh_in_background(
+        self, key: str, fetch: Callable[[], Awaitable[Any]]
+    ) -> None:
+        if key in self._refreshing:
+            return
+        self._refreshing.add(key)
+        task = create_background_task(self._refresh(key, fetch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _refresh(self, key: str, fetch: Callable[[], Awaitable[Any]]) -> None:
+        try:
+            self.set(key, await fetch())
+            self.refreshes += 1
+        except Exception as e:
+            self.refresh_failures += 1
+            logger.warning("Background refresh of catalog entry %s failed: %s", key, e)
+        finally:
+            self._refreshing.discard(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+        disk = self._disk()
+        if disk is not None:
+            disk.submit(self._delete_all)
+
+    def close(self) -> None:
+        """Finish queued disk writes and close the SQLite connection"""
+        with self._lock:
+            disk, self._disk_thread = self._disk_thread, None
+        if disk is not None:
+            disk.submit(self._close_connection)
+            disk.shutdown(wait=True)
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "memory_entries": len(self._memory),
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "stale_served": self.stale_served,
+            "refreshes": self.refreshes,
+            "refresh_failures": self.refresh_failures,
+            "refreshing": len(self._refreshing),
+        }
+
+
+catalog_cache = CatalogCache(
+    path=settings.CARAPI_CACHE_PATH,
+    max_entries=settings.CARAPI_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.CARAPI_CACHE_TTL_SECONDS,
+    max_stale_seconds=settings.CARAPI_CACHE_MAX_STALE_SECONDS,
+)
+
+# A VIN's decode never changes, so entries never go stale
+vin_decode_cache = CatalogCache(
+    path=settings.CARAPI_VIN_CACHE_PATH,
+    max_entries=settings.CARAPI_VIN_CACHE_MAX_ENTRIES,
+    ttl_seconds=float("inf"),
+    max_stale_seconds=float("inf"),
+)
@@ -0,0 +1,132 @@
+import asyncio
+import hashlib
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Set
+
+from app.core.metrics import create_background_task
+
+logger = logging.getLogger(__name__)
+
+
+class CountMinSketch:
+    """Approximate per-key counts in fixed memory.
+
+    ``depth`` rows of ``width`` counters; a key increments one counter per
+    row and its estimate is the smallest of them, so estimates never
+    undercount. Every ``decay_interval`` additions all counters are halved,
+    so popularity follows recent traffic.
+    """
+
+    def __init__(self, width: int = 2048, depth: int = 4, decay_interval: int = 10000):
+        self.width = width
+        self.depth = depth
+        self.decay_interval = decay_interval
+        self._rows = [[0] * width for _ in range(depth)]
+        self._additions = 0
+
+    def _indexes(self, key: str) -> List[int]:
+        digest = hashlib.blake2b(key.encode(), digest_size=4 * self.depth).digest()
+        return [
+            int.from_bytes(digest[4 * row : 4 * row + 4], "little") % self.width
+            for row in range(self.depth)
+        ]
+
+    def add(self, key: str, count: int = 1) -> None:
+        for row, index in zip(self._rows, self._indexes(key)):
+            row[index] += count
+        self._additions += 1
+        if self.decay_interval and self._additions >= self.decay_interval:
+            self.decay()
+
+    def estimate(self, key: str) -> int:
+        return min(row[index] for row, index in zip(self._rows, self._indexes(key)))
+
+    def decay(self) -> None:
+        for row in self._rows:
+            for i, value in enumerate(row):
+                row[i] = value >> 1
+        self._additions = 0
+
+
+class CatalogPrefetcher:
+    """Warms the catalog cache for the children users are likely to pick next.
+
+    The CarAPI pickers go year -> makes -> models -> trims. Picking a make or
+    model is counted in a count-min sketch keyed by name, not by year, so
+    popularity learnt on one year carries over to years never requested.
+    When a list of makes (or models) is served, the ``top_n`` most popular
+    entries that appear in it have their models (or trims) fetched in the
+    background, so the next dropdown is a cache hit.
+    """
+
+    def __init__(
+        self,
+        sketch: CountMinSketch,
+        top_n: int,
+        concurrency: int,
+        enabled: bool = True,
+    ):
+        self.sketch = sketch
+        self.top_n = top_n
+        self.enabled = enabled
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._pending: Set[str] = set()
+        self._tasks: Set[asyncio.Task] = set()
+        self.scheduled = 0
+        self.completed = 0
+        self.failed = 0
+
+    @staticmethod
+    def make_key(make: str) -> str:
+        return f"make:{make.lower()}"
+
+    @staticmethod
+    def model_key(make: str, model: str) -> str:
+        return f"model:{make.lower()}:{model.lower()}"
+
+    def record_make(self, make: str) -> None:
+        self.sketch.add(self.make_key(make))
+
+    def record_model(self, make: str, model: str) -> None:
+        self.sketch.add(self.model_key(make, model))
+
+    def popular(self, keys: Dict[str, str]) -> List[str]:
+        """The ``top_n`` names in ``keys`` (name -> sketch key) seen at least
+        once, most popular first"""
+        scored = [(self.sketch.estimate(key), name) for name, key in keys.items()]
+        ranked = sorted((s for s in scored if s[0] > 0), key=lambda s: -s[0])
+        return [name for _, name in ranked[: self.top_n]]
+
+    def schedule(
+        self,
+        cache_key: str,
+        is_cached: Callable[[], bool],
+        fetch: Callable[[], Awaitable[Any]],
+    ) -> None:
+        """Run ``fetch`` in the background unless cached or already queued"""
+        if not self.enabled or cache_key in self._pending or is_cached():
+            return
+        self._pending.add(cache_key)
+        self.scheduled += 1
+        task = create_background_task(self._run(cache_key, fetch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, cache_key: str, fetch: Callable[[], Awaitable[Any]]) -> None:
+        try:
+            async with self._semaphore:
+                await fetch()
+            self.completed += 1
+        except Exception as e:
+            self.failed += 1
+            logger.info("Catalog prefetch of %s failed: %s", cache_key, e)
+        finally:
+            self._pending.discard(cache_key)
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "scheduled": self.scheduled,
+            "completed": self.completed,
+            "failed": self.failed,
+            "pending": len(self._pending),
+        }
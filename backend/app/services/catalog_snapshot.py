@@ -0,0 +1,357 @@
+import asyncio
+import heapq
+import json
+import logging
+import os
+import re
+import time
+from bisect import bisect_left
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from app.core.config import settings
+from app.core.metrics import create_background_task
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_FORMAT = 1
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+def _words(text: str) -> List[str]:
+    return _WORD.findall(text.lower())
+
+
+def _within_one_edit(a: str, b: str) -> bool:
+    """True if ``a`` and ``b`` differ by at most one insert, delete,
+    substitution or swap of adjacent letters ("hodna" / "honda")"""
+    if abs(len(a) - len(b)) > 1:
+        return False
+    if len(a) > len(b):
+        a, b = b, a
+    i = 0
+    while i < len(a) and a[i] == b[i]:
+        i += 1
+    if len(a) < len(b):
+        return a[i:] == b[i + 1 :]
+    if a[i + 1 :] == b[i + 1 :]:
+        return True
+    return (
+        i + 1 < len(a)
+        and a[i] == b[i + 1]
+        and a[i + 1] == b[i]
+        and a[i + 2 :] == b[i + 2 :]
+    )
+
+
+class CatalogSnapshot:
+    """Read-only year -> make -> model -> trim catalog searched in memory.
+
+    The file holds sorted, de-duplicated name tables (makes, models, trims)
+    and one row per (year, make, model) that points into them, so the whole
+    CarAPI catalog is a few hundred KB of JSON. On load a sorted word list is
+    built over every make/model/trim name; ``bisect`` over it is the prefix
+    index, and each word maps to the set of rows containing it.
+    """
+
+    def __init__(self, data: Dict[str, Any]):
+        if data.get("format") != SNAPSHOT_FORMAT:
+            raise ValueError(
+                f"Unsupported catalog snapshot format: {data.get('format')}"
+            )
+        self.built_at: float = data["built_at"]
+        self.makes: List[Tuple[str, int]] = [tuple(m) for m in data["makes"]]
+        self.models: List[str] = data["models"]
+        self.trims: List[str] = data["trims"]
+        # [year, make index, model index, model id, [trim indexes]]
+        self.rows: List[List[Any]] = data["rows"]
+
+        postings: Dict[str, Set[int]] = {}
+        self._rows_by_year: Dict[int, Set[int]] = {}
+        for row_id, (year, make, model, _, trims) in enumerate(self.rows):
+            self._rows_by_year.setdefault(year, set()).add(row_id)
+            names = [self.makes[make][0], self.models[model]]
+            names.extend(self.trims[t] for t in trims)
+            for name in names:
+                for word in _words(name):
+                    postings.setdefault(word, set()).add(row_id)
+        self._vocabulary = sorted(postings)
+        self._postings = [postings[word] for word in self._vocabulary]
+        # Typeahead resends the same misspelt token on every keystroke
+        self._fuzzy_cache: Dict[str, Set[int]] = {}
+
+    @classmethod
+    def load(cls, path: str) -> Optional["CatalogSnapshot"]:
+        """Load a snapshot file, or return None if none has been built"""
+        try:
+            with open(path, encoding="utf-8") as f:
+                return cls(json.load(f))
+        except FileNotFoundError:
+            return None
+
+    def _prefix_range(self, prefix: str) -> range:
+        start = bisect_left(self._vocabulary, prefix)
+        end = bisect_left(self._vocabulary, prefix + "\uffff", start)
+        return range(start, end)
+
+    def _rows_for_word(self, token: str) -> Tuple[Set[int], bool]:
+        """Rows matching ``token`` by prefix, else by one typo; and whether
+        the match was fuzzy"""
+        matched = self._prefix_range(token)
+        if matched:
+            rows: Set[int] = set()
+            for i in matched:
+                rows |= self._postings[i]
+            return rows, False
+
+        cached = self._fuzzy_cache.get(token)
+        if cached is not None:
+            return cached, True
+
+        rows = set()
+        if len(token) >= 3:
+            # Typos rarely hit the first letter; only scan words sharing it
+            for i in self._prefix_range(token[0]):
+                word = self._vocabulary[i]
+                # Compare against prefixes so "civc" still finds "civic"
+                if any(
+                    _within_one_edit(token, word[:n])
+                    for n in (len(token) - 1, len(token), len(token) + 1)
+                ):
+                    rows |= self._postings[i]
+        if len(self._fuzzy_cache) >= 1024:
+            self._fuzzy_cache.clear()
+        self._fuzzy_cache[token] = rows
+        return rows, True
+
+    def search(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """Match "2019 hon civ"-style queries: four-digit tokens filter by
+        year, every other token must prefix (or nearly) match a make, model
+        or trim word"""
+        candidates: Optional[Set[int]] = None
+        fuzzy = 0
+        for token in _words(query):
+            if len(token) == 4 and token.isdigit():
+                rows = self._rows_by_year.get(int(token), set())
+            else:
+                rows, was_fuzzy = self._rows_for_word(token)
+                fuzzy += was_fuzzy
+            candidates = rows if candidates is None else candidates & rows
+            if not candidates:
+                return []
+        if candidates is None:
+            return []
+
+        # Rows are stored newest year first, then by make and model
+        return [
+            self._row_result(row_id, fuzzy > 0)
+            for row_id in heapq.nsmallest(limit, candidates)
+        ]
+
+    def _row_result(self, row_id: int, fuzzy: bool) -> Dict[str, Any]:
+        year, make, model, model_id, trims = self.rows[row_id]
+        make_name, make_id = self.makes[make]
+        return {
+            "year": year,
+            "make": make_name,
+            "make_id": make_id,
+            "model": self.models[model],
+            "model_id": model_id,
+            "trims": [self.trims[t] for t in trims],
+            "fuzzy": fuzzy,
+        }
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "rows": len(self.rows),
+            "words": len(self._vocabulary),
+            "built_at": self.built_at,
+        }
+
+
+def encode_snapshot(
+    entries: Iterable[Tuple[int, str, int, str, int, List[str]]],
+) -> Dict[str, Any]:
+    """Pack (year, make, make_id, model, model_id, trims) tuples into the
+    compact snapshot layout"""
+    entries = list(entries)
+    make_ids: Dict[str, int] = {}
+    models: Set[str] = set()
+    trims: Set[str] = set()
+    for _, make, make_id, model, _, model_trims in entries:
+        make_ids.setdefault(make, make_id)
+        models.add(model)
+        trims.update(model_trims)
+
+    make_names = sorted(make_ids)
+    model_names = sorted(models)
+    trim_names = sorted(trims)
+    make_index = {name: i for i, name in enumerate(make_names)}
+    model_index = {name: i for i, name in enumerate(model_names)}
+    trim_index = {name: i for i, name in enumerate(trim_names)}
+
+    # Newest year first, then make and model alphabetically (the name tables
+    # are sorted, so their indexes order the same way)
+    rows = sorted(
+        (
+            [
+                year,
+                make_index[make],
+                model_index[model],
+                model_id,
+                sorted(trim_index[t] for t in set(model_trims)),
+            ]
+            for year, make, _, model, model_id, model_trims in entries
+        ),
+        key=lambda row: (-row[0], row[1], row[2]),
+    )
+
+    return {
+        "format": SNAPSHOT_FORMAT,
+        "built_at": time.time(),
+        "makes": [[name, make_ids[name]] for name in make_names],
+        "models": model_names,
+        "trims": trim_names,
+        "rows": rows,
+    }
+
+
+async def build_snapshot(
+    carapi: Any, years: Optional[List[int]] = None, concurrency: int = 4
+) -> Dict[str, Any]:
+    """Walk the CarAPI hierarchy (through the catalog cache) into a snapshot"""
+    if years is None:
+        years = [entry["year"] for entry in await carapi.get_years()]
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def limited(call):
+        async with semaphore:
+            return await call
+
+    async def model_entries(year: int, make: Dict[str, Any]):
+        models = await limited(carapi.get_models(year, make["make"], track=False))
+        trims = await asyncio.gather(
+            *(
+                limited(
+                    carapi.get_trims(year, make["make"], model["model"], track=False)
+                )
+                for model in models
+            )
+        )
+        return [
+            (
+                year,
+                make["make"],
+                make["make_id"],
+                model["model"],
+                model["model_id"],
+                [trim["trim"] for trim in model_trims],
+            )
+            for model, model_trims in zip(models, trims)
+        ]
+
+    entries = []
+    for year in years:
+        makes = await limited(carapi.get_makes(year, track=False))
+        for year_entries in await asyncio.gather(
+            *(model_entries(year, make) for make in makes)
+        ):
+            entries.extend(year_entries)
+        logger.info("Catalog snapshot: %s done, %s models so far", year, len(entries))
+    return encode_snapshot(entries)
+
+
+def write_snapshot(data: Dict[str, Any], path: str) -> None:
+    """Write ``data`` to ``path`` atomically so readers never see half a file"""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, separators=(",", ":"))
+    os.replace(tmp_path, path)
+
+
+class CatalogSnapshotStore:
+    """Holds the loaded snapshot and runs at most one rebuild at a time.
+
+    Reading the file and building the search index take a while for the
+    full catalog, so both run in a worker thread: ``load()`` at startup and
+    ``rebuild()`` afterwards. ``get()`` only returns what is already loaded.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._snapshot: Optional[CatalogSnapshot] = None
+        self._build: Optional[asyncio.Task] = None
+        self._on_load: List[Callable[[CatalogSnapshot], None]] = []
+        self.last_error: Optional[str] = None
+
+    def get(self) -> Optional[CatalogSnapshot]:
+        return self._snapshot
+
+    def on_load(self, callback: Callable[[CatalogSnapshot], None]) -> None:
+        """Call ``callback`` with every snapshot loaded or rebuilt from now on.
+
+        It runs in the same worker thread, before ``get()`` returns the new
+        snapshot, so indexes derived from it are never built on the loop.
+        """
+        self._on_load.append(callback)
+
+    def _prepare(
+        self, snapshot: Optional[CatalogSnapshot]
+    ) -> Optional[CatalogSnapshot]:
+        if snapshot is not None:
+            for callback in self._on_load:
+                callback(snapshot)
+        return snapshot
+
+    async def load(self) -> None:
+        """Load the snapshot file, if one has been built"""
+        try:
+            self._snapshot = await asyncio.to_thread(
+                lambda: self._prepare(CatalogSnapshot.load(self.path))
+            )
+        except Exception as e:
+            self.last_error = str(e)
+            logger.error("Failed to load catalog snapshot %s: %s", self.path, e)
+
+    @property
+    def building(self) -> bool:
+        return self._build is not None and not self._build.done()
+
+    def start_rebuild(self, carapi: Any, years: Optional[List[int]] = None) -> bool:
+        """Start a background rebuild; False if one is already running"""
+        if self.building:
+            return False
+        self._build = create_background_task(self.rebuild(carapi, years))
+        # Failures are logged and kept in last_error; don't warn again
+        self._build.add_done_callback(lambda t: t.cancelled() or t.exception())
+        return True
+
+    async def rebuild(self, carapi: Any, years: Optional[List[int]] = None) -> None:
+        try:
+            data = await build_snapshot(
+                carapi, years, settings.CARAPI_SNAPSHOT_CONCURRENCY
+            )
+            await asyncio.to_thread(write_snapshot, data, self.path)
+            self._snapshot = await asyncio.to_thread(
+                lambda: self._prepare(CatalogSnapshot(data))
+            )
+            self.last_error = None
+            logger.info("Catalog snapshot rebuilt: %s rows", len(data["rows"]))
+        except Exception as e:
+            self.last_error = str(e)
+            logger.error("Catalog snapshot rebuild failed: %s", e)
+            raise
+
+    def status(self) -> Dict[str, Any]:
+        snapshot = self.get()
+        return {
+            "building": self.building,
+            "last_error": self.last_error,
+            **(snapshot.stats() if snapshot else {"rows": 0}),
+        }
+
+
+catalog_snapshot_store = CatalogSnapshotStore(settings.CARAPI_SNAPSHOT_PATH)
@@ -1,22 +1,64 @@
-import httpx
+import asyncio
 import logging
-from typing import List, Tuple
+import random
+import time
+from typing import Any, Dict, List, Tuple
 
 from app.core.config import settings
+from app.core.http_clients import UpstreamConfig, http_clients, retry_after_seconds
+from app.core.metrics import timed_phase
 from app.models.vehicle import Vehicle
 from app.models.maintenance import Maintenance
+from app.utils.concurrency_limiter import ConcurrencyLimiter
+
+# Anthropic signals rate limiting with 429 and overload with 529
+RETRYABLE_STATUSES = (429, 529)
+
+
+class ClaudeRateLimitError(Exception):
+    """Claude was still rate limited or overloaded after all retries"""
+
+    def __init__(self, status_code: int, retry_after: float):
+        super().__init__(f"Claude API returned {status_code} after retries")
+        self.status_code = status_code
+        # Seconds until Claude is expected to accept calls again
+        self.retry_after = retry_after
 
 
 class ClaudeService:
     def __init__(self):
         self.api_key = settings.CLAUDE_API_KEY
-        self.api_url = "https://api.anthropic.com/v1/messages"
+        self.api_url = settings.CLAUDE_API_URL
         self.logger = logging.getLogger(__name__)
+        http_clients.register(
+            "claude",
+            UpstreamConfig(
+                max_connections=settings.CLAUDE_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.CLAUDE_MAX_KEEPALIVE_CONNECTIONS,
+                timeout=settings.CLAUDE_TIMEOUT_SECONDS,
+                connect_timeout=10.0,
+                keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY_SECONDS,
+                http2=settings.HTTP2_ENABLED,
+            ),
+        )
+        self.limiter = ConcurrencyLimiter(
+            settings.CLAUDE_MAX_CONCURRENCY, settings.CLAUDE_MAX_QUEUE
+        )
+        # Monotonic time before which no call is sent, set from 429s so every
+        # caller backs off together instead of each finding out separately
+        self._resume_at = 0.0
+        self.rate_limited = 0
+        self.retries = 0
 
     async def get_maintenance_recommendations(
         self, vehicle: Vehicle, maintenance_records: List[Maintenance]
     ) -> Tuple[str, str, str]:
-        """Get maintenance recommendations from Claude API for a specific vehicle"""
+        """Get maintenance recommendations from Claude API for a specific vehicle.
+
+        Calls share a concurrency limit; raises QueueFullError without
+        calling Claude when too many are already waiting, and
+        ClaudeRateLimitError when Claude keeps answering 429/529.
+        """
 
         if not self.api_key:
             raise ValueError("Claude API key not configured")
@@ -69,24 +111,17 @@ Please organize your recommendations in the following format:
 
 Please be specific about mileage intervals and include estimated costs where appropriate."""
 
-        # Make API request
-        async with httpx.AsyncClient() as client:
+        import httpx
+
+        async with self.limiter.slot():
             try:
-                response = await client.post(
-                    self.api_url,
-                    headers={
-                        "x-api-key": self.api_key,
-                        "anthropic-version": "2023-06-01",
-                        "content-type": "application/json",
-                    },
-                    json={
+                response = await self._post(
+                    {
                         "model": "claude-3-5-sonnet-20241022",
                         "max_tokens": 1024,
                         "messages": [{"role": "user", "content": prompt}],
-                    },
-                    timeout=30.0,
+                    }
                 )
-
                 response.raise_for_status()
 
                 result = response.json()
@@ -97,13 +132,68 @@ Please be specific about mileage intervals and include estimated costs where app
                 else:
                     raise ValueError("Unexpected response format from Claude API")
 
+            except ClaudeRateLimitError:
+                self.logger.error("Claude API still rate limited after retries")
+                raise
             except httpx.HTTPStatusError as e:
-                self.logger.error(f"Claude API HTTP error: {e}")
+                self.logger.error("Claude API HTTP error: %s", e)
                 raise Exception(f"Failed to get recommendations: {str(e)}")
             except Exception as e:
-                self.logger.error(f"Claude API error: {e}")
+                self.logger.error("Claude API error: %s", e)
                 raise Exception(f"Failed to get recommendations: {str(e)}")
 
+    async def _post(self, payload: Dict[str, Any]) -> Any:
+        """POST to the Messages API over the shared pool, retrying 429/529.
+
+        The wait is the response's retry-after when present (capped at
+        CLAUDE_MAX_RETRY_WAIT_SECONDS), otherwise full-jitter exponential
+        backoff. Raises ClaudeRateLimitError once retries run out.
+        """
+        client = http_clients.get("claude")
+        attempt = 0
+        while True:
+            delay = self._resume_at - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            with timed_phase("external"):
+                response = await client.post(
+                    self.api_url,
+                    headers={
+                        "x-api-key": self.api_key,
+                        "anthropic-version": "2023-06-01",
+                        "content-type": "application/json",
+                    },
+                    json=payload,
+                )
+            if response.status_code not in RETRYABLE_STATUSES:
+                return response
+
+            self.rate_limited += 1
+            wait = retry_after_seconds(response.headers)
+            if wait is None:
+                wait = random.uniform(
+                    0, settings.CLAUDE_RETRY_BACKOFF_SECONDS * 2**attempt
+                )
+            wait = min(wait, settings.CLAUDE_MAX_RETRY_WAIT_SECONDS)
+            self._resume_at = max(self._resume_at, time.monotonic() + wait)
+            if attempt >= settings.CLAUDE_MAX_RETRIES:
+                raise ClaudeRateLimitError(response.status_code, wait)
+            attempt += 1
+            self.retries += 1
+            self.logger.warning(
+                "Claude API returned %s, retrying in %.1fs",
+                response.status_code,
+                wait,
+            )
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            **self.limiter.stats(),
+            "rate_limited": self.rate_limited,
+            "retries": self.retries,
+            "backoff_seconds": max(0.0, self._resume_at - time.monotonic()),
+        }
+
     def _format_maintenance_table(self, records: List[Maintenance]) -> str:
         """Format maintenance records as a table for the prompt"""
 
@@ -0,0 +1,74 @@
+import csv
+import io
+import json
+import logging
+from typing import Any, Dict, Iterator
+
+from app.services.neo4j_service import Neo4jService, neo4j_service
+
+logger = logging.getLogger(__name__)
+
+# Union of the properties emitted by Neo4jService.iter_user_export_rows, in the
+# order they appear in the CSV header.
+EXPORT_COLUMNS = [
+    "record_type",
+    "id",
+    "vehicle_id",
+    "brand",
+    "model",
+    "year",
+    "trim",
+    "vin",
+    "license_plate",
+    "license_state",
+    "current_mileage",
+    "service_type",
+    "mileage",
+    "service_date",
+    "description",
+    "cost",
+    "service_provider",
+    "recommendations",
+    "created_at",
+]
+
+
+class ExportService:
+    """Streams a user's full history as NDJSON or CSV without buffering it"""
+
+    def __init__(self, db: Neo4jService):
+        self.db = db
+
+    def _rows(self, owner_id: str) -> Iterator[Dict[str, Any]]:
+        count = 0
+        try:
+            for row in self.db.iter_user_export_rows(owner_id):
+                count += 1
+                yield row
+        finally:
+            logger.info("Exported %s rows for user %s", count, owner_id)
+
+    def stream_ndjson(self, owner_id: str) -> Iterator[str]:
+        """Yield one JSON document per line"""
+        for row in self._rows(owner_id):
+            yield json.dumps(row, default=str) + "\n"
+
+    def stream_csv(self, owner_id: str) -> Iterator[str]:
+        """Yield a CSV header followed by one line per row"""
+        # A single small buffer is reused for every line so memory stays flat
+        buffer = io.StringIO()
+        writer = csv.DictWriter(
+            buffer, fieldnames=EXPORT_COLUMNS, extrasaction="ignore"
+        )
+
+        writer.writeheader()
+        yield buffer.getvalue()
+
+        for row in self._rows(owner_id):
+            buffer.seek(0)
+            buffer.truncate(0)
+            writer.writerow(row)
+            yield buffer.getvalue()
+
+
+export_service = ExportService(neo4j_service)
@@ -1,16 +1,112 @@
 import logging
 import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
 from datetime import datetime
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, Callable, Iterator, List
 from neo4j import GraphDatabase
 from neo4j.exceptions import Neo4jError, ConstraintError
 
 from app.core.config import settings
-from app.core.security import get_password_hash, verify_password
+from app.core.metrics import timed_phase
+from app.core.security import password_hasher, token_revocation_list
 from app.models.user import UserCreate, User, UserInDB
 from app.models.vehicle import VehicleCreate, Vehicle
 from app.models.maintenance import Maintenance
+from app.models.dashboard import Dashboard, DashboardVehicle
 from app.models.recommendation import Recommendation, ClaudeAPILog
+from app.services.user_cache import user_cache
+
+# Every write to a vehicle or anything hanging off it bumps the vehicle's and
+# its owner's data_version; conditional GETs derive their ETags from these
+BUMP_DATA_VERSIONS = (
+    "v.data_version = coalesce(v.data_version, 0) + 1, "
+    "u.data_version = coalesce(u.data_version, 0) + 1"
+)
+
+# User properties that are embedded in (or guard) issued tokens
+TOKEN_REVOKING_FIELDS = {"email", "password", "role", "account_active"}
+
+
+def _map_projection(variable: str, fields: List[str], params: Dict[str, str]) -> str:
+    """Cypher map projection of whitelisted properties.
+
+    Names in ``params`` are not stored on the node and are filled from the
+    query parameter of the same name instead (e.g. a vehicle's owner_id).
+    """
+    entries = [
+        f"{name}: ${params[name]}" if name in params else f".{name}" for name in fields
+    ]
+    return f"{variable} {{{', '.join(entries)}}}"
+
+
+class _TimedSession:
+    """Session wrapper that attributes its ``with`` block to the db request phase"""
+
+    def __init__(self, session):
+        self._session = session
+        self._phase = timed_phase("db")
+
+    def __enter__(self):
+        self._phase.__enter__()
+        return self._session.__enter__()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        try:
+            return self._session.__exit__(exc_type, exc_value, traceback)
+        finally:
+            self._phase.__exit__(None, None, None)
+
+    def __getattr__(self, name):
+        return getattr(self._session, name)
+
+
+class _TransactionSession:
+    """Stand-in session for queries issued inside Neo4jService.transaction().
+
+    Queries join the open transaction; leaving the ``with`` block neither
+    commits nor closes anything, that is left to transaction().
+    """
+
+    def __init__(self, tx):
+        self._tx = tx
+        self._phase = timed_phase("db")
+
+    def __enter__(self):
+        self._phase.__enter__()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._phase.__exit__(None, None, None)
+        return False
+
+    def run(self, query, parameters=None, **kwargs):
+        return self._tx.run(query, parameters, **kwargs)
+
+
+class _ActiveTransaction:
+    """The open transaction of a task, and what to run once it commits"""
+
+    def __init__(self, tx):
+        self.tx = tx
+        self.callbacks: List[Callable[[], None]] = []
+
+
+_active_transaction: ContextVar[Optional[_ActiveTransaction]] = ContextVar(
+    "neo4j_active_transaction", default=None
+)
+
+
+def after_commit(callback: Callable[[], None]) -> None:
+    """Run an in-memory side effect of a write (cache invalidation, token
+    revocation, ...) once the write is durable: when the task's
+    Neo4jService.transaction() commits, or at once outside one. A rolled
+    back transaction drops it."""
+    active = _active_transaction.get()
+    if active is None:
+        callback()
+    else:
+        active.callbacks.append(callback)
 
 
 class Neo4jService:
@@ -32,23 +128,64 @@ class Neo4jService:
             self.driver.close()
 
     def get_session(self):
+        active = _active_transaction.get()
+        if active is not None:
+            return _TransactionSession(active.tx)
         if not self.driver:
             self.connect()
-        return self.driver.session()
+        return _TimedSession(self.driver.session())
+
+    @contextmanager
+    def transaction(self) -> Iterator[None]:
+        """Run every query issued by this service inside the block in one
+        explicit transaction, committed on success and rolled back on error.
+
+        The transaction is tracked per task, so concurrent requests are not
+        affected. Nested calls join the outer transaction. Callbacks passed to
+        after_commit() inside the block run only once it has committed.
+        """
+        if _active_transaction.get() is not None:
+            yield
+            return
+
+        if not self.driver:
+            self.connect()
+        with self.driver.session() as session:
+            tx = session.begin_transaction()
+            active = _ActiveTransaction(tx)
+            token = _active_transaction.set(active)
+            try:
+                yield
+                with timed_phase("db"):
+                    tx.commit()
+            except BaseException:
+                if not tx.closed():
+                    tx.rollback()
+                raise
+            finally:
+                _active_transaction.reset(token)
+
+        for callback in active.callbacks:
+            try:
+                callback()
+            except Exception as e:
+                self.logger.error("Post-commit callback failed: %s", e)
 
     # User management methods
     async def create_user(self, user_data: UserCreate) -> UserInDB:
         """Create a new user in Neo4j"""
         user_id = str(uuid.uuid4())
-        self.logger.info(f"Creating user with ID {user_id} for email {user_data.email}")
+        self.logger.info(
+            "Creating user with ID %s for email %s", user_id, user_data.email
+        )
 
         try:
-            hashed_password = get_password_hash(user_data.password)
+            hashed_password = await password_hasher.hash(user_data.password)
             self.logger.debug(
-                f"Password hashed successfully for user {user_data.email}"
+                "Password hashed successfully for user %s", user_data.email
             )
         except Exception as e:
-            self.logger.error(f"Failed to hash password for {user_data.email}: {e}")
+            self.logger.error("Failed to hash password for %s: %s", user_data.email, e)
             raise Exception(f"Password hashing failed: {str(e)}")
 
         try:
@@ -59,7 +196,8 @@ class Neo4jService:
                 )
                 if check_result.single():
                     self.logger.warning(
-                        f"Attempted to create duplicate user with email {user_data.email}"
+                        "Attempted to create duplicate user with email %s",
+                        user_data.email,
                     )
                     raise Exception("Email already exists")
 
@@ -110,7 +248,7 @@ class Neo4jService:
                 if record:
                     node = record["u"]
                     self.logger.info(
-                        f"User created successfully in database with ID {user_id}"
+                        "User created successfully in database with ID %s", user_id
                     )
                     return UserInDB(
                         id=node["id"],
@@ -148,25 +286,27 @@ class Neo4jService:
                     )
                 else:
                     self.logger.error(
-                        f"No record returned after creating user {user_data.email}"
+                        "No record returned after creating user %s", user_data.email
                     )
                     raise Exception("Failed to create user - no record returned")
 
         except ConstraintError as e:
             self.logger.error(
-                f"Constraint violation creating user {user_data.email}: {e}"
+                "Constraint violation creating user %s: %s", user_data.email, e
             )
             raise Exception(f"Email already exists: {str(e)}")
         except Neo4jError as e:
-            self.logger.error(f"Neo4j error creating user {user_data.email}: {e}")
+            self.logger.error("Neo4j error creating user %s: %s", user_data.email, e)
             raise Exception(f"Database error: {str(e)}")
         except Exception as e:
-            self.logger.error(f"Unexpected error creating user {user_data.email}: {e}")
+            self.logger.error(
+                "Unexpected error creating user %s: %s", user_data.email, e
+            )
             raise Exception(f"Failed to create user: {str(e)}")
 
     async def get_user_by_email(self, email: str) -> Optional[UserInDB]:
         """Get user by email"""
-        self.logger.debug(f"Looking up user by email: {email}")
+        self.logger.debug("Looking up user by email: %s", email)
 
         try:
             with self.get_session() as session:
@@ -177,7 +317,7 @@ class Neo4jService:
                 record = result.single()
                 if record:
                     node = record["u"]
-                    self.logger.debug(f"User found for email: {email}")
+                    self.logger.debug("User found for email: %s", email)
                     return UserInDB(
                         id=node["id"],
                         email=node["email"],
@@ -213,14 +353,16 @@ class Neo4jService:
                         account_active=node.get("account_active", True),
                     )
                 else:
-                    self.logger.debug(f"No user found for email: {email}")
+                    self.logger.debug("No user found for email: %s", email)
                     return None
 
         except Neo4jError as e:
-            self.logger.error(f"Neo4j error retrieving user by email {email}: {e}")
+            self.logger.error("Neo4j error retrieving user by email %s: %s", email, e)
             raise Exception(f"Database error while retrieving user: {str(e)}")
         except Exception as e:
-            self.logger.error(f"Unexpected error retrieving user by email {email}: {e}")
+            self.logger.error(
+                "Unexpected error retrieving user by email %s: %s", email, e
+            )
             raise Exception(f"Failed to retrieve user: {str(e)}")
 
     async def get_user_by_id(self, user_id: str) -> Optional[User]:
@@ -278,7 +420,7 @@ class Neo4jService:
             if field == "password":
                 # Hash password if provided
                 set_clauses.append("u.hashed_password = $hashed_password")
-                params["hashed_password"] = get_password_hash(value)
+                params["hashed_password"] = await password_hasher.hash(value)
             elif (
                 field
                 in [
@@ -307,6 +449,11 @@ class Neo4jService:
             result = session.run(
                 f"MATCH (u:User {{id: $id}}) SET {set_clause} RETURN u", **params
             )
+            # Covers profile edits, unsubscribe and role changes alike
+            after_commit(lambda: user_cache.invalidate_user(user_id))
+            if TOKEN_REVOKING_FIELDS.intersection(update_data):
+                # Claims baked into issued tokens are now stale
+                after_commit(lambda: token_revocation_list.revoke_user_tokens(user_id))
 
             record = result.single()
             if record:
@@ -346,13 +493,45 @@ class Neo4jService:
                 )
             return None
 
+    async def set_user_timestamps(self, rows: List[Dict[str, Any]]) -> None:
+        """Apply buffered property updates to many users in one statement.
+
+        Each row is {"id": user_id, "props": {property: value}}.
+        """
+        try:
+            with self.get_session() as session:
+                session.run(
+                    """
+                    UNWIND $rows AS row
+                    MATCH (u:User {id: row.id})
+                    SET u += row.props
+                    """,
+                    rows=rows,
+                )
+
+        except Neo4jError as e:
+            self.logger.error("Neo4j error updating user timestamps: %s", e)
+            raise Exception(f"Database error: {str(e)}")
+
     async def authenticate_user(self, email: str, password: str) -> Optional[UserInDB]:
         """Authenticate user with email and password"""
         user = await self.get_user_by_email(email)
         if not user:
             return None
-        if not verify_password(password, user.hashed_password):
+        valid, new_hash = await password_hasher.verify_and_update(
+            password, user.hashed_password
+        )
+        if not valid:
             return None
+        if new_hash:
+            # The configured bcrypt cost changed since this hash was made
+            try:
+                await self.update_user(user.id, {"hashed_password": new_hash})
+                user.hashed_password = new_hash
+            except Exception as e:
+                self.logger.warning(
+                    "Failed to rehash password for user %s: %s", user.id, e
+                )
         return user
 
     async def get_all_active_users(self) -> List[User]:
@@ -405,10 +584,10 @@ class Neo4jService:
                 return users
 
         except Neo4jError as e:
-            self.logger.error(f"Neo4j error retrieving active users: {e}")
+            self.logger.error("Neo4j error retrieving active users: %s", e)
             return []
         except Exception as e:
-            self.logger.error(f"Unexpected error retrieving active users: {e}")
+            self.logger.error("Unexpected error retrieving active users: %s", e)
             return []
 
     async def get_all_users_with_vehicle_count(self) -> List[Dict[str, Any]]:
@@ -467,11 +646,11 @@ class Neo4jService:
                 return users
 
         except Neo4jError as e:
-            self.logger.error(f"Neo4j error retrieving users with vehicle count: {e}")
+            self.logger.error("Neo4j error retrieving users with vehicle count: %s", e)
             return []
         except Exception as e:
             self.logger.error(
-                f"Unexpected error retrieving users with vehicle count: {e}"
+                "Unexpected error retrieving users with vehicle count: %s", e
             )
             return []
 
@@ -503,9 +682,11 @@ class Neo4jService:
                         license_plate: $license_plate,
                         license_country: $license_country,
                         license_state: $license_state,
-                        current_mileage: $current_mileage
+                        current_mileage: $current_mileage,
+                        data_version: 1
                     })
                     CREATE (u)-[:OWNS]->(v)
+                    SET u.data_version = coalesce(u.data_version, 0) + 1
                     RETURN v
                     """,
                     owner_id=owner_id,
@@ -553,10 +734,10 @@ class Neo4jService:
                     raise Exception("Failed to create vehicle - no record returned")
 
         except Neo4jError as e:
-            self.logger.error(f"Neo4j error creating vehicle: {e}")
+            self.logger.error("Neo4j error creating vehicle: %s", e)
             raise Exception(f"Database error: {str(e)}")
         except Exception as e:
-            self.logger.error(f"Unexpected error creating vehicle: {e}")
+            self.logger.error("Unexpected error creating vehicle: %s", e)
             raise Exception(f"Failed to create vehicle: {str(e)}")
 
     async def get_user_vehicles(self, owner_id: str) -> List[Vehicle]:
@@ -601,15 +782,39 @@ class Neo4jService:
 
         except Neo4jError as e:
             self.logger.error(
-                f"Neo4j error retrieving vehicles for user {owner_id}: {e}"
+                "Neo4j error retrieving vehicles for user %s: %s", owner_id, e
             )
             raise Exception(f"Database error: {str(e)}")
         except Exception as e:
             self.logger.error(
-                f"Unexpected error retrieving vehicles for user {owner_id}: {e}"
+                "Unexpected error retrieving vehicles for user %s: %s", owner_id, e
             )
             raise Exception(f"Failed to retrieve vehicles: {str(e)}")
 
+    async def get_user_vehicle_fields(
+        self, owner_id: str, fields: List[str]
+    ) -> List[Dict[str, Any]]:
+        """Get only the given properties of a user's vehicles, as plain dicts"""
+        projection = _map_projection("v", fields, {"owner_id": "owner_id"})
+        try:
+            with self.get_session() as session:
+                result = session.run(
+                    f"""
+                    MATCH (u:User {{id: $owner_id}})-[:OWNS]->(v:Vehicle)
+                    WITH v
+                    ORDER BY v.year DESC, v.brand, v.model
+                    RETURN {projection} AS v
+                    """,
+                    owner_id=owner_id,
+                )
+                return [record["v"] for record in result]
+
+        except Neo4jError as e:
+            self.logger.error(
+                "Neo4j error retrieving vehicles for user %s: %s", owner_id, e
+            )
+            raise Exception(f"Database error: {str(e)}")
+
     async def get_vehicle_by_id(
         self, vehicle_id: str, owner_id: str
     ) -> Optional[Vehicle]:
@@ -650,10 +855,12 @@ class Neo4jService:
                 return None
 
         except Neo4jError as e:
-            self.logger.error(f"Neo4j error retrieving vehicle {vehicle_id}: {e}")
+            self.logger.error("Neo4j error retrieving vehicle %s: %s", vehicle_id, e)
             raise Exception(f"Database error: {str(e)}")
         except Exception as e:
-            self.logger.error(f"Unexpected error retrieving vehicle {vehicle_id}: {e}")
+            self.logger.error(
+                "Unexpected error retrieving vehicle %s: %s", vehicle_id, e
+            )
             raise Exception(f"Failed to retrieve vehicle: {str(e)}")
 
     async def update_vehicle(
@@ -679,7 +886,7 @@ class Neo4jService:
                 result = session.run(
                     f"""
                     MATCH (u:User {{id: $owner_id}})-[:OWNS]->(v:Vehicle {{id: $vehicle_id}})
-                    SET {set_clause}
+                    SET {set_clause}, {BUMP_DATA_VERSIONS}
                     RETURN v
                     """,
                     **params,
@@ -710,12 +917,56 @@ class Neo4jService:
                 return None
 
         except Neo4jError as e:
-            self.logger.error(f"Neo4j error updating vehicle {vehicle_id}: {e}")
+            self.logger.error("Neo4j error updating vehicle %s: %s", vehicle_id, e)
             raise Exception(f"Database error: {str(e)}")
         except Exception as e:
-            self.logger.error(f"Unexpected error updating vehicle {vehicle_id}: {e}")
+            self.logger.error("Unexpected error updating vehicle %s: %s", vehicle_id, e)
             raise Exception(f"Failed to update vehicle: {str(e)}")
 
+    async def get_vehicles_missing_catalog_ids(
+        self, after_id: str, limit: int
+    ) -> List[Dict[str, Any]]:
+        """Page (by id) through vehicles with no brand_id or model_id"""
+        try:
+            with self.get_session() as session:
+                result = session.run(
+                    """
+                    MATCH (v:Vehicle)
+                    WHERE v.id > $after_id
+                      AND (v.brand_id IS NULL OR v.model_id IS NULL)
+                    RETURN v {.id, .brand, .brand_id, .model, .model_id} AS vehicle
+                    ORDER BY v.id
+                    LIMIT $limit
+                    """,
+                    after_id=after_id,
+                    limit=limit,
+                )
+                return [record["vehicle"] for record in result]
+
+        except Neo4jError as e:
+            self.logger.error("Neo4j error listing vehicles to normalize: %s", e)
+            raise Exception(f"Database error: {str(e)}")
+
+    async def set_vehicle_catalog_fields(self, rows: List[Dict[str, Any]]) -> None:
+        """Apply normalised brand/model fields to many vehicles in one statement.
+
+        Each row is {"id": vehicle_id, "props": {property: value}}.
+        """
+        try:
+            with self.get_session() as session:
+                session.run(
+                    f"""
+                    UNWIND $rows AS row
+                    MATCH (u:User)-[:OWNS]->(v:Vehicle {{id: row.id}})
+                    SET v += row.props, {BUMP_DATA_VERSIONS}
+                    """,
+                    rows=rows,
+                )
+
+        except Neo4jError as e:
+            self.logger.error("Neo4j error updating vehicle catalog fields: %s", e)
+            raise Exception(f"Database error: {str(e)}")
+
     async def delete_vehicle(self, vehicle_id: str, owner_id: str) -> bool:
         """Delete a vehicle, ensuring it belongs to the owner"""
         try:
@@ -723,6 +974,7 @@ class Neo4jService:
                 result = session.run(
                     """
                     MATCH (u:User {id: $owner_id})-[r:OWNS]->(v:Vehicle {id: $vehicle_id})
+                    SET u.data_version = coalesce(u.data_version, 0) + 1
                     DELETE r, v
                     RETURN count(v) as deleted_count
                     """,
@@ -734,12 +986,171 @@ class Neo4jService:
                 return record["deleted_count"] > 0 if record else False
 
         except Neo4jError as e:
-            self.logger.error(f"Neo4j error deleting vehicle {vehicle_id}: {e}")
+            self.logger.error("Neo4j error deleting vehicle %s: %s", vehicle_id, e)
             raise Exception(f"Database error: {str(e)}")
         except Exception as e:
-            self.logger.error(f"Unexpected error deleting vehicle {vehicle_id}: {e}")
+            self.logger.error("Unexpected error deleting vehicle %s: %s", vehicle_id, e)
             raise Exception(f"Failed to delete vehicle: {str(e)}")
 
+    async def get_user_data_version(self, owner_id: str) -> int:
+        """Get the version counter covering all of a user's vehicles"""
+        try:
+            with self.get_session() as session:
+                result = session.run(
+                    """
+                    MATCH (u:User {id: $owner_id})
+                    RETURN coalesce(u.data_version, 0) AS version
+                    """,
+                    owner_id=owner_id,
+                )
+                record = result.single()
+                return record["version"] if record else 0
+
+        except Neo4jError as e:
+            self.logger.error(
+                "Neo4j error retrieving data version for %s: %s", owner_id, e
+            )
+            raise Exception(f"Database error: {str(e)}")
+
+    async def get_vehicle_data_version(
+        self, vehicle_id: str, owner_id: str
+    ) -> Optional[int]:
+        """Get a vehicle's version counter, or None if the owner doesn't own it"""
+        try:
+            with self.get_session() as session:
+                result = session.run(
+                    """
+                    MATCH (u:User {id: $owner_id})-[:OWNS]->(v:Vehicle {id: $vehicle_id})
+                    RETURN coalesce(v.data_version, 0) AS version
+                    """,
+                    owner_id=owner_id,
+                    vehicle_id=vehicle_id,
+                )
+                record = result.single()
+                return record["version"] if record else None
+
+        except Neo4jError as e:
+            self.logger.error(
+                "Neo4j error retrieving data version for vehicle %s: %s", vehicle_id, e
+            )
+            raise Exception(f"Database error: {str(e)}")
+
+    async def get_dashboard(self, owner_id: str, recent_limit: int) -> Dashboard:
+        """Get all of a user's vehicles with recent maintenance, spend and
+        recommendation freshness in a single query"""
+        try:
+            with self.get_session() as session:
+                result = session.run(
+                    """
+                    MATCH (u:User {id: $owner_id})-[:OWNS]->(v:Vehicle)
+                    CALL {
+                        WITH v
+                        OPTIONAL MATCH (v)-[:HAS_MAINTENANCE]->(m:Maintenance)
+                        RETURN count(m) AS maintenance_count,
+                               sum(coalesce(m.cost, 0.0)) AS total_spend,
+                               max(m.service_date) AS last_service_date
+                    }
+                    RETURN v, maintenance_count, total_spend, last_service_date,
+                        COLLECT {
+                            MATCH (v)-[:HAS_MAINTENANCE]->(m:Maintenance)
+                            RETURN m
+                            ORDER BY m.service_date DESC, m.created_at DESC
+                            LIMIT $recent_limit
+                        } AS recent_maintenance,
+                        COLLECT {
+                            MATCH (v)-[:HAS_RECOMMENDATION]->(r:Recommendation)
+                            RETURN r {
+                                .created_at,
+                                .vehicle_mileage_at_generation,
+                                .maintenance_count_at_generation
+                            }
+                            ORDER BY r.created_at DESC
+                            LIMIT 1
+                        } AS latest_recommendation
+                    ORDER BY v.year DESC, v.brand, v.model
+                    """,
+                    owner_id=owner_id,
+                    recent_limit=recent_limit,
+                )
+
+                vehicles = []
+                for row in result:
+                    node = row["v"]
+                    vehicle = Vehicle(
+                        id=node["id"],
+                        owner_id=owner_id,
+                        brand=node["brand"],
+                        brand_id=node.get("brand_id"),
+                        model=node["model"],
+                        model_id=node.get("model_id"),
+                        year=node["year"],
+                        trim=node.get("trim"),
+                        trim_id=node.get("trim_id"),
+                        zip_code=node.get("zip_code"),
+                        usage_pattern=node.get("usage_pattern"),
+                        usage_notes=node.get("usage_notes"),
+                        vin=node.get("vin"),
+                        license_plate=node.get("license_plate"),
+                        license_country=node.get("license_country"),
+                        license_state=node.get("license_state"),
+                        current_mileage=node.get("current_mileage"),
+                    )
+                    recent = [
+                        Maintenance(
+                            id=m["id"],
+                            vehicle_id=vehicle.id,
+                            service_type=m["service_type"],
+                            mileage=m["mileage"],
+                            service_date=m["service_date"],
+                            description=m.get("description"),
+                            cost=m.get("cost"),
+                            service_provider=m.get("service_provider"),
+                            created_at=m["created_at"],
+                        )
+                        for m in row["recent_maintenance"]
+                    ]
+
+                    generated_at = None
+                    fresh = False
+                    if row["latest_recommendation"]:
+                        latest = row["latest_recommendation"][0]
+                        generated_at = datetime.fromisoformat(latest["created_at"])
+                        # Same test get_cached_recommendation uses for a cache hit
+                        fresh = latest["vehicle_mileage_at_generation"] == (
+                            vehicle.current_mileage or 0
+                        ) and (
+                            latest["maintenance_count_at_generation"]
+                            == row["maintenance_count"]
+                        )
+
+                    vehicles.append(
+                        DashboardVehicle(
+                            vehicle=vehicle,
+                            recent_maintenance=recent,
+                            maintenance_count=row["maintenance_count"],
+                            total_spend=round(row["total_spend"], 2),
+                            last_service_date=row["last_service_date"],
+                            recommendation_generated_at=generated_at,
+                            recommendation_fresh=fresh,
+                        )
+                    )
+
+                return Dashboard(
+                    vehicles=vehicles,
+                    vehicle_count=len(vehicles),
+                    maintenance_count=sum(v.maintenance_count for v in vehicles),
+                    total_spend=round(sum(v.total_spend for v in vehicles), 2),
+                )
+
+        except Neo4jError as e:
+            self.logger.error("Neo4j error building dashboard for %s: %s", owner_id, e)
+            raise Exception(f"Database error: {str(e)}")
+        except Exception as e:
+            self.logger.error(
+                "Unexpected error building dashboard for %s: %s", owner_id, e
+            )
+            raise Exception(f"Failed to build dashboard: {str(e)}")
+
     async def get_maintenance_records(self, vehicle_id: str) -> List[Maintenance]:
         """Get all maintenance records for a vehicle"""
         try:
@@ -772,20 +1183,44 @@ class Neo4jService:
                 return records
 
         except Neo4jError as e:
-            self.logger.error(f"Neo4j error retrieving maintenance records: {e}")
+            self.logger.error("Neo4j error retrieving maintenance records: %s", e)
             raise Exception(f"Database error: {str(e)}")
         except Exception as e:
-            self.logger.error(f"Unexpected error retrieving maintenance records: {e}")
+            self.logger.error("Unexpected error retrieving maintenance records: %s", e)
             raise Exception(f"Failed to retrieve maintenance records: {str(e)}")
 
+    async def get_maintenance_record_fields(
+        self, vehicle_id: str, fields: List[str]
+    ) -> List[Dict[str, Any]]:
+        """Get only the given properties of a vehicle's records, as plain dicts"""
+        projection = _map_projection("m", fields, {"vehicle_id": "vehicle_id"})
+        try:
+            with self.get_session() as session:
+                result = session.run(
+                    f"""
+                    MATCH (v:Vehicle {{id: $vehicle_id}})-[:HAS_MAINTENANCE]->(m:Maintenance)
+                    WITH m
+                    ORDER BY m.service_date DESC
+                    RETURN {projection} AS m
+                    """,
+                    vehicle_id=vehicle_id,
+                )
+                return [record["m"] for record in result]
+
+        except Neo4jError as e:
+            self.logger.error("Neo4j error retrieving maintenance records: %s", e)
+            raise Exception(f"Database error: {str(e)}")
+
     async def create_maintenance_record(self, record: Maintenance) -> None:
         """Create a new maintenance record"""
         try:
             with self.get_session() as session:
                 session.run(
-                    """
-                    MATCH (v:Vehicle {id: $vehicle_id})
-                    CREATE (m:Maintenance {
+                    f"""
+                    MATCH (v:Vehicle {{id: $vehicle_id}})
+                    OPTIONAL MATCH (u:User)-[:OWNS]->(v)
+                    SET {BUMP_DATA_VERSIONS}
+                    CREATE (m:Maintenance {{
                         id: $id,
                         service_type: $service_type,
                         mileage: $mileage,
@@ -794,7 +1229,7 @@ class Neo4jService:
                         cost: $cost,
                         service_provider: $service_provider,
                         created_at: $created_at
-                    })
+                    }})
                     CREATE (v)-[:HAS_MAINTENANCE]->(m)
                     """,
                     vehicle_id=record.vehicle_id,
@@ -809,10 +1244,10 @@ class Neo4jService:
                 )
 
         except Neo4jError as e:
-            self.logger.error(f"Neo4j error creating maintenance record: {e}")
+            self.logger.error("Neo4j error creating maintenance record: %s", e)
             raise Exception(f"Database error: {str(e)}")
         except Exception as e:
-            self.logger.error(f"Unexpected error creating maintenance record: {e}")
+            self.logger.error("Unexpected error creating maintenance record: %s", e)
             raise Exception(f"Failed to create maintenance record: {str(e)}")
 
     async def update_vehicle_mileage_if_higher(
@@ -822,20 +1257,21 @@ class Neo4jService:
         try:
             with self.get_session() as session:
                 session.run(
-                    """
-                    MATCH (v:Vehicle {id: $vehicle_id})
+                    f"""
+                    MATCH (v:Vehicle {{id: $vehicle_id}})
                     WHERE v.current_mileage IS NULL OR v.current_mileage < $mileage
-                    SET v.current_mileage = $mileage
+                    OPTIONAL MATCH (u:User)-[:OWNS]->(v)
+                    SET v.current_mileage = $mileage, {BUMP_DATA_VERSIONS}
                     """,
                     vehicle_id=vehicle_id,
                     mileage=mileage,
                 )
 
         except Neo4jError as e:
-            self.logger.error(f"Neo4j error updating vehicle mileage: {e}")
+            self.logger.error("Neo4j error updating vehicle mileage: %s", e)
             raise Exception(f"Database error: {str(e)}")
         except Exception as e:
-            self.logger.error(f"Unexpected error updating vehicle mileage: {e}")
+            self.logger.error("Unexpected error updating vehicle mileage: %s", e)
             raise Exception(f"Failed to update vehicle mileage: {str(e)}")
 
     async def get_cached_recommendation(
@@ -895,10 +1331,12 @@ class Neo4jService:
                 return None
 
         except Neo4jError as e:
-            self.logger.error(f"Neo4j error retrieving cached recommendation: {e}")
+            self.logger.error("Neo4j error retrieving cached recommendation: %s", e)
             return None
         except Exception as e:
-            self.logger.error(f"Unexpected error retrieving cached recommendation: {e}")
+            self.logger.error(
+                "Unexpected error retrieving cached recommendation: %s", e
+            )
             return None
 
     async def save_recommendation(
@@ -915,9 +1353,11 @@ class Neo4jService:
 
             with self.get_session() as session:
                 session.run(
-                    """
-                    MATCH (v:Vehicle {id: $vehicle_id})
-                    CREATE (r:Recommendation {
+                    f"""
+                    MATCH (v:Vehicle {{id: $vehicle_id}})
+                    OPTIONAL MATCH (u:User)-[:OWNS]->(v)
+                    SET {BUMP_DATA_VERSIONS}
+                    CREATE (r:Recommendation {{
                         id: $id,
                         vehicle_id: $vehicle_id,
                         recommendations: $recommendations,
@@ -925,7 +1365,7 @@ class Neo4jService:
                         maintenance_count_at_generation: $maintenance_count,
                         created_at: $created_at,
                         updated_at: $updated_at
-                    })
+                    }})
                     CREATE (v)-[:HAS_RECOMMENDATION]->(r)
                     """,
                     id=recommendation_id,
@@ -948,10 +1388,10 @@ class Neo4jService:
                 )
 
         except Neo4jError as e:
-            self.logger.error(f"Neo4j error saving recommendation: {e}")
+            self.logger.error("Neo4j error saving recommendation: %s", e)
             raise Exception(f"Database error: {str(e)}")
         except Exception as e:
-            self.logger.error(f"Unexpected error saving recommendation: {e}")
+            self.logger.error("Unexpected error saving recommendation: %s", e)
             raise Exception(f"Failed to save recommendation: {str(e)}")
 
     async def save_claude_api_log(
@@ -990,9 +1430,84 @@ class Neo4jService:
                 )
 
         except Exception as e:
-            self.logger.error(f"Error saving Claude API log: {e}")
+            self.logger.error("Error saving Claude API log: %s", e)
             # Don't raise - logging shouldn't break the main flow
 
+    def iter_user_export_rows(self, owner_id: str) -> Iterator[Dict[str, Any]]:
+        """Yield a user's vehicles, maintenance records and recommendations as flat rows.
+
+        Rows are pulled from the result cursor one at a time so the export never
+        holds more than the driver's fetch buffer in memory. This is a regular
+        generator because the Neo4j driver is synchronous; StreamingResponse
+        iterates it in a worker thread.
+        """
+        with self.get_session() as session:
+            result = session.run(
+                """
+                MATCH (u:User {id: $owner_id})-[:OWNS]->(v:Vehicle)
+                RETURN v
+                ORDER BY v.year DESC, v.brand, v.model
+                """,
+                owner_id=owner_id,
+            )
+            for record in result:
+                node = record["v"]
+                yield {
+                    "record_type": "vehicle",
+                    "id": node["id"],
+                    "vehicle_id": node["id"],
+                    "brand": node.get("brand"),
+                    "model": node.get("model"),
+                    "year": node.get("year"),
+                    "trim": node.get("trim"),
+                    "vin": node.get("vin"),
+                    "license_plate": node.get("license_plate"),
+                    "license_state": node.get("license_state"),
+                    "current_mileage": node.get("current_mileage"),
+                }
+
+            result = session.run(
+                """
+                MATCH (u:User {id: $owner_id})-[:OWNS]->(v:Vehicle)
+                      -[:HAS_MAINTENANCE]->(m:Maintenance)
+                RETURN v.id AS vehicle_id, m
+                """,
+                owner_id=owner_id,
+            )
+            for record in result:
+                node = record["m"]
+                yield {
+                    "record_type": "maintenance",
+                    "id": node["id"],
+                    "vehicle_id": record["vehicle_id"],
+                    "service_type": node.get("service_type"),
+                    "mileage": node.get("mileage"),
+                    "service_date": node.get("service_date"),
+                    "description": node.get("description"),
+                    "cost": node.get("cost"),
+                    "service_provider": node.get("service_provider"),
+                    "created_at": node.get("created_at"),
+                }
+
+            result = session.run(
+                """
+                MATCH (u:User {id: $owner_id})-[:OWNS]->(v:Vehicle)
+                      -[:HAS_RECOMMENDATION]->(r:Recommendation)
+                RETURN v.id AS vehicle_id, r
+                """,
+                owner_id=owner_id,
+            )
+            for record in result:
+                node = record["r"]
+                yield {
+                    "record_type": "recommendation",
+                    "id": node["id"],
+                    "vehicle_id": record["vehicle_id"],
+                    "mileage": node.get("vehicle_mileage_at_generation"),
+                    "recommendations": node.get("recommendations"),
+                    "created_at": node.get("created_at"),
+                }
+
     async def get_claude_api_logs(self, limit: int = 100) -> List[ClaudeAPILog]:
         """Get Claude API logs for admin interface"""
         try:
@@ -1025,7 +1540,7 @@ class Neo4jService:
                 return logs
 
         except Exception as e:
-            self.logger.error(f"Error retrieving Claude API logs: {e}")
+            self.logger.error("Error retrieving Claude API logs: %s", e)
             return []
 
 
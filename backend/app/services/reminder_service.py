@@ -4,6 +4,7 @@ from typing import Optional, Tuple
 
 from app.services.neo4j_service import Neo4jService
 from app.services.sms_service import SMSService
+from app.services.write_behind import TimestampWriteBuffer, timestamp_write_buffer
 from app.models.user import User
 
 
@@ -13,9 +14,15 @@ logger = logging.getLogger(__name__)
 class ReminderService:
     """Service for handling scheduled reminders"""
 
-    def __init__(self, neo4j_service: Neo4jService, sms_service: SMSService):
+    def __init__(
+        self,
+        neo4j_service: Neo4jService,
+        sms_service: SMSService,
+        write_buffer: Optional[TimestampWriteBuffer] = None,
+    ):
         self.neo4j_service = neo4j_service
         self.sms_service = sms_service
+        self.write_buffer = write_buffer or timestamp_write_buffer
         self.logger = logger
 
     def should_send_sms_reminder(self, user: User, current_date: date) -> bool:
@@ -101,7 +108,7 @@ class ReminderService:
         try:
             if not user.phone_number:
                 self.logger.warning(
-                    f"User {user.id} has no phone number for SMS reminder"
+                    "User %s has no phone number for SMS reminder", user.id
                 )
                 return False
 
@@ -129,16 +136,16 @@ class ReminderService:
             message_sid = self.sms_service.send_sms(user.phone_number, message)
 
             if message_sid:
-                # Update last_update_request timestamp
-                await self.neo4j_service.update_user(
-                    user.id, {"last_update_request": datetime.utcnow()}
+                # Update last_update_request timestamp (batched)
+                self.write_buffer.record(
+                    user.id, "last_update_request", datetime.utcnow()
                 )
-                self.logger.info(f"Sent SMS reminder to user {user.id}")
+                self.logger.info("Sent SMS reminder to user %s", user.id)
 
             return bool(message_sid)
 
         except Exception as e:
-            self.logger.error(f"Error sending SMS reminder to user {user.id}: {e}")
+            self.logger.error("Error sending SMS reminder to user %s: %s", user.id, e)
             return False
 
     async def send_maintenance_notification(self, user: User) -> bool:
@@ -149,7 +156,7 @@ class ReminderService:
 
             if not vehicles:
                 self.logger.info(
-                    f"User {user.id} has no vehicles for maintenance notification"
+                    "User %s has no vehicles for maintenance notification", user.id
                 )
                 return False
 
@@ -174,17 +181,17 @@ class ReminderService:
                 pass
 
             if success:
-                # Update last_maintenance_notification timestamp
-                await self.neo4j_service.update_user(
-                    user.id, {"last_maintenance_notification": datetime.utcnow()}
+                # Update last_maintenance_notification timestamp (batched)
+                self.write_buffer.record(
+                    user.id, "last_maintenance_notification", datetime.utcnow()
                 )
-                self.logger.info(f"Sent maintenance notification to user {user.id}")
+                self.logger.info("Sent maintenance notification to user %s", user.id)
 
             return success
 
         except Exception as e:
             self.logger.error(
-                f"Error sending maintenance notification to user {user.id}: {e}"
+                "Error sending maintenance notification to user %s: %s", user.id, e
             )
             return False
 
@@ -195,7 +202,7 @@ class ReminderService:
         if current_date is None:
             current_date = date.today()
 
-        self.logger.info(f"Processing scheduled reminders for {current_date}")
+        self.logger.info("Processing scheduled reminders for %s", current_date)
 
         sms_count = 0
         maintenance_count = 0
@@ -216,11 +223,15 @@ class ReminderService:
                         maintenance_count += 1
 
             self.logger.info(
-                f"Processed reminders: {sms_count} SMS reminders, "
-                f"{maintenance_count} maintenance notifications"
+                "Processed reminders: %s SMS reminders, %s maintenance notifications",
+                sms_count,
+                maintenance_count,
             )
 
         except Exception as e:
-            self.logger.error(f"Error processing scheduled reminders: {e}")
+            self.logger.error("Error processing scheduled reminders: %s", e)
+
+        # Persist this run's timestamps now so a rerun can't send duplicates
+        await self.write_buffer.flush()
 
         return sms_count, maintenance_count
@@ -1,14 +1,26 @@
-from twilio.rest import Client
-from typing import Optional
+from typing import Any, Optional
 
 from app.core.config import settings
 
+# twilio.rest takes ~100 ms to import, so it is loaded when the first client is
+# built rather than when this module is imported
+Client: Any = None
+
+
+def _twilio_client_class() -> Any:
+    global Client
+    if Client is None:
+        from twilio.rest import Client as TwilioClient
+
+        Client = TwilioClient
+    return Client
+
 
 class SMSService:
     def __init__(self):
         self.client = None
         if settings.TWILIO_ACCOUNT_SID and settings.TWILIO_AUTH_TOKEN:
-            self.client = Client(
+            self.client = _twilio_client_class()(
                 settings.TWILIO_ACCOUNT_SID, settings.TWILIO_AUTH_TOKEN
             )
 
@@ -0,0 +1,99 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from app.core.config import settings
+from app.models.user import User
+
+
+class UserCache:
+    """Per-process TTL + LRU cache of resolved users keyed by token subject"""
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, User]]" = OrderedDict()
+        self._subject_by_id: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0 and self.ttl_seconds > 0
+
+    def get(self, subject: str) -> Optional[User]:
+        """Return the cached user for a subject, or None on miss/expiry"""
+        with self._lock:
+            entry = self._entries.get(subject)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            expires_at, user = entry
+            if time.monotonic() >= expires_at:
+                self._remove(subject)
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(subject)
+            self.hits += 1
+            return user
+
+    def set(self, subject: str, user: User) -> None:
+        """Store a resolved user, evicting the least recently used entry if full"""
+        if not self.enabled:
+            return
+
+        with self._lock:
+            if subject in self._entries:
+                self._remove(subject)
+
+            self._entries[subject] = (time.monotonic() + self.ttl_seconds, user)
+            self._subject_by_id[user.id] = subject
+
+            while len(self._entries) > self.max_size:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def invalidate_user(self, user_id: str) -> None:
+        """Drop the cached entry for a user id (after profile/role/status changes)"""
+        with self._lock:
+            subject = self._subject_by_id.get(user_id)
+            if subject is not None:
+                self._remove(subject)
+                self.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._subject_by_id.clear()
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+            }
+
+    def _remove(self, subject: str) -> None:
+        entry = self._entries.pop(subject, None)
+        if entry is not None and self._subject_by_id.get(entry[1].id) == subject:
+            del self._subject_by_id[entry[1].id]
+
+
+user_cache = UserCache(
+    max_size=settings.USER_CACHE_MAX_SIZE,
+    ttl_seconds=settings.USER_CACHE_TTL_SECONDS,
+)
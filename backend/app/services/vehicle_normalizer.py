@@ -0,0 +1,225 @@
+import re
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from app.services.catalog_snapshot import CatalogSnapshot, catalog_snapshot_store
+
+# Common shorthand -> CarAPI make name
+MAKE_ALIASES = {
+    "chevy": "Chevrolet",
+    "vw": "Volkswagen",
+    "volks": "Volkswagen",
+    "merc": "Mercedes-Benz",
+    "mercedes": "Mercedes-Benz",
+    "benz": "Mercedes-Benz",
+    "mb": "Mercedes-Benz",
+    "caddy": "Cadillac",
+    "alfa": "Alfa Romeo",
+    "landrover": "Land Rover",
+    "range rover": "Land Rover",
+    "rr": "Rolls-Royce",
+    "rolls royce": "Rolls-Royce",
+    "mini cooper": "MINI",
+    "infinity": "INFINITI",
+}
+
+# Minimum trigram similarity (Jaccard) for a fuzzy match
+MIN_SIMILARITY = 0.5
+
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+_NUMBERS = re.compile(r"[0-9]+")
+
+
+def normalize_text(value: str) -> str:
+    """Lower-case, with punctuation and repeated spaces collapsed"""
+    return _NON_ALNUM.sub(" ", value.lower()).strip()
+
+
+def trigrams(value: str) -> Set[str]:
+    padded = f"  {value} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+def numbers(value: str) -> List[str]:
+    return _NUMBERS.findall(value)
+
+
+class TrigramIndex:
+    """Maps free text to one of a fixed set of names.
+
+    Exact matches on the normalised text (or with spaces dropped) win. With
+    ``fuzzy``, candidates sharing a trigram and containing exactly the same
+    numbers are scored by Jaccard similarity, and the best one at or above
+    MIN_SIMILARITY is returned, ties going to the alphabetically first name.
+    """
+
+    def __init__(self, names: Dict[str, Any]):
+        # names: canonical name -> payload (e.g. CarAPI id)
+        self._names: List[Tuple[str, Any]] = list(names.items())
+        self._exact: Dict[str, int] = {}
+        self._grams: List[Set[str]] = []
+        self._postings: Dict[str, List[int]] = {}
+        for i, (name, _) in enumerate(self._names):
+            key = normalize_text(name)
+            self._exact.setdefault(key, i)
+            # Also match with spaces dropped ("landrover", "f150")
+            self._exact.setdefault(key.replace(" ", ""), i)
+            grams = trigrams(key)
+            self._grams.append(grams)
+            for gram in grams:
+                self._postings.setdefault(gram, []).append(i)
+
+    def match(self, value: str, fuzzy: bool = False) -> Optional[Tuple[str, Any]]:
+        key = normalize_text(value)
+        if not key:
+            return None
+        exact = self._exact.get(key, self._exact.get(key.replace(" ", "")))
+        if exact is not None:
+            return self._names[exact]
+        if not fuzzy:
+            return None
+
+        grams = trigrams(key)
+        shared: Dict[int, int] = {}
+        for gram in grams:
+            for i in self._postings.get(gram, ()):
+                shared[i] = shared.get(i, 0) + 1
+        # "2500" is never a typo of "1500", nor "Mazda2" of "Mazda6"
+        wanted = numbers(key)
+        best: Optional[Tuple[float, str, int]] = None
+        for i, common in shared.items():
+            name = self._names[i][0]
+            if numbers(normalize_text(name)) != wanted:
+                continue
+            score = common / (len(grams) + len(self._grams[i]) - common)
+            if score < MIN_SIMILARITY:
+                continue
+            candidate = (-score, name, i)
+            if best is None or candidate < best:
+                best = candidate
+        return self._names[best[2]] if best is not None else None
+
+
+class NormalizationIndex:
+    """Make and per-make model indexes built from the catalog snapshot"""
+
+    def __init__(self, snapshot: CatalogSnapshot):
+        self.makes = TrigramIndex(dict(snapshot.makes))
+        models: Dict[str, Dict[str, int]] = {}
+        for _, make, model, model_id, _ in snapshot.rows:
+            models.setdefault(snapshot.makes[make][0], {}).setdefault(
+                snapshot.models[model], model_id
+            )
+        self._models = {make: TrigramIndex(names) for make, names in models.items()}
+
+    def match_make(self, value: str) -> Optional[Tuple[str, int]]:
+        # The make list is short and distinct enough for typo tolerance
+        alias = MAKE_ALIASES.get(normalize_text(value))
+        return self.makes.match(alias or value, fuzzy=True)
+
+    def match_model(self, make: str, value: str) -> Optional[Tuple[str, int]]:
+        # Exact only: near names are usually different models ("Sierra 2500"
+        # vs "Sierra 1500", "Corolla Cross" vs "Corolla")
+        index = self._models.get(make)
+        return index.match(value) if index is not None else None
+
+
+class VehicleNormalizer:
+    """Canonicalises brand/model strings and fills in CarAPI ids.
+
+    Makes are matched through aliases and typo tolerance; models only when
+    they equal a catalog name up to case, punctuation and spacing, so a
+    model the catalog lacks is stored as typed rather than swapped for a
+    similar one. Uses only the offline catalog snapshot, so it never calls
+    CarAPI; with no snapshot built, vehicles are stored as given. The index
+    is rebuilt by the snapshot store's worker thread whenever a snapshot is
+    loaded, so requests only read it.
+    """
+
+    def __init__(self, store=catalog_snapshot_store):
+        self._index: Optional[NormalizationIndex] = None
+        self.normalized = 0
+        self.unmatched = 0
+        store.on_load(self.use_snapshot)
+
+    def use_snapshot(self, snapshot: CatalogSnapshot) -> None:
+        self._index = NormalizationIndex(snapshot)
+
+    def index(self) -> Optional[NormalizationIndex]:
+        return self._index
+
+    def normalize(
+        self, fields: Dict[str, Any], current: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """Return ``fields`` with brand/model canonicalised and missing
+        brand_id/model_id filled in.
+
+        ``current`` holds the stored vehicle for partial updates, so a new
+        model can be matched under the existing brand.
+        """
+        index = self.index()
+        if index is None or not ("brand" in fields or "model" in fields):
+            return fields
+        current = current or {}
+        result = dict(fields)
+
+        brand = result.get("brand", current.get("brand"))
+        if not brand:
+            return result
+        make = index.match_make(brand)
+        if make is None:
+            self.unmatched += 1
+            return result
+        if "brand" in fields:
+            result["brand"] = make[0]
+            if result.get("brand_id") is None:
+                result["brand_id"] = make[1]
+
+        model = result.get("model", current.get("model"))
+        if model and ("model" in fields or "brand" in fields):
+            matched = index.match_model(make[0], model)
+            if matched is None:
+                self.unmatched += 1
+                return result
+            result["model"] = matched[0]
+            if result.get("model_id") is None:
+                result["model_id"] = matched[1]
+
+        self.normalized += 1
+        return result
+
+    async def backfill(
+        self, db: Any, batch_size: int = 500, dry_run: bool = False
+    ) -> Dict[str, int]:
+        """Normalise stored vehicles missing brand_id/model_id, one page of
+        ``batch_size`` per read and one UNWIND write per page"""
+        if self.index() is None:
+            raise RuntimeError("Build the catalog snapshot before backfilling")
+
+        scanned = updated = 0
+        after_id = ""
+        while True:
+            vehicles = await db.get_vehicles_missing_catalog_ids(after_id, batch_size)
+            if not vehicles:
+                break
+            rows = []
+            for vehicle in vehicles:
+                original = {
+                    k: vehicle.get(k)
+                    for k in ("brand", "brand_id", "model", "model_id")
+                }
+                normalized = self.normalize(original)
+                changes = {k: v for k, v in normalized.items() if original[k] != v}
+                if changes:
+                    rows.append({"id": vehicle["id"], "props": changes})
+            if rows and not dry_run:
+                await db.set_vehicle_catalog_fields(rows)
+            scanned += len(vehicles)
+            updated += len(rows)
+            after_id = vehicles[-1]["id"]
+        return {"scanned": scanned, "updated": updated}
+
+    def stats(self) -> Dict[str, float]:
+        return {"normalized": self.normalized, "unmatched": self.unmatched}
+
+
+vehicle_normalizer = VehicleNormalizer()
@@ -0,0 +1,127 @@
+import asyncio
+import logging
+import threading
+from datetime import datetime
+from typing import Dict, Optional
+
+from app.core.config import settings
+from app.services.neo4j_service import Neo4jService, after_commit, neo4j_service
+from app.services.user_cache import UserCache, user_cache
+
+logger = logging.getLogger(__name__)
+
+
+class TimestampWriteBuffer:
+    """Write-behind buffer for low-value user timestamps.
+
+    Updates are coalesced in memory (latest value per user and field wins) and
+    written as a single UNWIND batch per flush interval, plus a final flush on
+    shutdown. Values not yet flushed are lost if the process is killed.
+    Cached users are invalidated once their batch is written, so
+    get_current_user does not keep serving the old timestamps.
+    """
+
+    FIELDS = {"last_login", "last_update_request", "last_maintenance_notification"}
+
+    def __init__(
+        self, db: Neo4jService, flush_interval: float, cache: UserCache = user_cache
+    ):
+        self.db = db
+        self.cache = cache
+        self.flush_interval = flush_interval
+        self._pending: Dict[str, Dict[str, datetime]] = {}
+        self._lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self.recorded = 0
+        self.flushes = 0
+        self.rows_written = 0
+        self.failures = 0
+
+    def record(self, user_id: str, field: str, value: datetime) -> None:
+        """Queue a timestamp update for the next flush (inside a transaction,
+        only once it commits)"""
+        if field not in self.FIELDS:
+            raise ValueError(f"Unsupported write-behind field: {field}")
+        after_commit(lambda: self._enqueue(user_id, field, value))
+
+    def _enqueue(self, user_id: str, field: str, value: datetime) -> None:
+        with self._lock:
+            fields = self._pending.setdefault(user_id, {})
+            current = fields.get(field)
+            if current is None or value > current:
+                fields[field] = value
+            self.recorded += 1
+
+    async def flush(self) -> int:
+        """Write all pending updates in one batch; return the number of users written"""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+
+        if not pending:
+            return 0
+
+        rows = [
+            {
+                "id": user_id,
+                "props": {field: value.isoformat() for field, value in fields.items()},
+            }
+            for user_id, fields in pending.items()
+        ]
+
+        try:
+            await self.db.set_user_timestamps(rows)
+        except Exception as e:
+            self.failures += 1
+            logger.error("Failed to flush %s user timestamp updates: %s", len(rows), e)
+            # Put the batch back without clobbering newer values recorded meanwhile
+            with self._lock:
+                for user_id, fields in pending.items():
+                    current = self._pending.setdefault(user_id, {})
+                    for field, value in fields.items():
+                        if field not in current or value > current[field]:
+                            current[field] = value
+            return 0
+
+        for user_id in pending:
+            self.cache.invalidate_user(user_id)
+        self.flushes += 1
+        self.rows_written += len(rows)
+        logger.debug("Flushed timestamp updates for %s users", len(rows))
+        return len(rows)
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    def start(self) -> None:
+        """Start the periodic flush task on the running event loop"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the periodic task and flush whatever is still pending"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            pending = len(self._pending)
+        return {
+            "pending_users": pending,
+            "recorded": self.recorded,
+            "flushes": self.flushes,
+            "rows_written": self.rows_written,
+            "failures": self.failures,
+        }
+
+
+timestamp_write_buffer = TimestampWriteBuffer(
+    neo4j_service, flush_interval=settings.TIMESTAMP_FLUSH_INTERVAL_SECONDS
+)
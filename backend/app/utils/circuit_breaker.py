@@ -0,0 +1,92 @@
+import time
+from typing import Dict
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# Numeric encoding for the metrics endpoint
+_STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an upstream that is known to be failing"""
+
+    def __init__(self, name: str, retry_after: float):
+        super().__init__(f"{name} is unavailable (circuit open)")
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """Fails fast after repeated upstream failures.
+
+    Closed: calls go through and consecutive failures are counted. After
+    ``failure_threshold`` of them the breaker opens and ``before_call`` raises
+    CircuitOpenError for ``recovery_seconds``. Then it is half-open: one
+    trial call is let through; success closes the breaker, failure re-opens
+    it for another ``recovery_seconds``.
+    """
+
+    def __init__(self, name: str, failure_threshold: int, recovery_seconds: float):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_seconds = recovery_seconds
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self.opened = 0
+        self.rejected = 0
+        self.successes = 0
+        self.failures = 0
+
+    @property
+    def state(self) -> str:
+        if self._state == OPEN and self._retry_after() <= 0:
+            return HALF_OPEN
+        return self._state
+
+    def _retry_after(self) -> float:
+        return self._opened_at + self.recovery_seconds - time.monotonic()
+
+    def before_call(self) -> None:
+        """Raise CircuitOpenError unless a call may be made now"""
+        state = self.state
+        if state == CLOSED:
+            return
+        if state == HALF_OPEN and (
+            not self._trial_in_flight or self._retry_after() <= 0
+        ):
+            # A trial that never reported back frees up after recovery_seconds
+            self._state = HALF_OPEN
+            self._trial_in_flight = True
+            self._opened_at = time.monotonic()
+            return
+        self.rejected += 1
+        raise CircuitOpenError(self.name, max(self._retry_after(), 1.0))
+
+    def record_success(self) -> None:
+        self.successes += 1
+        self._failures = 0
+        self._trial_in_flight = False
+        self._state = CLOSED
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self._failures += 1
+        if self._trial_in_flight or self._failures >= self.failure_threshold:
+            if self._state != OPEN:
+                self.opened += 1
+            self._state = OPEN
+            self._opened_at = time.monotonic()
+            self._trial_in_flight = False
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "state": _STATE_VALUES[self.state],
+            "consecutive_failures": self._failures,
+            "opened": self.opened,
+            "rejected": self.rejected,
+            "successes": self.successes,
+            "failures": self.failures,
+        }
@@ -0,0 +1,54 @@
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict
+
+
+class QueueFullError(Exception):
+    """Raised when too many callers are already waiting for a slot"""
+
+
+class ConcurrencyLimiter:
+    """A semaphore with a bounded wait queue.
+
+    At most ``limit`` callers hold a slot at once and at most ``max_waiting``
+    (0 for no bound) wait for one; beyond that ``slot`` raises QueueFullError
+    instead of piling up.
+    """
+
+    def __init__(self, limit: int, max_waiting: int = 0):
+        self.max_waiting = max_waiting
+        self._semaphore = asyncio.Semaphore(limit)
+        self.active = 0
+        self.waiting = 0
+        self.acquired = 0
+        self.queued = 0
+        self.rejected = 0
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        if self._semaphore.locked():
+            if self.max_waiting and self.waiting >= self.max_waiting:
+                self.rejected += 1
+                raise QueueFullError("Too many requests waiting")
+            self.queued += 1
+        self.waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.waiting -= 1
+        self.active += 1
+        self.acquired += 1
+        try:
+            yield
+        finally:
+            self.active -= 1
+            self._semaphore.release()
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "active": self.active,
+            "waiting": self.waiting,
+            "acquired": self.acquired,
+            "queued": self.queued,
+            "rejected": self.rejected,
+        }
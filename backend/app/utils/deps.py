@@ -1,14 +1,18 @@
-from typing import Generator
+import math
+from typing import Any, Dict, Generator, Optional
 
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import jwt, JWTError
 from pydantic import ValidationError
 
 from app.core import security
 from app.core.config import settings
-from app.models.user import User
+from app.core.metrics import timed_phase
+from app.core.rate_limit import RateLimiter
+from app.models.user import TokenUser, User
 from app.services.neo4j_service import neo4j_service
+from app.services.user_cache import user_cache
 
 reusable_oauth2 = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/auth/login")
 
@@ -21,23 +25,50 @@ def get_db() -> Generator:
         session.close()
 
 
-async def get_current_user(token: str = Depends(reusable_oauth2)) -> User:
+def decode_token(
+    token: str, token_type: str = security.ACCESS_TOKEN_TYPE
+) -> Dict[str, Any]:
+    """Decode and check a JWT, raising 403 if it is invalid, revoked or the wrong type"""
     try:
         payload = jwt.decode(
             token, settings.SECRET_KEY, algorithms=[security.ALGORITHM]
         )
-        user_email: str = payload.get("sub")
-        if user_email is None:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Could not validate credentials",
-            )
     except (JWTError, ValidationError):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Could not validate credentials",
         )
 
+    # Legacy tokens carry no type and are treated as access tokens
+    if (
+        payload.get("sub") is None
+        or payload.get("type", security.ACCESS_TOKEN_TYPE) != token_type
+        or security.token_revocation_list.is_revoked(payload.get("jti"))
+        or security.token_revocation_list.is_user_revoked(
+            payload.get("uid"), payload.get("iat")
+        )
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Could not validate credentials",
+        )
+
+    return payload
+
+
+async def get_current_user(token: str = Depends(reusable_oauth2)) -> User:
+    with timed_phase("auth"):
+        return await _resolve_user(token)
+
+
+async def _resolve_user(token: str) -> User:
+    payload = decode_token(token)
+    user_email: str = payload["sub"]
+
+    cached_user = user_cache.get(user_email)
+    if cached_user is not None:
+        return cached_user
+
     # Get the user from the database
     user = await neo4j_service.get_user_by_email(user_email)
     if user is None:
@@ -46,25 +77,48 @@ async def get_current_user(token: str = Depends(reusable_oauth2)) -> User:
             detail="User not found",
         )
 
-    # Return the User model (not UserInDB which includes password)
-    return User(
+    # Return the User model (not UserInDB which includes password). The data was
+    # validated when UserInDB was built, so skip a second validation pass.
+    current_user = User.model_construct(**user.model_dump(exclude={"hashed_password"}))
+    user_cache.set(user_email, current_user)
+    return current_user
+
+
+async def get_current_principal(token: str = Depends(reusable_oauth2)) -> TokenUser:
+    """Resolve the caller's id, email and role, from token claims when available.
+
+    Handlers that only need ownership or role checks depend on this instead of
+    get_current_user so that signed-claims tokens never touch Neo4j.
+    """
+    with timed_phase("auth"):
+        payload = decode_token(token)
+
+    if settings.AUTH_STATELESS_TOKENS and payload.get("uid"):
+        return TokenUser.model_construct(
+            id=payload["uid"],
+            email=payload["sub"],
+            role=payload.get("role", "user"),
+            account_active=payload.get("account_active", True),
+        )
+
+    user = await get_current_user(token)
+    return TokenUser.model_construct(
         id=user.id,
         email=user.email,
-        phone_number=user.phone_number,
-        zip_code=user.zip_code,
-        email_notifications_enabled=getattr(user, "email_notifications_enabled", True),
-        sms_notifications_enabled=getattr(user, "sms_notifications_enabled", True),
-        sms_notification_frequency=getattr(
-            user, "sms_notification_frequency", "monthly"
-        ),
-        maintenance_notification_frequency=getattr(
-            user, "maintenance_notification_frequency", "quarterly"
-        ),
-        last_update_request=getattr(user, "last_update_request", None),
-        last_maintenance_notification=getattr(
-            user, "last_maintenance_notification", None
-        ),
-        last_login=getattr(user, "last_login", None),
-        role=getattr(user, "role", "user"),
-        account_active=getattr(user, "account_active", True),
+        role=user.role,
+        account_active=user.account_active,
     )
+
+
+async def enforce_rate_limit(
+    limiter: RateLimiter, request: Request, account: Optional[str] = None
+) -> None:
+    """Raise 429 if the client IP or account has exhausted its attempts"""
+    client_ip = request.client.host if request.client else None
+    retry_after = await limiter.hit(client_ip, account)
+    if retry_after:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many attempts. Please try again later.",
+            headers={"Retry-After": str(math.ceil(retry_after))},
+        )
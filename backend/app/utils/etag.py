@@ -0,0 +1,37 @@
+from typing import Any
+
+from fastapi import Request, Response, status
+
+# Browsers may keep the body but must revalidate it with If-None-Match each time
+CACHE_CONTROL = "private, no-cache"
+
+
+def make_etag(*parts: Any) -> str:
+    """Build a weak ETag from version components"""
+    return 'W/"' + "-".join(str(part) for part in parts) + '"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Weak comparison of the request's If-None-Match against an ETag"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(
+        candidate.strip().removeprefix("W/") == opaque
+        for candidate in header.split(",")
+    )
+
+
+def not_modified(etag: str) -> Response:
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED,
+        headers={"ETag": etag, "Cache-Control": CACHE_CONTROL},
+    )
+
+
+def set_etag(response: Response, etag: str) -> None:
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
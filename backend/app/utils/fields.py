@@ -0,0 +1,30 @@
+from typing import List, Optional, Sequence
+
+from fastapi import HTTPException, status
+
+
+def parse_fields(fields: Optional[str], allowed: Sequence[str]) -> Optional[List[str]]:
+    """Parse a comma-separated ``fields=`` parameter against a whitelist.
+
+    Returns None when no projection was requested. Otherwise returns ``id``
+    followed by the requested names in ``allowed`` order. Only
+    whitelisted names are ever interpolated into Cypher.
+    """
+    if fields is None or not fields.strip():
+        return None
+
+    requested = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = sorted(requested.difference(allowed))
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown fields: {', '.join(unknown)}",
+        )
+
+    return ["id"] + [name for name in allowed if name in requested and name != "id"]
+
+
+def fields_etag_part(selected: Optional[List[str]]) -> str:
+    """ETag component distinguishing sparse responses from full ones"""
+    # No commas: If-None-Match lists several ETags separated by commas
+    return "+".join(selected) if selected else "full"
@@ -0,0 +1,42 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+
+class SingleFlight:
+    """Coalesces concurrent calls for the same key into one execution.
+
+    The first caller for a key starts the work as a task; callers arriving
+    while it is in flight await the same task instead of starting their own.
+    The key is released as soon as the task finishes, so results are not
+    cached here. Cancelling one waiter does not cancel the shared task.
+    """
+
+    def __init__(self) -> None:
+        self._inflight: Dict[Hashable, "asyncio.Task[Any]"] = {}
+        self.executions = 0
+        self.coalesced = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._release(key, task))
+            self.executions += 1
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    def _release(self, key: Hashable, task: "asyncio.Task[Any]") -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # Mark the exception as retrieved when every waiter was cancelled
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "in_flight": len(self._inflight),
+            "executions": self.executions,
+            "coalesced": self.coalesced,
+        }
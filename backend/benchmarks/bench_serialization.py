@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Compare JSON response serialization paths on a large maintenance history.
+
+    python -m benchmarks.bench_serialization [--records 10000] [--rounds 20]
+
+Paths measured:
+  fastapi-default  response_model re-validation + stdlib json (JSONResponse)
+  fastapi-orjson   response_model re-validation + orjson (FastJSONResponse)
+  trusted          precomputed pydantic serializer, no re-validation
+"""
+import argparse
+import os
+import sys
+import time
+import uuid
+from datetime import date, datetime, timedelta
+from typing import List
+
+# Add the backend directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi import FastAPI  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+from app.core.responses import FastJSONResponse, ResponseSerializer  # noqa: E402
+from app.models.maintenance import Maintenance  # noqa: E402
+
+
+def build_records(count: int) -> List[Maintenance]:
+    start = date(2015, 1, 1)
+    return [
+        Maintenance(
+            id=str(uuid.uuid4()),
+            vehicle_id="bench-vehicle",
+            service_type="Oil Change" if i % 3 else "Tire Rotation",
+            mileage=1000 + i * 250,
+            service_date=start + timedelta(days=i % 3650),
+            description=f"Routine service #{i}, replaced filter and topped up fluids",
+            cost=49.99 + (i % 40),
+            service_provider="Quick Lube",
+            created_at=datetime(2024, 1, 1) + timedelta(minutes=i),
+        )
+        for i in range(count)
+    ]
+
+
+def build_app(records: List[Maintenance]) -> FastAPI:
+    app = FastAPI()
+    serializer = ResponseSerializer(List[Maintenance])
+
+    @app.get("/fastapi-default", response_model=List[Maintenance])
+    async def fastapi_default():
+        return records
+
+    @app.get(
+        "/fastapi-orjson",
+        response_model=List[Maintenance],
+        response_class=FastJSONResponse,
+    )
+    async def fastapi_orjson():
+        return records
+
+    @app.get("/trusted", response_model=List[Maintenance])
+    async def trusted():
+        return serializer.response(records)
+
+    return app
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--records", type=int, default=10000)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    records = build_records(args.records)
+    client = TestClient(build_app(records))
+
+    print(f"{args.records} records, {args.rounds} rounds per path")
+    print(f"{'path':<18}{'ms/response':>14}{'MB/s':>10}{'responses/s':>14}")
+    for path in ("fastapi-default", "fastapi-orjson", "trusted"):
+        body = client.get(f"/{path}").content  # warm up
+        started = time.perf_counter()
+        for _ in range(args.rounds):
+            client.get(f"/{path}")
+        elapsed = time.perf_counter() - started
+        per_response = elapsed / args.rounds
+        print(
+            f"{path:<18}{per_response * 1000:>14.1f}"
+            f"{len(body) / per_response / 1e6:>10.1f}"
+            f"{1 / per_response:>14.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Throughput and resilience of the CarAPI and Claude clients against the local
+mock upstreams (no network access, no API keys).
+
+    python -m benchmarks.bench_upstreams [--requests 200] [--concurrency 20]
+        [--latency-ms 50] [--error-rate 0.0]
+
+CarAPI lookups bypass the catalog cache (every call goes upstream) but still
+go through single-flight, retries and the circuit breaker.
+"""
+import argparse
+import asyncio
+import os
+import socket
+import sys
+import threading
+import time
+from typing import Awaitable, Callable, List
+
+# Add the backend directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import uvicorn  # noqa: E402
+
+from app.core.config import settings  # noqa: E402
+from benchmarks.mock_upstreams import MockConfig, create_app  # noqa: E402
+
+
+def start_mock_server(config: MockConfig) -> str:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    server = uvicorn.Server(
+        uvicorn.Config(create_app(config), port=port, log_level="error")
+    )
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.01)
+    return f"http://127.0.0.1:{port}"
+
+
+async def run_load(
+    call: Callable[[int], Awaitable[object]], requests: int, concurrency: int
+) -> List[float]:
+    """Run ``call(i)`` for i in range(requests); returns latencies (failed
+    calls are recorded as negative)"""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+
+    async def one(i: int) -> None:
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                await call(i)
+                latencies.append(time.perf_counter() - started)
+            except Exception:
+                latencies.append(-(time.perf_counter() - started))
+
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    return latencies
+
+
+def report(name: str, latencies: List[float], elapsed: float) -> None:
+    ok = sorted(latency for latency in latencies if latency >= 0)
+    failed = len(latencies) - len(ok)
+    p50 = ok[len(ok) // 2] * 1000 if ok else 0.0
+    p99 = ok[min(len(ok) - 1, int(len(ok) * 0.99))] * 1000 if ok else 0.0
+    print(
+        f"{name:<10}{len(latencies) / elapsed:>10.1f}{p50:>10.1f}{p99:>10.1f}"
+        f"{failed:>9}"
+    )
+
+
+async def bench(args: argparse.Namespace) -> None:
+    # Services read their settings when constructed, so import them afterwards
+    from app.core.http_clients import http_clients
+    from app.models.vehicle import Vehicle
+    from app.services.carapi_service import CarAPIService
+    from app.services.catalog_cache import CatalogCache
+    from app.services.claude_service import ClaudeService
+
+    carapi = CarAPIService(
+        cache=CatalogCache("", max_entries=1, ttl_seconds=0, max_stale_seconds=0)
+    )
+    claude = ClaudeService()
+    vehicle = Vehicle(
+        id="bench", owner_id="bench", brand="Honda", model="Civic", year=2019
+    )
+    http_clients.start()
+
+    print(f"{'client':<10}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}{'failed':>9}")
+    for name, call in (
+        # Distinct years so single-flight does not coalesce the calls away
+        ("carapi", lambda i: carapi.get_makes(1900 + i)),
+        ("claude", lambda i: claude.get_maintenance_recommendations(vehicle, [])),
+    ):
+        started = time.perf_counter()
+        latencies = await run_load(call, args.requests, args.concurrency)
+        report(name, latencies, time.perf_counter() - started)
+
+    print(f"carapi breaker: {carapi.breaker.stats()}")
+    print(f"pools: {http_clients.stats()}")
+    await http_clients.close_all()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    base_url = start_mock_server(
+        MockConfig(latency_ms=args.latency_ms, error_rate=args.error_rate)
+    )
+    settings.CARAPI_BASE_URL = f"{base_url}/carapi"
+    settings.CARAPI_TOKEN = settings.CARAPI_SECRET = "bench"
+    settings.CLAUDE_API_URL = f"{base_url}/v1/messages"
+    settings.CLAUDE_API_KEY = "bench"
+
+    print(
+        f"{args.requests} requests per client, concurrency {args.concurrency}, "
+        f"mock latency {args.latency_ms} ms, error rate {args.error_rate}"
+    )
+    asyncio.run(bench(args))
+
+
+if __name__ == "__main__":
+    main()
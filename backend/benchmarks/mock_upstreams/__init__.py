@@ -0,0 +1,14 @@
+"""
+Local stand-ins for CarAPI and the Anthropic messages API.
+
+    python -m benchmarks.mock_upstreams [--port 8900] [--latency-ms 50]
+        [--jitter-ms 0] [--error-rate 0] [--payload-scale 1] [--seed 0]
+
+Point the backend at it with
+    CARAPI_BASE_URL=http://localhost:8900/carapi
+    CLAUDE_API_URL=http://localhost:8900/v1/messages
+so throughput and resilience benchmarks never reach the paid APIs.
+"""
+from benchmarks.mock_upstreams.app import MockConfig, create_app
+
+__all__ = ["MockConfig", "create_app"]
@@ -0,0 +1,244 @@
+import asyncio
+import random
+import time
+import uuid
+import zlib
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, List, Optional
+
+from fastapi import APIRouter, FastAPI, Header, Request
+from fastapi.responses import JSONResponse, PlainTextResponse
+from jose import jwt
+
+MAKES = [
+    "Acura", "Audi", "BMW", "Chevrolet", "Dodge", "Ford", "GMC", "Honda",
+    "Hyundai", "Jeep", "Kia", "Lexus", "Mazda", "Nissan", "Subaru", "Toyota",
+]  # fmt: skip
+TRIMS = ["Base", "LX", "EX", "Sport", "Touring", "Limited", "Platinum"]
+YEARS = list(range(2010, 2026))
+
+LOREM = (
+    "Replace the engine oil and filter, rotate the tires and inspect the "
+    "brake pads. Check coolant, transmission fluid and wiper blades. "
+)
+
+
+@dataclass
+class MockConfig:
+    """Behaviour of the stand-in upstreams; adjustable at runtime through
+    PUT /_mock/config"""
+
+    latency_ms: float = 50.0
+    jitter_ms: float = 0.0
+    error_rate: float = 0.0
+    # Multiplies list lengths (makes/models/trims) and Claude response size
+    payload_scale: int = 1
+    seed: int = 0
+    token_ttl_seconds: int = 7 * 24 * 3600
+
+
+def _names(prefix: List[str], count: int, fallback: str) -> List[str]:
+    return [
+        prefix[i] if i < len(prefix) else f"{fallback} {i + 1}" for i in range(count)
+    ]
+
+
+def _stable_id(*parts: Any) -> int:
+    # Same ids for the same catalog path on every run
+    return zlib.crc32("/".join(str(p) for p in parts).encode()) % 1_000_000
+
+
+_UNAUTHORIZED = {"exception": "Unauthorized"}
+
+
+class MockUpstreams:
+    """Shared state and handlers of the stand-in CarAPI and Anthropic APIs"""
+
+    def __init__(self, config: MockConfig):
+        self.config = config
+        self.rng = random.Random(config.seed)
+        self.counts: Dict[str, int] = {}
+
+    async def simulate(self, route: str) -> Optional[JSONResponse]:
+        """Count, delay and maybe fail a request; returns the error response"""
+        self.counts[route] = self.counts.get(route, 0) + 1
+        delay = self.config.latency_ms + self.rng.uniform(0, self.config.jitter_ms)
+        if delay > 0:
+            await asyncio.sleep(delay / 1000)
+        if self.rng.random() >= self.config.error_rate:
+            return None
+        self.counts[f"{route}_errors"] = self.counts.get(f"{route}_errors", 0) + 1
+        if route == "messages":
+            return JSONResponse(
+                {
+                    "type": "error",
+                    "error": {"type": "rate_limit_error", "message": "mock"},
+                },
+                status_code=429,
+                headers={"retry-after": "1"},
+            )
+        return JSONResponse({"exception": "mock upstream error"}, status_code=503)
+
+    @staticmethod
+    def authorized(authorization: Optional[str]) -> bool:
+        if not authorization or not authorization.startswith("Bearer "):
+            return False
+        try:
+            jwt.decode(authorization[7:], "mock-carapi", algorithms=["HS256"])
+        except Exception:
+            return False
+        return True
+
+    async def carapi_call(self, route: str, authorization: Optional[str]) -> Any:
+        """Auth check plus simulate() for a catalog route; the error, or None"""
+        if not self.authorized(authorization):
+            return JSONResponse(_UNAUTHORIZED, status_code=401)
+        return await self.simulate(route)
+
+    # CarAPI
+
+    async def login(self, request: Request):
+        error = await self.simulate("login")
+        if error:
+            return error
+        body = await request.json()
+        if not body.get("api_token") or not body.get("api_secret"):
+            return JSONResponse(_UNAUTHORIZED, status_code=401)
+        token = jwt.encode(
+            {
+                "sub": body["api_token"],
+                "exp": int(time.time()) + self.config.token_ttl_seconds,
+            },
+            "mock-carapi",
+        )
+        # CarAPI returns the bare JWT as text
+        return PlainTextResponse(token)
+
+    async def years(self, authorization: Optional[str] = Header(None)):
+        return await self.carapi_call("years", authorization) or YEARS
+
+    async def makes(self, year: int, authorization: Optional[str] = Header(None)):
+        error = await self.carapi_call("makes", authorization)
+        if error:
+            return error
+        names = _names(MAKES, len(MAKES) * self.config.payload_scale, "Make")
+        return {"data": [{"id": _stable_id(name), "name": name} for name in names]}
+
+    async def models(
+        self, year: int, make: str, authorization: Optional[str] = Header(None)
+    ):
+        error = await self.carapi_call("models", authorization)
+        if error:
+            return error
+        names = [f"{make[:3]}-{i + 1}" for i in range(8 * self.config.payload_scale)]
+        return {
+            "data": [
+                {
+                    "id": _stable_id(make, name),
+                    "make_id": _stable_id(make),
+                    "name": name,
+                }
+                for name in names
+            ]
+        }
+
+    async def trims(
+        self,
+        year: int,
+        make: str,
+        model: str,
+        authorization: Optional[str] = Header(None),
+    ):
+        error = await self.carapi_call("trims", authorization)
+        if error:
+            return error
+        names = _names(TRIMS, 4 * self.config.payload_scale, "Trim")
+        return {
+            "data": [
+                {
+                    "id": _stable_id(year, make, model, name),
+                    "make_model_id": _stable_id(make, model),
+                    "year": year,
+                    "name": name,
+                    "trim": name,
+                    "description": f"{year} {make} {model} {name}",
+                }
+                for name in names
+            ]
+        }
+
+    # Anthropic
+
+    async def messages(self, request: Request, x_api_key: Optional[str] = Header(None)):
+        if not x_api_key:
+            return JSONResponse(
+                {"type": "error", "error": {"type": "authentication_error"}},
+                status_code=401,
+            )
+        error = await self.simulate("messages")
+        if error:
+            return error
+        body = await request.json()
+        prompt = "".join(m.get("content", "") for m in body.get("messages", []))
+        text = LOREM * (10 * self.config.payload_scale)
+        return {
+            "id": f"msg_{uuid.uuid4().hex[:24]}",
+            "type": "message",
+            "role": "assistant",
+            "model": body.get("model"),
+            "content": [{"type": "text", "text": text}],
+            "stop_reason": "end_turn",
+            "usage": {
+                "input_tokens": len(prompt) // 4,
+                "output_tokens": len(text) // 4,
+            },
+        }
+
+    # Control
+
+    async def get_config(self):
+        return asdict(self.config)
+
+    async def update_config(self, changes: Dict[str, Any]):
+        for key, value in changes.items():
+            if hasattr(self.config, key):
+                setattr(self.config, key, type(getattr(self.config, key))(value))
+        if "seed" in changes:
+            self.rng.seed(self.config.seed)
+        return asdict(self.config)
+
+    async def stats(self):
+        return self.counts
+
+
+def _carapi_router(mock: MockUpstreams) -> APIRouter:
+    router = APIRouter(prefix="/carapi")
+    router.add_api_route("/auth/login", mock.login, methods=["POST"])
+    router.add_api_route("/years", mock.years, methods=["GET"])
+    router.add_api_route("/makes", mock.makes, methods=["GET"])
+    router.add_api_route("/models/v2", mock.models, methods=["GET"])
+    router.add_api_route("/trims/v2", mock.trims, methods=["GET"])
+    return router
+
+
+def _anthropic_router(mock: MockUpstreams) -> APIRouter:
+    router = APIRouter(prefix="/v1")
+    router.add_api_route("/messages", mock.messages, methods=["POST"])
+    return router
+
+
+def _control_router(mock: MockUpstreams) -> APIRouter:
+    router = APIRouter(prefix="/_mock")
+    router.add_api_route("/config", mock.get_config, methods=["GET"])
+    router.add_api_route("/config", mock.update_config, methods=["PUT"])
+    router.add_api_route("/stats", mock.stats, methods=["GET"])
+    return router
+
+
+def create_app(config: Optional[MockConfig] = None) -> FastAPI:
+    mock = MockUpstreams(config or MockConfig())
+    app = FastAPI(title="CarLog mock upstreams")
+    app.include_router(_carapi_router(mock))
+    app.include_router(_anthropic_router(mock))
+    app.include_router(_control_router(mock))
+    return app
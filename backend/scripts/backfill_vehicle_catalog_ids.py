@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+Normalise brand/model on existing vehicles and fill in missing CarAPI
+brand_id/model_id from the offline catalog snapshot
+
+Usage: python scripts/backfill_vehicle_catalog_ids.py [--batch-size 500] [--dry-run]
+"""
+import argparse
+import asyncio
+import sys
+import os
+
+# Add the parent directory to the path so we can import from app
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.catalog_snapshot import catalog_snapshot_store
+from app.services.neo4j_service import neo4j_service
+from app.services.vehicle_normalizer import vehicle_normalizer
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Backfill vehicle CarAPI ids")
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+
+    await catalog_snapshot_store.load()
+    try:
+        result = await vehicle_normalizer.backfill(
+            neo4j_service, batch_size=args.batch_size, dry_run=args.dry_run
+        )
+    except Exception as e:
+        print(f"❌ Backfill failed: {e}")
+        sys.exit(1)
+
+    action = "Would update" if args.dry_run else "Updated"
+    print(f"✅ Scanned {result['scanned']} vehicles missing ids")
+    print(f"{action} {result['updated']} vehicles")
+    print(f"Unmatched brand/model values: {vehicle_normalizer.unmatched}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
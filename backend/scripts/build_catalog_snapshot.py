@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+"""
+Build the offline vehicle catalog snapshot used by /vehicles/catalog/search
+
+Usage: python scripts/build_catalog_snapshot.py [YEAR ...]
+"""
+import asyncio
+import sys
+import os
+
+# Add the parent directory to the path so we can import from app
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.config import settings
+from app.services.carapi_service import carapi_service
+from app.services.catalog_snapshot import catalog_snapshot_store
+
+
+async def main():
+    years = [int(year) for year in sys.argv[1:]] or None
+    print(f"Building catalog snapshot for {'all years' if years is None else years}...")
+
+    try:
+        await catalog_snapshot_store.rebuild(carapi_service, years)
+    except Exception as e:
+        print(f"❌ Failed to build snapshot: {e}")
+        sys.exit(1)
+    finally:
+        await carapi_service.close()
+
+    status = catalog_snapshot_store.status()
+    print(f"✅ Wrote {status['rows']} models to {settings.CARAPI_SNAPSHOT_PATH}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -5,6 +5,22 @@ import pytest
 from fastapi.testclient import TestClient
 
 from app.main import app
+from app.core.rate_limit import rate_limit_backend
+from app.core.security import token_revocation_list
+
+
+@pytest.fixture(autouse=True)
+def reset_rate_limits():
+    """Give every test fresh login/registration rate limit buckets."""
+    rate_limit_backend.reset()
+    yield
+
+
+@pytest.fixture(autouse=True)
+def reset_token_revocations():
+    """Undo token revocations made by a test."""
+    yield
+    token_revocation_list.reset()
 
 
 @pytest.fixture
@@ -1,8 +1,18 @@
 """
 Tests for authentication endpoints.
 """
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from fastapi import HTTPException
 from fastapi.testclient import TestClient
 
+from app.core import security
+from app.core.rate_limit import InMemoryRateLimitBackend, login_rate_limiter
+from app.models.user import User
+from app.utils import deps
+
 
 def test_login_endpoint_exists(client: TestClient):
     """Test that login endpoint exists and handles POST requests."""
@@ -27,4 +37,68 @@ def test_register_endpoint_exists(client: TestClient):
     )
     assert response.status_code == 200
     data = response.json()
-    assert "message" in data
\ No newline at end of file
+    assert "message" in data
+
+
+def test_stateless_token_resolves_without_database():
+    """Signed-claims tokens resolve a principal straight from the JWT."""
+    user = User(id="user-1", email="claims@example.com", role="admin")
+    token = security.create_access_token(
+        user.email, claims=security.user_token_claims(user)
+    )
+
+    with patch.object(deps.settings, "AUTH_STATELESS_TOKENS", True), patch.object(
+        deps, "neo4j_service"
+    ) as mock_db:
+        principal = asyncio.run(deps.get_current_principal(token))
+        mock_db.get_user_by_email.assert_not_called()
+
+    assert principal.id == "user-1"
+    assert principal.role == "admin"
+
+
+def test_revoked_user_tokens_are_rejected():
+    """Tokens issued before a user-level revocation are refused."""
+    user = User(id="user-2", email="revoked@example.com")
+    token = security.create_access_token(
+        user.email, claims=security.user_token_claims(user)
+    )
+    refresh = security.create_refresh_token(user.email, user.id)
+
+    with pytest.raises(HTTPException):
+        deps.decode_token(refresh)  # refresh tokens are not access tokens
+
+    security.token_revocation_list.revoke_user_tokens(user.id)
+    with pytest.raises(HTTPException) as exc_info:
+        deps.decode_token(token)
+    assert exc_info.value.status_code == 403
+
+
+def test_login_is_throttled_before_authentication(client: TestClient):
+    """Requests over the per-account limit get 429 without reaching bcrypt/Neo4j."""
+    with patch(
+        "app.api.v1.endpoints.auth.neo4j_service.authenticate_user",
+        new=AsyncMock(return_value=None),
+    ) as mock_authenticate:
+        statuses = [
+            client.post(
+                "/api/v1/auth/login",
+                data={"username": "victim@example.com", "password": "guess"},
+            ).status_code
+            for _ in range(login_rate_limiter.per_account_per_minute + 1)
+        ]
+
+    assert statuses[:-1] == [401] * login_rate_limiter.per_account_per_minute
+    assert statuses[-1] == 429
+    assert mock_authenticate.await_count == login_rate_limiter.per_account_per_minute
+
+
+def test_token_bucket_refills_over_time():
+    """A drained bucket reports a retry delay and refills with time."""
+    backend = InMemoryRateLimitBackend()
+    with patch("app.core.rate_limit.time.monotonic", return_value=100.0):
+        assert asyncio.run(backend.take("k", 2, 1.0)) == 0
+        assert asyncio.run(backend.take("k", 2, 1.0)) == 0
+        assert asyncio.run(backend.take("k", 2, 1.0)) == 1.0
+    with patch("app.core.rate_limit.time.monotonic", return_value=101.0):
+        assert asyncio.run(backend.take("k", 2, 1.0)) == 0
@@ -0,0 +1,86 @@
+"""
+Tests for the queued, sampled logging pipeline.
+"""
+import json
+import logging
+import queue
+
+from app.core.logging_config import (
+    JsonFormatter,
+    NonBlockingQueueHandler,
+    SamplingFilter,
+)
+
+
+def make_record(msg, *args, level=logging.INFO, name="app.test", **extra):
+    record = logging.LogRecord(name, level, __file__, 1, msg, args, None)
+    record.__dict__.update(extra)
+    return record
+
+
+class TestSamplingFilter:
+    """Tests for per-logger sampling and per-template rate limits."""
+
+    def test_sampling_only_applies_below_warning(self):
+        """Test that a zero sample rate drops INFO but keeps errors."""
+        sampler = SamplingFilter({"app.services": 0.0})
+
+        assert not sampler.filter(make_record("lookup", name="app.services.db"))
+        assert sampler.filter(
+            make_record("failed", level=logging.ERROR, name="app.services.db")
+        )
+        assert sampler.filter(make_record("lookup", name="app.api"))
+        assert sampler.sampled_out == 1
+
+    def test_rate_limit_groups_by_template(self):
+        """Test that repeats of one template are capped and then reported."""
+        limiter = SamplingFilter(rate_limit_per_minute=2)
+        template = "Neo4j error retrieving vehicle %s: %s"
+
+        allowed = [
+            limiter.filter(make_record(template, i, "down", level=logging.ERROR))
+            for i in range(5)
+        ]
+        assert allowed == [True, True, False, False, False]
+        assert limiter.filter(make_record("Other message %s", 1, level=logging.ERROR))
+        assert limiter.rate_limited == 3
+
+        # Once the bucket refills, the next record carries the dropped count
+        key = ("app.test", logging.ERROR, template)
+        limiter._buckets[key][0] = 1
+        record = make_record(template, 6, "down", level=logging.ERROR)
+        assert limiter.filter(record)
+        assert record.suppressed == 3
+
+
+class TestQueueHandler:
+    """Tests for the non-blocking queue handler."""
+
+    def test_full_queue_drops_instead_of_blocking(self):
+        """Test that records are dropped and counted when the queue is full."""
+        handler = NonBlockingQueueHandler(queue.Queue(maxsize=1))
+
+        handler.handle(make_record("first %s", 1))
+        handler.handle(make_record("second %s", 2))
+
+        assert handler.enqueued == 1
+        assert handler.dropped == 1
+        queued = handler.queue.get_nowait()
+        assert queued.msg == "first 1"
+        assert queued.args is None
+
+
+class TestJsonFormatter:
+    """Tests for structured JSON output."""
+
+    def test_extra_fields_are_emitted(self):
+        """Test that `extra` fields appear as JSON keys."""
+        line = JsonFormatter().format(
+            make_record("HTTP exception on %s", "/api/v1/vehicles", status_code=404)
+        )
+
+        entry = json.loads(line)
+        assert entry["message"] == "HTTP exception on /api/v1/vehicles"
+        assert entry["status_code"] == 404
+        assert entry["level"] == "INFO"
+        assert entry["logger"] == "app.test"
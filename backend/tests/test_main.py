@@ -15,4 +15,53 @@ def test_health_check(client: TestClient):
     """Test that the API is running and accessible."""
     response = client.get("/")
     assert response.status_code == 200
-    assert "message" in response.json()
\ No newline at end of file
+    assert "message" in response.json()
+
+
+def test_server_timing_header(client: TestClient):
+    """Every response carries per-phase Server-Timing entries."""
+    response = client.get("/")
+    timing = response.headers["server-timing"]
+    for phase in ("auth", "db", "external", "serialize", "total"):
+        assert f"{phase};dur=" in timing
+
+
+def test_metrics_endpoint_uses_route_templates(client: TestClient):
+    """Latency histograms are labelled by route template, not raw URL."""
+    client.get("/api/v1/vehicles/some-vehicle-id")
+    body = client.get("/metrics").text
+    assert 'route="/api/v1/vehicles/{vehicle_id}"' in body
+    assert "some-vehicle-id" not in body
+    assert "carlog_http_request_duration_seconds_bucket" in body
+
+
+def test_phase_timer_survives_interleaved_tasks():
+    """Concurrent phases close their own frame; background tasks run untimed."""
+    import asyncio
+
+    from app.core import metrics
+
+    timer = metrics._PhaseTimer()
+    seen = []
+
+    async def lookup(name, delay):
+        with metrics.timed_phase(name):
+            await asyncio.sleep(delay)
+
+    async def background():
+        seen.append(metrics._current_timer.get())
+
+    async def run():
+        metrics._current_timer.set(timer)
+        with metrics.timed_phase("auth"):
+            # "db" is entered first but exits while "external" is on top
+            await asyncio.gather(lookup("db", 0.01), lookup("external", 0.03))
+        await metrics.create_background_task(background())
+
+    asyncio.run(run())
+    assert timer._stack == []
+    # Each phase is credited under its own name
+    assert timer.totals["external"] >= 0.025
+    assert timer.totals["db"] < 0.01
+    assert set(timer.totals) == {"auth", "db", "external"}
+    assert seen == [None]
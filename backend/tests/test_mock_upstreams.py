@@ -0,0 +1,43 @@
+"""
+Tests for the offline CarAPI/Claude stand-ins used by the benchmarks.
+"""
+from fastapi.testclient import TestClient
+
+from benchmarks.mock_upstreams import MockConfig, create_app
+
+
+def make_client(**config):
+    return TestClient(create_app(MockConfig(latency_ms=0, **config)))
+
+
+def test_carapi_routes_require_login():
+    """Catalog routes need the JWT from /auth/login and are deterministic."""
+    client = make_client(payload_scale=2)
+
+    assert client.get("/carapi/makes", params={"year": 2019}).status_code == 401
+
+    token = client.post(
+        "/carapi/auth/login", json={"api_token": "t", "api_secret": "s"}
+    ).text
+    headers = {"Authorization": f"Bearer {token}"}
+    first = client.get("/carapi/makes", params={"year": 2019}, headers=headers)
+    second = client.get("/carapi/makes", params={"year": 2019}, headers=headers)
+
+    assert first.status_code == 200
+    assert len(first.json()["data"]) == 32
+    assert first.json() == second.json()
+
+
+def test_error_rate_and_runtime_config():
+    """Injected Claude errors are 429s with retry-after; config can change."""
+    client = make_client(error_rate=1.0)
+    body = {"model": "m", "messages": [{"role": "user", "content": "hi"}]}
+
+    response = client.post("/v1/messages", json=body, headers={"x-api-key": "k"})
+    assert response.status_code == 429
+    assert response.headers["retry-after"] == "1"
+
+    client.put("/_mock/config", json={"error_rate": 0})
+    response = client.post("/v1/messages", json=body, headers={"x-api-key": "k"})
+    assert response.json()["content"][0]["type"] == "text"
+    assert client.get("/_mock/stats").json()["messages"] == 2
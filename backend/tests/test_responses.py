@@ -0,0 +1,108 @@
+"""
+Tests for the orjson default response class and the trusted-list serializers.
+"""
+import json
+from datetime import date, datetime
+from typing import Any, List
+
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.testclient import TestClient
+
+from app.api.v1.endpoints.admin import claude_log_list_serializer, user_list_serializer
+from app.api.v1.endpoints.maintenance import maintenance_list_serializer
+from app.api.v1.endpoints.vehicles import vehicle_list_serializer
+from app.core.responses import FastJSONResponse
+from app.main import app
+from app.models.maintenance import Maintenance
+from app.models.recommendation import ClaudeAPILog
+from app.models.user import UserWithVehicleCount
+from app.models.vehicle import Vehicle
+
+CREATED = datetime(2024, 3, 1, 9, 30, 15, 250000)
+
+
+class _StoredUser(UserWithVehicleCount):
+    """A richer model than the route declares, like UserInDB"""
+
+    hashed_password: str
+
+
+def _via_response_model(response_type: Any, content: List[Any]) -> Any:
+    """What FastAPI returned for the route before the serializers: response_model
+    validation and jsonable_encoder, rendered with the stdlib JSON encoder"""
+    reference = FastAPI(default_response_class=JSONResponse)
+    reference.add_api_route("/", lambda: content, response_model=response_type)
+    return TestClient(reference).get("/").json()
+
+
+def test_default_response_class_is_orjson():
+    """The app renders with orjson unless a route says otherwise."""
+    assert issubclass(FastJSONResponse, ORJSONResponse)
+    assert app.router.default_response_class is FastJSONResponse
+    assert (
+        FastJSONResponse({"at": CREATED}).body == b'{"at":"2024-03-01T09:30:15.250000"}'
+    )
+
+
+def test_serializers_match_response_model_output():
+    """Trusted lists serialise exactly as response_model did: same keys, same
+    datetime format, and no fields from richer subclasses."""
+    vehicles = [
+        Vehicle(id="v1", owner_id="u1", brand="Honda", model="Civic", year=2019),
+        Vehicle(
+            id="v2",
+            owner_id="u1",
+            brand="Ford",
+            model="F-150",
+            year=2021,
+            current_mileage=42000,
+            vin="1FTFW1E50MFA00001",
+        ),
+    ]
+    records = [
+        Maintenance(
+            id="m1",
+            vehicle_id="v1",
+            service_type="Oil change",
+            mileage=30000,
+            service_date=date(2024, 2, 29),
+            cost=49.99,
+            created_at=CREATED,
+        )
+    ]
+    users = [
+        _StoredUser(
+            id="u1",
+            email="owner@example.com",
+            last_login=CREATED,
+            vehicle_count=2,
+            hashed_password="secret-hash",
+        )
+    ]
+    logs = [
+        ClaudeAPILog(
+            id="l1",
+            vehicle_id="v1",
+            request_prompt="prompt",
+            response_text="response",
+            model_used="claude-3-5-sonnet-20241022",
+            created_at=CREATED,
+        )
+    ]
+
+    for serializer, response_type, content in [
+        (vehicle_list_serializer, List[Vehicle], vehicles),
+        (maintenance_list_serializer, List[Maintenance], records),
+        (user_list_serializer, List[UserWithVehicleCount], users),
+        (claude_log_list_serializer, List[ClaudeAPILog], logs),
+    ]:
+        response = serializer.response(content)
+        assert response.media_type == "application/json"
+        assert json.loads(response.body) == _via_response_model(
+            response_type, content
+        ), response_type
+
+    user = json.loads(user_list_serializer.dump(users))[0]
+    assert "hashed_password" not in user
+    assert user["last_login"] == "2024-03-01T09:30:15.250000"
@@ -2,7 +2,7 @@
 Tests for service classes.
 """
 import pytest
-from unittest.mock import Mock, patch
+from unittest.mock import AsyncMock, MagicMock, Mock, patch
 
 from app.services.sms_service import SMSService
 
@@ -48,4 +48,1067 @@ class TestSMSService:
         assert isinstance(result, dict)
         assert "type" in result
         assert "data" in result
-        assert result["type"] == "unknown"  # Current placeholder implementation
\ No newline at end of file
+        assert result["type"] == "unknown"  # Current placeholder implementation
+
+class TestExportService:
+    """Tests for streaming user history export."""
+
+    def _service(self):
+        from app.services.export_service import ExportService
+
+        rows = [
+            {"record_type": "vehicle", "id": "v1", "vehicle_id": "v1", "brand": "Toyota"},
+            {"record_type": "maintenance", "id": "m1", "vehicle_id": "v1", "cost": 45.5},
+        ]
+        db = Mock()
+        db.iter_user_export_rows.side_effect = lambda owner_id: iter(rows)
+        return ExportService(db)
+
+    def test_stream_ndjson(self):
+        """Each row becomes one JSON document per line."""
+        import json
+
+        lines = list(self._service().stream_ndjson("user-1"))
+        assert len(lines) == 2
+        assert all(line.endswith("\n") for line in lines)
+        assert json.loads(lines[1])["cost"] == 45.5
+
+    def test_stream_csv(self):
+        """CSV output starts with a header and keeps column order."""
+        from app.services.export_service import EXPORT_COLUMNS
+
+        lines = list(self._service().stream_csv("user-1"))
+        assert lines[0].strip() == ",".join(EXPORT_COLUMNS)
+        assert lines[1].startswith("vehicle,v1,v1,Toyota")
+        assert len(lines) == 3
+
+
+class TestUserCache:
+    """Tests for the resolved-user TTL/LRU cache."""
+
+    def _user(self, user_id, email):
+        from app.models.user import User
+
+        return User(id=user_id, email=email)
+
+    def test_hit_miss_and_invalidate(self):
+        """Cached users are returned until invalidated by id."""
+        from app.services.user_cache import UserCache
+
+        cache = UserCache(max_size=10, ttl_seconds=60)
+        assert cache.get("a@example.com") is None
+
+        cache.set("a@example.com", self._user("u1", "a@example.com"))
+        assert cache.get("a@example.com").id == "u1"
+
+        cache.invalidate_user("u1")
+        assert cache.get("a@example.com") is None
+
+        stats = cache.stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 2
+        assert stats["invalidations"] == 1
+
+    def test_lru_eviction(self):
+        """The least recently used subject is evicted when the cache is full."""
+        from app.services.user_cache import UserCache
+
+        cache = UserCache(max_size=2, ttl_seconds=60)
+        cache.set("a@example.com", self._user("u1", "a@example.com"))
+        cache.set("b@example.com", self._user("u2", "b@example.com"))
+        cache.get("a@example.com")
+        cache.set("c@example.com", self._user("u3", "c@example.com"))
+
+        assert cache.get("b@example.com") is None
+        assert cache.get("a@example.com") is not None
+        assert cache.stats()["evictions"] == 1
+
+    def test_expired_entries_miss(self):
+        """Entries past their TTL are treated as misses."""
+        from app.services.user_cache import UserCache
+
+        cache = UserCache(max_size=10, ttl_seconds=60)
+        cache.set("a@example.com", self._user("u1", "a@example.com"))
+        with patch("app.services.user_cache.time.monotonic", return_value=1e12):
+            assert cache.get("a@example.com") is None
+
+
+class TestPasswordHasher:
+    """Tests for the off-loop bcrypt pool."""
+
+    def test_hash_and_verify(self):
+        """Hashing and verification run in the pool and are counted."""
+        import asyncio
+
+        from app.core.security import PasswordHasher
+
+        hasher = PasswordHasher(max_workers=2)
+
+        async def run():
+            hashed = await hasher.hash("secret123")
+            return await hasher.verify_and_update("secret123", hashed)
+
+        try:
+            valid, new_hash = asyncio.run(run())
+        finally:
+            hasher.shutdown()
+
+        assert valid is True
+        assert new_hash is None
+        assert hasher.stats()["completed"] == 2
+        assert hasher.stats()["queued"] == 0
+
+    def test_outdated_cost_is_rehashed(self):
+        """A hash made with a different bcrypt cost comes back with a replacement."""
+        import asyncio
+
+        from passlib.context import CryptContext
+
+        from app.core.security import PasswordHasher
+
+        old_hash = CryptContext(schemes=["bcrypt"], bcrypt__rounds=4).hash("secret123")
+        hasher = PasswordHasher(max_workers=1)
+        try:
+            valid, new_hash = asyncio.run(
+                hasher.verify_and_update("secret123", old_hash)
+            )
+        finally:
+            hasher.shutdown()
+
+        assert valid is True
+        assert new_hash is not None and not new_hash.startswith("$2b$04$")
+
+
+class TestTimestampWriteBuffer:
+    """Tests for write-behind coalescing of user timestamps."""
+
+    def test_updates_are_coalesced_into_one_batch(self):
+        """Repeated updates collapse to the latest value per user and field."""
+        import asyncio
+        from datetime import datetime
+        from unittest.mock import AsyncMock
+
+        from app.services.write_behind import TimestampWriteBuffer
+
+        db = Mock()
+        db.set_user_timestamps = AsyncMock()
+        cache = Mock()
+        buffer = TimestampWriteBuffer(db, flush_interval=60, cache=cache)
+
+        buffer.record("u1", "last_login", datetime(2024, 1, 1, 9))
+        buffer.record("u1", "last_login", datetime(2024, 1, 1, 10))
+        buffer.record("u1", "last_login", datetime(2024, 1, 1, 8))
+        buffer.record("u2", "last_update_request", datetime(2024, 1, 2))
+
+        assert asyncio.run(buffer.flush()) == 2
+        db.set_user_timestamps.assert_awaited_once()
+        rows = {row["id"]: row["props"] for row in db.set_user_timestamps.await_args[0][0]}
+        assert rows["u1"] == {"last_login": "2024-01-01T10:00:00"}
+        assert rows["u2"] == {"last_update_request": "2024-01-02T00:00:00"}
+        # Cached users are dropped so the new timestamps are read back
+        invalidated = {c.args[0] for c in cache.invalidate_user.call_args_list}
+        assert invalidated == {"u1", "u2"}
+        assert asyncio.run(buffer.flush()) == 0
+
+    def test_failed_flush_keeps_updates(self):
+        """A failed batch is retried on the next flush."""
+        import asyncio
+        from datetime import datetime
+        from unittest.mock import AsyncMock
+
+        from app.services.write_behind import TimestampWriteBuffer
+
+        db = Mock()
+        db.set_user_timestamps = AsyncMock(side_effect=[Exception("down"), None])
+        cache = Mock()
+        buffer = TimestampWriteBuffer(db, flush_interval=60, cache=cache)
+        buffer.record("u1", "last_login", datetime(2024, 1, 1))
+
+        assert asyncio.run(buffer.flush()) == 0
+        assert buffer.stats()["pending_users"] == 1
+        cache.invalidate_user.assert_not_called()
+        assert asyncio.run(buffer.flush()) == 1
+
+
+class TestNeo4jTransaction:
+    """Tests for Neo4jService.transaction()."""
+
+    def _service(self):
+        from app.services.neo4j_service import Neo4jService
+
+        service = Neo4jService()
+        service.driver = MagicMock()
+        tx = service.driver.session.return_value.__enter__.return_value.begin_transaction.return_value
+        tx.closed.return_value = False
+        return service, tx
+
+    def test_queries_join_the_transaction_and_commit(self):
+        """Test that sessions opened inside the block run on the shared transaction."""
+        service, tx = self._service()
+
+        with service.transaction():
+            with service.get_session() as session:
+                session.run("RETURN 1", x=1)
+            with service.get_session() as session:
+                session.run("RETURN 2")
+
+        assert tx.run.call_count == 2
+        tx.commit.assert_called_once()
+        tx.rollback.assert_not_called()
+        # Outside the block, sessions come from the driver again
+        service.get_session()
+        service.driver.session.assert_called()
+
+    def test_error_rolls_back(self):
+        """Test that an exception inside the block rolls the transaction back."""
+        service, tx = self._service()
+
+        with pytest.raises(ValueError):
+            with service.transaction():
+                raise ValueError("boom")
+
+        tx.rollback.assert_called_once()
+        tx.commit.assert_not_called()
+
+    def test_side_effects_wait_for_commit(self):
+        """Post-commit callbacks run after commit and are dropped on rollback."""
+        from datetime import datetime
+
+        from app.services.neo4j_service import after_commit
+        from app.services.write_behind import TimestampWriteBuffer
+
+        service, tx = self._service()
+        buffer = TimestampWriteBuffer(service, flush_interval=60)
+        calls = []
+
+        with pytest.raises(ValueError):
+            with service.transaction():
+                after_commit(lambda: calls.append("rolled back"))
+                buffer.record("u1", "last_login", datetime(2024, 1, 1))
+                raise ValueError("boom")
+        assert calls == []
+        assert buffer.stats()["pending_users"] == 0
+
+        tx.commit.side_effect = lambda: calls.append("commit")
+        with service.transaction():
+            after_commit(lambda: calls.append("committed"))
+            assert calls == []
+        assert calls == ["commit", "committed"]
+
+        after_commit(lambda: calls.append("no transaction"))
+        assert calls[-1] == "no transaction"
+
+
+class TestCatalogCache:
+    """Tests for the two-tier CarAPI catalog cache."""
+
+    def _cache(self, path, **overrides):
+        from app.services.catalog_cache import CatalogCache
+
+        options = dict(max_entries=10, ttl_seconds=60, max_stale_seconds=3600)
+        options.update(overrides)
+        return CatalogCache(str(path), **options)
+
+    def test_miss_then_memory_and_disk_hits(self, tmp_path):
+        """A fetched entry is served from memory, and from disk after a restart."""
+        import asyncio
+
+        path = tmp_path / "catalog.sqlite3"
+        calls = []
+
+        async def fetch():
+            calls.append(1)
+            return [{"make": "Honda", "make_id": 1}]
+
+        cache = self._cache(path)
+        makes = asyncio.run(cache.get_or_fetch("makes?year=2020", fetch))
+        assert makes[0]["make"] == "Honda"
+        asyncio.run(cache.get_or_fetch("makes?year=2020", fetch))
+        cache.close()
+
+        restarted = self._cache(path)
+        makes = asyncio.run(restarted.get_or_fetch("makes?year=2020", fetch))
+        assert makes[0]["make_id"] == 1
+        assert len(calls) == 1
+        assert cache.stats()["memory_hits"] == 1
+        assert restarted.stats()["disk_hits"] == 1
+        restarted.close()
+
+    def test_stale_entry_served_while_refreshing(self, tmp_path):
+        """A stale entry is returned at once and refreshed in the background."""
+        import asyncio
+        import time
+
+        cache = self._cache(tmp_path / "catalog.sqlite3")
+        cache.set("years", [{"year": 2023}], fetched_at=time.time() - 120)
+
+        async def fetch():
+            return [{"year": 2024}]
+
+        async def run():
+            first = await cache.get_or_fetch("years", fetch)
+            await asyncio.gather(*cache._tasks)
+            second = await cache.get_or_fetch("years", fetch)
+            return first, second
+
+        first, second = asyncio.run(run())
+        assert first == [{"year": 2023}]
+        assert second == [{"year": 2024}]
+        assert cache.stats()["refreshes"] == 1
+        cache.close()
+
+    def test_expired_entry_served_when_upstream_fails(self, tmp_path):
+        """Past max staleness, an upstream error still falls back to the old copy."""
+        import asyncio
+        import time
+
+        cache = self._cache(tmp_path / "catalog.sqlite3")
+        cache.set("years", [{"year": 2023}], fetched_at=time.time() - 7200)
+
+        async def fetch():
+            raise Exception("CarAPI request failed: 503")
+
+        assert asyncio.run(cache.get_or_fetch("years", fetch)) == [{"year": 2023}]
+        cache.close()
+
+    def test_disk_access_runs_off_the_event_loop(self, tmp_path):
+        """SQLite reads and writes happen on the cache's own thread."""
+        import asyncio
+        import sqlite3
+        import threading
+
+        threads = set()
+        connect = sqlite3.connect
+
+        def tracking_connect(*args, **kwargs):
+            threads.add(threading.current_thread().name)
+            return connect(*args, **kwargs)
+
+        with patch(
+            "app.services.catalog_cache.sqlite3.connect", side_effect=tracking_connect
+        ):
+            cache = self._cache(tmp_path / "catalog.sqlite3")
+            cache.set("years", [{"year": 2024}])
+            cache.close()
+            restarted = self._cache(tmp_path / "catalog.sqlite3")
+            entry = asyncio.run(restarted.get("years"))
+            restarted.close()
+
+        assert entry[1] == [{"year": 2024}]
+        assert threads and all(name.startswith("catalog-cache") for name in threads)
+
+
+class TestSingleFlight:
+    """Tests for coalescing concurrent identical CarAPI lookups."""
+
+    def test_concurrent_calls_share_one_execution(self):
+        """Concurrent callers with the same key share a single call."""
+        import asyncio
+
+        from app.utils.singleflight import SingleFlight
+
+        flights = SingleFlight()
+        calls = []
+
+        async def work():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return "makes"
+
+        async def run():
+            return await asyncio.gather(
+                *(flights.do("makes?year=2024", work) for _ in range(50))
+            )
+
+        assert asyncio.run(run()) == ["makes"] * 50
+        assert len(calls) == 1
+        assert flights.stats() == {"in_flight": 0, "executions": 1, "coalesced": 49}
+
+    def test_errors_reach_every_waiter(self):
+        """A failed shared call raises in every caller and frees the key."""
+        import asyncio
+
+        from app.utils.singleflight import SingleFlight
+
+        flights = SingleFlight()
+
+        async def work():
+            await asyncio.sleep(0.01)
+            raise Exception("CarAPI request failed: 502")
+
+        async def run():
+            return await asyncio.gather(
+                *(flights.do("years", work) for _ in range(3)), return_exceptions=True
+            )
+
+        results = asyncio.run(run())
+        assert all(str(r) == "CarAPI request failed: 502" for r in results)
+        assert flights.stats()["in_flight"] == 0
+
+    def test_carapi_makes_go_upstream_once(self):
+        """Identical concurrent get_makes calls on a cold cache hit CarAPI once."""
+        import asyncio
+
+        from app.services.carapi_service import CarAPIService
+        from app.services.catalog_cache import CatalogCache
+
+        service = CarAPIService(
+            cache=CatalogCache("", max_entries=10, ttl_seconds=60, max_stale_seconds=60)
+        )
+        calls = []
+
+        async def upstream(endpoint, params=None):
+            calls.append((endpoint, params))
+            await asyncio.sleep(0.01)
+            return {"data": [{"id": 1, "name": "Honda"}]}
+
+        async def run():
+            with patch.object(service, "_request_upstream", upstream):
+                return await asyncio.gather(
+                    *(service.get_makes(2024) for _ in range(20))
+                )
+
+        results = asyncio.run(run())
+        assert results[0] == [{"make": "Honda", "make_id": 1}]
+        assert calls == [("makes", {"year": 2024})]
+
+
+class TestCarAPITokenRefresh:
+    """Tests for serialised, exp-driven CarAPI token refresh."""
+
+    @staticmethod
+    def make_token(expires_in):
+        import time
+
+        from jose import jwt
+
+        return jwt.encode({"exp": int(time.time()) + expires_in}, "k")
+
+    def test_expired_token_is_refreshed_once(self):
+        """Concurrent callers with an expired token trigger a single login."""
+        import asyncio
+
+        from app.services.carapi_service import CarAPIService
+
+        service = CarAPIService()
+        fresh = self.make_token(7 * 24 * 3600)
+        logins = []
+
+        async def authenticate():
+            logins.append(1)
+            await asyncio.sleep(0.01)
+            service._jwt_token = fresh
+            service._jwt_expires_at = service._token_expiry(fresh)
+            return fresh
+
+        async def run():
+            with patch.object(service, "_authenticate", authenticate):
+                return await asyncio.gather(
+                    *(service._get_jwt_token() for _ in range(20))
+                )
+
+        assert asyncio.run(run()) == [fresh] * 20
+        assert len(logins) == 1
+
+    def test_token_near_expiry_is_refreshed_early(self):
+        """A token inside the refresh margin is replaced before it expires."""
+        from app.services.carapi_service import CarAPIService
+
+        service = CarAPIService()
+        service._jwt_token = self.make_token(60)
+        service._jwt_expires_at = service._token_expiry(service._jwt_token)
+        assert not service._token_is_usable()
+
+        service._jwt_token = self.make_token(7 * 24 * 3600)
+        service._jwt_expires_at = service._token_expiry(service._jwt_token)
+        assert service._token_is_usable()
+
+    def test_rejected_token_reuses_concurrent_refresh(self):
+        """A 401 does not log in again if another request already did."""
+        import asyncio
+
+        from app.services.carapi_service import CarAPIService
+
+        service = CarAPIService()
+        service._jwt_token = "already-refreshed"
+        login = Mock()
+
+        async def run():
+            with patch.object(service, "_authenticate", login):
+                return await service._replace_rejected_token("rejected")
+
+        assert asyncio.run(run()) == "already-refreshed"
+        login.assert_not_called()
+
+
+class TestCatalogSnapshot:
+    """Tests for the offline catalog snapshot and its typeahead search."""
+
+    ENTRIES = [
+        (2019, "Honda", 1, "Civic", 10, ["EX", "LX"]),
+        (2019, "Honda", 1, "Accord", 11, ["Sport"]),
+        (2020, "Honda", 1, "Civic", 12, ["EX"]),
+        (2019, "Hyundai", 2, "Elantra", 20, ["SE"]),
+    ]
+
+    def make_snapshot(self):
+        from app.services.catalog_snapshot import CatalogSnapshot, encode_snapshot
+
+        return CatalogSnapshot(encode_snapshot(self.ENTRIES))
+
+    def test_year_and_prefix_tokens(self):
+        """A year token filters rows and word prefixes must all match."""
+        results = self.make_snapshot().search("2019 hon civ")
+
+        assert [(r["year"], r["make"], r["model"]) for r in results] == [
+            (2019, "Honda", "Civic")
+        ]
+        assert results[0]["trims"] == ["EX", "LX"]
+        assert results[0]["fuzzy"] is False
+
+    def test_results_newest_first(self):
+        """Matches are ordered by year descending, then make and model."""
+        results = self.make_snapshot().search("h")
+
+        assert [(r["year"], r["model"]) for r in results] == [
+            (2020, "Civic"),
+            (2019, "Accord"),
+            (2019, "Civic"),
+            (2019, "Elantra"),
+        ]
+
+    def test_typo_falls_back_to_fuzzy_match(self):
+        """A token with one typo still finds the model."""
+        results = self.make_snapshot().search("2020 hodna civc")
+
+        assert [(r["year"], r["model"]) for r in results] == [(2020, "Civic")]
+        assert results[0]["fuzzy"] is True
+
+    def test_build_walks_catalog(self, tmp_path):
+        """Building from the CarAPI service writes a loadable snapshot."""
+        import asyncio
+
+        from app.services.catalog_snapshot import CatalogSnapshotStore
+
+        carapi = Mock()
+        carapi.get_makes = AsyncMock(return_value=[{"make": "Honda", "make_id": 1}])
+        carapi.get_models = AsyncMock(
+            return_value=[{"model": "Civic", "model_id": 10}]
+        )
+        carapi.get_trims = AsyncMock(return_value=[{"trim": "EX", "trim_id": 100}])
+
+        store = CatalogSnapshotStore(str(tmp_path / "snapshot.json"))
+        asyncio.run(store.rebuild(carapi, [2019]))
+
+        assert store.get().search("civic")[0]["model_id"] == 10
+        reloaded = CatalogSnapshotStore(store.path)
+        loaded = []
+        reloaded.on_load(loaded.append)
+        assert reloaded.get() is None
+        asyncio.run(reloaded.load())
+        assert reloaded.get().search("civic")[0]["trims"] == ["EX"]
+        assert loaded == [reloaded.get()]
+        carapi.get_years.assert_not_called()
+
+
+class TestCarAPIResilience:
+    """Tests for CarAPI retries, circuit breaker and cache fallback."""
+
+    @staticmethod
+    def make_service():
+        from app.services.carapi_service import CarAPIService
+        from app.services.catalog_cache import CatalogCache
+
+        service = CarAPIService(
+            cache=CatalogCache("", max_entries=10, ttl_seconds=60, max_stale_seconds=60)
+        )
+        service.breaker.failure_threshold = 2
+        return service
+
+    def test_transient_errors_are_retried(self):
+        """A 503 followed by a 200 succeeds after one retry."""
+        import asyncio
+
+        import httpx
+
+        service = self.make_service()
+        responses = [
+            httpx.Response(503, text="busy"),
+            httpx.Response(200, json={"data": [2024]}),
+        ]
+        get = AsyncMock(side_effect=responses)
+
+        with patch.object(service, "_get", get), patch(
+            "app.services.carapi_service.random.uniform", return_value=0
+        ):
+            assert asyncio.run(service._request_upstream("years")) == {
+                "data": [2024]
+            }
+        assert get.await_count == 2
+        assert service.retries == 1
+        assert service.breaker.state == "closed"
+
+    def test_rate_limits_honour_retry_after(self):
+        """A 429 waits for retry-after, and is raised at once past the cap."""
+        import asyncio
+
+        import httpx
+
+        from app.core.config import settings
+        from app.services.carapi_service import CarAPIError
+
+        service = self.make_service()
+        get = AsyncMock(
+            side_effect=[
+                httpx.Response(429, headers={"retry-after": "3"}),
+                httpx.Response(200, json={"data": [2024]}),
+                httpx.Response(429, headers={"retry-after": "600"}),
+            ]
+        )
+        sleep = AsyncMock()
+
+        with patch.object(service, "_get", get), patch(
+            "app.services.carapi_service.asyncio.sleep", sleep
+        ):
+            assert asyncio.run(service._request_upstream("years")) == {"data": [2024]}
+            assert sleep.await_args.args[0] >= 3
+            with pytest.raises(CarAPIError) as raised:
+                asyncio.run(service._request_upstream("years"))
+
+        assert raised.value.retry_after > settings.CARAPI_MAX_RETRY_WAIT_SECONDS
+        assert get.await_count == 3
+        assert sleep.await_count == 1
+
+    def test_client_errors_are_not_retried(self):
+        """A 404 is raised at once and does not count against the breaker."""
+        import asyncio
+
+        import httpx
+
+        from app.services.carapi_service import CarAPIError
+
+        service = self.make_service()
+        get = AsyncMock(return_value=httpx.Response(404, text="missing"))
+
+        with patch.object(service, "_get", get):
+            with pytest.raises(CarAPIError):
+                asyncio.run(service._request_upstream("models/v2"))
+        assert get.await_count == 1
+        assert service.breaker.stats()["consecutive_failures"] == 0
+
+    def test_open_breaker_fails_fast_and_serves_cache(self):
+        """Once open, calls skip CarAPI and stale catalog entries are served."""
+        import asyncio
+        import time
+
+        import httpx
+
+        from app.utils.circuit_breaker import CircuitOpenError
+
+        service = self.make_service()
+        service.cache.set("makes?year=2019", [{"make": "Honda", "make_id": 1}])
+        service.cache.set(
+            "makes?year=2020", [{"make": "Honda", "make_id": 1}], time.time() - 3600
+        )
+        get = AsyncMock(side_effect=httpx.ConnectTimeout("timed out"))
+
+        async def run():
+            for _ in range(2):
+                with pytest.raises(Exception):
+                    await service._request_upstream("years")
+            with pytest.raises(CircuitOpenError):
+                await service.get_years()
+            return await service.get_makes(2019), await service.get_makes(2020)
+
+        with patch.object(service, "_get", get), patch(
+            "app.services.carapi_service.random.uniform", return_value=0
+        ):
+            fresh, expired = asyncio.run(run())
+
+        assert fresh == expired == [{"make": "Honda", "make_id": 1}]
+        # Two requests, each with CARAPI_MAX_RETRIES retries; none after opening
+        assert get.await_count == 6
+        assert service.breaker.state == "open"
+        assert service.breaker.stats()["rejected"] >= 1
+
+
+class TestCircuitBreaker:
+    """Tests for the half-open trial of the circuit breaker."""
+
+    def test_half_open_allows_one_trial(self):
+        """After the recovery period one call is let through to close it."""
+        from app.utils.circuit_breaker import CircuitBreaker, CircuitOpenError
+
+        breaker = CircuitBreaker("test", failure_threshold=1, recovery_seconds=0)
+        breaker.record_failure()
+        breaker.recovery_seconds = 60
+        breaker._opened_at -= 60
+
+        breaker.before_call()
+        with pytest.raises(CircuitOpenError):
+            breaker.before_call()
+        breaker.record_success()
+        assert breaker.state == "closed"
+        assert breaker.stats()["opened"] == 1
+
+
+class TestVinDecode:
+    """Tests for decoding VINs through CarAPI with a permanent cache."""
+
+    def test_decode_maps_ids_and_is_cached(self):
+        """Ids come from the matching trim and repeat lookups skip CarAPI."""
+        import asyncio
+        import time
+
+        from app.services.carapi_service import CarAPIService
+        from app.services.catalog_cache import CatalogCache
+
+        vin_cache = CatalogCache(
+            "", max_entries=10, ttl_seconds=float("inf"), max_stale_seconds=float("inf")
+        )
+        service = CarAPIService(vin_cache=vin_cache)
+        upstream = AsyncMock(
+            return_value={
+                "year": 2019,
+                "make": "Honda",
+                "model": "Accord",
+                "trim": "Sport",
+                "trims": [
+                    {"id": 1, "name": "LX", "make_model_id": 581},
+                    {
+                        "id": 26541,
+                        "name": "Sport",
+                        "make_model_id": 581,
+                        "make_model": {"id": 581, "make_id": 6},
+                    },
+                ],
+            }
+        )
+
+        async def run():
+            with patch.object(service, "_make_request", upstream):
+                first = await service.decode_vin("1HGCV1F34KA000001")
+                # Even a years-old decode is served from cache
+                key = "vin/1HGCV1F34KA000001"
+                vin_cache.set(key, first, time.time() - 10 * 365 * 24 * 3600)
+                return first, await service.decode_vin("1HGCV1F34KA000001")
+
+        first, second = asyncio.run(run())
+        assert first == second
+        assert (first["brand_id"], first["model_id"], first["trim_id"]) == (
+            6,
+            581,
+            26541,
+        )
+        upstream.assert_awaited_once_with("vin/1HGCV1F34KA000001")
+
+
+class TestHTTPClientRegistry:
+    """Tests for the shared outbound HTTP client pools."""
+
+    def test_clients_are_shared_and_rebuilt_after_close(self):
+        """One client per upstream is reused until closed, then rebuilt."""
+        import asyncio
+
+        from app.core.http_clients import HTTPClientRegistry, UpstreamConfig
+
+        registry = HTTPClientRegistry()
+        registry.register(
+            "carapi",
+            UpstreamConfig(
+                max_connections=4,
+                max_keepalive_connections=2,
+                timeout=5.0,
+                connect_timeout=1.0,
+                http2=True,
+            ),
+        )
+
+        async def run():
+            registry.start()
+            first = registry.get("carapi")
+            assert registry.get("carapi") is first
+            await registry.close_all()
+            assert first.is_closed
+            second = registry.get("carapi")
+            await registry.close_all()
+            return first, second
+
+        first, second = asyncio.run(run())
+        assert second is not first
+        assert registry.stats() == {
+            "carapi_connections": 0,
+            "carapi_idle_connections": 0,
+            "carapi_requests": 0,
+        }
+
+
+class TestCatalogPrefetch:
+    """Tests for count-min popularity tracking and catalog prefetching."""
+
+    def test_sketch_never_undercounts_and_decays(self):
+        """Estimates are at least the true count and halve on decay."""
+        from app.services.catalog_prefetch import CountMinSketch
+
+        sketch = CountMinSketch(width=64, depth=4, decay_interval=0)
+        for i in range(200):
+            sketch.add(f"make:{i % 20}")
+        sketch.add("make:honda", 50)
+
+        assert all(sketch.estimate(f"make:{i}") >= 10 for i in range(20))
+        assert sketch.estimate("make:honda") >= 50
+        sketch.decay()
+        assert 25 <= sketch.estimate("make:honda") < 50
+
+    def test_popular_children_are_warmed_for_new_years(self):
+        """Makes picked in one year get their models prefetched in another."""
+        import asyncio
+
+        from app.services.carapi_service import CarAPIService
+        from app.services.catalog_cache import CatalogCache
+
+        service = CarAPIService(
+            cache=CatalogCache("", max_entries=50, ttl_seconds=60, max_stale_seconds=60)
+        )
+        service.prefetcher.top_n = 1
+        service.prefetcher.enabled = True
+        calls = []
+
+        async def upstream(endpoint, params=None):
+            calls.append((endpoint, params))
+            if endpoint == "makes":
+                return {"data": [{"id": 1, "name": "Honda"}, {"id": 2, "name": "Kia"}]}
+            return {"data": [{"id": 10, "name": "Civic"}]}
+
+        async def run():
+            with patch.object(service, "_make_request", upstream):
+                for _ in range(3):
+                    await service.get_models(2019, "Honda")
+                await service.get_models(2019, "Kia")
+
+                await service.get_makes(2020)
+                await asyncio.gather(*service.prefetcher._tasks)
+                calls.clear()
+                await service.get_models(2020, "Honda")
+                await service.get_models(2020, "Kia")
+
+        asyncio.run(run())
+        # Honda's 2020 models were prefetched; only Kia had to go upstream
+        assert calls == [("models/v2", {"year": 2020, "make": "Kia"})]
+        assert service.prefetcher.stats()["completed"] == 1
+
+
+class TestVehicleNormalizer:
+    """Tests for mapping free-text brand/model to CarAPI ids."""
+
+    @staticmethod
+    def make_normalizer():
+        from app.services.catalog_snapshot import CatalogSnapshot, encode_snapshot
+        from app.services.vehicle_normalizer import VehicleNormalizer
+
+        snapshot = CatalogSnapshot(
+            encode_snapshot(
+                [
+                    (2019, "Chevrolet", 3, "Silverado 1500", 30, []),
+                    (2019, "Chevrolet", 3, "Malibu", 31, []),
+                    (2019, "GMC", 4, "Sierra 1500", 40, []),
+                    (2019, "Honda", 6, "Civic", 60, []),
+                    (2019, "Mazda", 7, "Mazda6", 70, []),
+                    (2019, "Toyota", 8, "Corolla", 80, []),
+                    (2019, "Land Rover", 9, "Range Rover Sport", 90, []),
+                ]
+            )
+        )
+        normalizer = VehicleNormalizer(store=Mock())
+        normalizer.use_snapshot(snapshot)
+        return normalizer
+
+    def test_aliases_case_and_typos_map_to_ids(self):
+        """Aliases, odd casing/spacing and make typos resolve to one model."""
+        normalizer = self.make_normalizer()
+
+        for brand, model in [
+            ("chevy", "silverado1500"),
+            ("Chevrolet ", "Silverado-1500"),
+            ("CHEVROLET", "silverado 1500"),
+            ("Chevrolett", "Silverado 1500"),
+        ]:
+            result = normalizer.normalize({"brand": brand, "model": model})
+            assert result == {
+                "brand": "Chevrolet",
+                "brand_id": 3,
+                "model": "Silverado 1500",
+                "model_id": 30,
+            }, (brand, model)
+
+        assert normalizer.normalize({"brand": "Zundapp", "model": "X"}) == {
+            "brand": "Zundapp",
+            "model": "X",
+        }
+
+    def test_similar_models_are_left_as_given(self):
+        """Near-miss models are not rewritten into a different catalog model."""
+        normalizer = self.make_normalizer()
+
+        for brand, model, make_id in [
+            ("GMC", "Sierra 2500", 4),
+            ("Chevrolet", "Silverado 2500HD", 3),
+            ("Chevrolet", "silverado", 3),
+            ("Mazda", "Mazda2", 7),
+            ("Toyota", "Corolla Cross", 8),
+        ]:
+            result = normalizer.normalize({"brand": brand, "model": model})
+            assert result == {"brand": brand, "brand_id": make_id, "model": model}
+
+    def test_partial_update_uses_stored_brand(self):
+        """A model-only update is matched under the vehicle's current brand."""
+        normalizer = self.make_normalizer()
+
+        result = normalizer.normalize(
+            {"model": "malibu"}, current={"brand": "Chevrolet", "model": "Silverado"}
+        )
+        assert result == {"model": "Malibu", "model_id": 31}
+
+    def test_backfill_writes_changed_vehicles_in_batches(self):
+        """Backfill pages by id and writes one batch per page."""
+        import asyncio
+
+        normalizer = self.make_normalizer()
+        pages = [
+            [
+                {"id": "a", "brand": "honda", "model": "civic"},
+                {"id": "b", "brand": "Unknown", "model": "Thing"},
+            ],
+            [{"id": "c", "brand": "landrover", "model": "range rover sport"}],
+            [],
+        ]
+        db = Mock()
+        db.get_vehicles_missing_catalog_ids = AsyncMock(side_effect=pages)
+        db.set_vehicle_catalog_fields = AsyncMock()
+
+        result = asyncio.run(normalizer.backfill(db, batch_size=2))
+
+        assert result == {"scanned": 3, "updated": 2}
+        assert db.get_vehicles_missing_catalog_ids.await_args_list[1][0] == ("b", 2)
+        first_batch = db.set_vehicle_catalog_fields.await_args_list[0][0][0]
+        assert first_batch == [
+            {
+                "id": "a",
+                "props": {
+                    "brand": "Honda",
+                    "brand_id": 6,
+                    "model": "Civic",
+                    "model_id": 60,
+                },
+            }
+        ]
+
+
+class TestClaudeConcurrency:
+    """Tests for the Claude concurrency limiter and rate-limit backoff."""
+
+    def test_waiters_beyond_the_queue_are_rejected(self):
+        """Callers past the wait queue fail fast; cancelled waiters leave it."""
+        import asyncio
+
+        from app.utils.concurrency_limiter import ConcurrencyLimiter, QueueFullError
+
+        limiter = ConcurrencyLimiter(1, max_waiting=2)
+        done = []
+
+        async def work(name):
+            async with limiter.slot():
+                done.append(name)
+                await asyncio.sleep(0)
+
+        async def run():
+            async with limiter.slot():
+                first = asyncio.create_task(work("first"))
+                cancelled = asyncio.create_task(work("cancelled"))
+                await asyncio.sleep(0)
+                with pytest.raises(QueueFullError):
+                    await work("rejected")
+                cancelled.cancel()
+                await asyncio.gather(cancelled, return_exceptions=True)
+                second = asyncio.create_task(work("second"))
+                await asyncio.sleep(0)
+            await asyncio.gather(first, second)
+
+        asyncio.run(run())
+        assert done == ["first", "second"]
+        assert limiter.stats()["active"] == limiter.stats()["waiting"] == 0
+        assert limiter.stats()["rejected"] == 1
+
+    def test_rate_limits_honour_retry_after(self):
+        """A 429 waits for retry-after (capped) before trying again."""
+        import asyncio
+
+        import httpx
+
+        from app.core.config import settings
+        from app.models.vehicle import Vehicle
+        from app.services.claude_service import ClaudeService
+
+        service = ClaudeService()
+        service.api_key = "test"
+        vehicle = Vehicle(
+            id="v1", owner_id="u1", brand="Honda", model="Civic", year=2019
+        )
+        request = httpx.Request("POST", settings.CLAUDE_API_URL)
+        client = Mock()
+        client.post = AsyncMock(
+            side_effect=[
+                httpx.Response(429, headers={"retry-after": "600"}, request=request),
+                httpx.Response(
+                    200, json={"content": [{"text": "Rotate tyres"}]}, request=request
+                ),
+            ]
+        )
+        sleep = AsyncMock()
+
+        with patch(
+            "app.services.claude_service.http_clients.get", return_value=client
+        ), patch("app.services.claude_service.asyncio.sleep", sleep):
+            text, _, _ = asyncio.run(
+                service.get_maintenance_recommendations(vehicle, [])
+            )
+
+        assert text == "Rotate tyres"
+        assert client.post.await_count == 2
+        waited = sleep.await_args.args[0]
+        assert 0 < waited <= settings.CLAUDE_MAX_RETRY_WAIT_SECONDS
+        assert service.stats()["rate_limited"] == 1
+        assert service.stats()["active"] == 0
+
+    def test_persistent_rate_limit_raises_with_retry_after(self):
+        """When every retry is rate limited the wait is surfaced to callers."""
+        import asyncio
+
+        import httpx
+
+        from app.core.config import settings
+        from app.models.vehicle import Vehicle
+        from app.services.claude_service import ClaudeRateLimitError, ClaudeService
+
+        service = ClaudeService()
+        service.api_key = "test"
+        vehicle = Vehicle(
+            id="v1", owner_id="u1", brand="Honda", model="Civic", year=2019
+        )
+        request = httpx.Request("POST", settings.CLAUDE_API_URL)
+        client = Mock()
+        client.post = AsyncMock(
+            return_value=httpx.Response(
+                429, headers={"retry-after": "7"}, request=request
+            )
+        )
+
+        with patch(
+            "app.services.claude_service.http_clients.get", return_value=client
+        ), patch("app.services.claude_service.asyncio.sleep", AsyncMock()):
+            with pytest.raises(ClaudeRateLimitError) as raised:
+                asyncio.run(service.get_maintenance_recommendations(vehicle, []))
+
+        assert raised.value.retry_after == 7
+        assert client.post.await_count == settings.CLAUDE_MAX_RETRIES + 1
+        assert service.stats()["active"] == 0
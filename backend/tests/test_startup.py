@@ -0,0 +1,56 @@
+"""
+Import-time budget for the application.
+
+Runs `python -X importtime -c "import app.main"` in a fresh interpreter so that
+regressions in cold start (and test collection) time are caught.
+"""
+import os
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Cumulative time for `import app.main`. About 1.2 s on a developer laptop,
+# most of it FastAPI/pydantic and the Neo4j driver.
+IMPORT_TIME_BUDGET_SECONDS = 2.5
+
+# Optional subsystems that must only be loaded on first use or on startup
+LAZY_MODULES = ["twilio", "apscheduler", "httpx", "passlib"]
+
+PROBE = (
+    "import sys, app.main; "
+    "print(','.join(m for m in %r if m in sys.modules))" % (LAZY_MODULES,)
+)
+
+
+def run_import_probe():
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", PROBE],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+        timeout=60,
+    )
+    assert result.returncode == 0, result.stderr
+    return result
+
+
+def test_heavy_dependencies_are_not_imported_eagerly():
+    """Test that importing the app does not load optional subsystems."""
+    result = run_import_probe()
+    assert result.stdout.strip() == ""
+
+
+def test_import_time_budget():
+    """Test that importing app.main stays within the startup budget."""
+    result = run_import_probe()
+
+    cumulative_us = None
+    for line in result.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        parts = line.split("|")
+        if len(parts) == 3 and parts[2].strip() == "app.main":
+            cumulative_us = int(parts[1])
+    assert cumulative_us is not None
+
+    assert cumulative_us / 1e6 < IMPORT_TIME_BUDGET_SECONDS
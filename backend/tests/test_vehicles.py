@@ -0,0 +1,255 @@
+"""
+Tests for vehicle and maintenance endpoints with the database mocked out.
+"""
+from contextlib import contextmanager
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.models.dashboard import Dashboard, DashboardVehicle
+from app.models.user import TokenUser
+from app.models.vehicle import Vehicle
+from app.utils.deps import get_current_principal
+
+
+@pytest.fixture
+def authed_client(client: TestClient):
+    """Test client authenticated as a fixed user."""
+    app.dependency_overrides[get_current_principal] = lambda: TokenUser(
+        id="user-1", email="owner@example.com"
+    )
+    yield client
+    app.dependency_overrides.pop(get_current_principal, None)
+
+
+def _vehicle():
+    return Vehicle(id="v1", owner_id="user-1", brand="Honda", model="Civic", year=2019)
+
+
+def test_vehicle_list_conditional_get(authed_client: TestClient):
+    """A matching If-None-Match returns 304 without loading the vehicles."""
+    with patch("app.api.v1.endpoints.vehicles.neo4j_service") as mock_db:
+        mock_db.get_user_data_version = AsyncMock(return_value=7)
+        mock_db.get_user_vehicles = AsyncMock(return_value=[_vehicle()])
+
+        first = authed_client.get("/api/v1/vehicles/")
+        assert first.status_code == 200
+        etag = first.headers["etag"]
+        assert etag.startswith('W/"')
+
+        second = authed_client.get("/api/v1/vehicles/", headers={"If-None-Match": etag})
+        assert second.status_code == 304
+        assert mock_db.get_user_vehicles.await_count == 1
+
+        mock_db.get_user_data_version = AsyncMock(return_value=8)
+        third = authed_client.get("/api/v1/vehicles/", headers={"If-None-Match": etag})
+        assert third.status_code == 200
+        assert third.headers["etag"] != etag
+
+
+def test_maintenance_records_unknown_vehicle(authed_client: TestClient):
+    """The version lookup doubles as the ownership check."""
+    with patch("app.api.v1.endpoints.maintenance.neo4j_service") as mock_db:
+        mock_db.get_vehicle_data_version = AsyncMock(return_value=None)
+        response = authed_client.get("/api/v1/maintenance/records/other-vehicle")
+    assert response.status_code == 404
+
+
+def test_dashboard_single_round_trip(authed_client: TestClient):
+    """The dashboard is served from one aggregate query."""
+    dashboard = Dashboard(
+        vehicles=[
+            DashboardVehicle(
+                vehicle=_vehicle(),
+                recent_maintenance=[],
+                maintenance_count=4,
+                total_spend=310.5,
+                recommendation_fresh=True,
+            )
+        ],
+        vehicle_count=1,
+        maintenance_count=4,
+        total_spend=310.5,
+    )
+    with patch("app.api.v1.endpoints.dashboard.neo4j_service") as mock_db:
+        mock_db.get_user_data_version = AsyncMock(return_value=3)
+        mock_db.get_dashboard = AsyncMock(return_value=dashboard)
+
+        response = authed_client.get("/api/v1/dashboard?recent_records=5")
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["total_spend"] == 310.5
+    assert body["vehicles"][0]["vehicle"]["id"] == "v1"
+    assert body["vehicles"][0]["recommendation_fresh"] is True
+    mock_db.get_dashboard.assert_awaited_once_with("user-1", 5)
+
+
+class _FakeTransactions:
+    """Records commits and rollbacks of Neo4jService.transaction()."""
+
+    def __init__(self):
+        self.commits = 0
+        self.rollbacks = 0
+
+    @contextmanager
+    def transaction(self):
+        try:
+            yield
+        except BaseException:
+            self.rollbacks += 1
+            raise
+        self.commits += 1
+
+
+def _batch_ops():
+    return [
+        {
+            "method": "POST",
+            "path": "/vehicles",
+            "body": {"brand": "Honda", "model": "Civic", "year": 2019},
+            "ref": "new-car",
+        },
+        {"method": "DELETE", "path": "/api/v1/vehicles/missing", "ref": "gone"},
+        {"method": "GET", "path": "/vehicles/v1", "ref": "read"},
+    ]
+
+
+def test_batch_atomic_rolls_back_on_failure(authed_client: TestClient):
+    """An atomic batch stops at the first failure and rolls everything back."""
+    fake = _FakeTransactions()
+    with patch("app.api.v1.endpoints.batch.neo4j_service", fake), patch(
+        "app.api.v1.endpoints.vehicles.neo4j_service"
+    ) as mock_db:
+        mock_db.create_vehicle = AsyncMock(return_value=_vehicle())
+        mock_db.delete_vehicle = AsyncMock(return_value=False)
+
+        response = authed_client.post(
+            "/api/v1/batch", json={"operations": _batch_ops(), "atomic": True}
+        )
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["committed"] is False
+    assert [r["status"] for r in body["results"]] == [200, 404, 424]
+    assert [r["ref"] for r in body["results"]] == ["new-car", "gone", "read"]
+    assert (fake.commits, fake.rollbacks) == (0, 1)
+
+
+def test_batch_per_item_commits_independently(authed_client: TestClient):
+    """Without atomic, each operation commits or fails on its own."""
+    fake = _FakeTransactions()
+    with patch("app.api.v1.endpoints.batch.neo4j_service", fake), patch(
+        "app.api.v1.endpoints.vehicles.neo4j_service"
+    ) as mock_db:
+        mock_db.create_vehicle = AsyncMock(return_value=_vehicle())
+        mock_db.delete_vehicle = AsyncMock(return_value=False)
+        mock_db.get_vehicle_by_id = AsyncMock(return_value=_vehicle())
+
+        response = authed_client.post(
+            "/api/v1/batch", json={"operations": _batch_ops(), "atomic": False}
+        )
+
+    body = response.json()
+    assert [r["status"] for r in body["results"]] == [200, 404, 200]
+    assert body["results"][2]["body"]["id"] == "v1"
+    assert (fake.commits, fake.rollbacks) == (2, 1)
+    mock_db.create_vehicle.assert_awaited_once()
+
+
+def test_vehicle_list_sparse_fields(authed_client: TestClient):
+    """fields= projects only the requested properties and validates names."""
+    with patch("app.api.v1.endpoints.vehicles.neo4j_service") as mock_db:
+        mock_db.get_user_data_version = AsyncMock(return_value=2)
+        mock_db.get_user_vehicles = AsyncMock(return_value=[_vehicle()])
+        mock_db.get_user_vehicle_fields = AsyncMock(
+            return_value=[{"id": "v1", "brand": "Honda", "model": "Civic"}]
+        )
+
+        response = authed_client.get("/api/v1/vehicles/?fields=model,brand")
+        assert response.status_code == 200
+        assert response.json() == [{"id": "v1", "brand": "Honda", "model": "Civic"}]
+        mock_db.get_user_vehicle_fields.assert_awaited_once_with(
+            "user-1", ["id", "brand", "model"]
+        )
+        mock_db.get_user_vehicles.assert_not_called()
+
+        full = authed_client.get("/api/v1/vehicles/")
+        assert full.headers["etag"] != response.headers["etag"]
+
+        bad = authed_client.get("/api/v1/vehicles/?fields=brand,password")
+        assert bad.status_code == 400
+
+
+def test_vin_batch_decode(authed_client: TestClient):
+    """Bulk decode normalises VINs and reports failures per VIN."""
+    from app.services.carapi_service import CarAPIError
+
+    decoded = {
+        "vin": "1HGCV1F34KA000001",
+        "year": 2019,
+        "brand": "Honda",
+        "brand_id": 6,
+        "model": "Accord",
+        "model_id": 581,
+        "trim": "Sport",
+        "trim_id": 26541,
+    }
+
+    errors = {
+        "2T1BURHE0JC000002": CarAPIError("CarAPI request failed: 404", status_code=404),
+        "3VWDX7AJ5DM000003": CarAPIError(
+            "CarAPI request failed: 429", status_code=429, retry_after=12
+        ),
+        "5YJ3E1EA7KF000004": CarAPIError("CarAPI request failed: 403", status_code=403),
+    }
+
+    async def decode(vin):
+        if vin == decoded["vin"]:
+            return decoded
+        raise errors[vin]
+
+    with patch("app.api.v1.endpoints.vehicles.carapi_service") as mock_carapi:
+        mock_carapi.decode_vin = AsyncMock(side_effect=decode)
+        response = authed_client.post(
+            "/api/v1/vehicles/vin/decode",
+            json={"vins": ["1hgcv1f34ka000001", *errors, "BADVIN"]},
+        )
+
+    assert response.status_code == 200
+    results = response.json()
+    assert results[0]["status"] == 200
+    assert results[0]["vehicle"]["model_id"] == 581
+    # Only CarAPI rejecting the VIN reads as "could not be decoded"
+    assert [r["status"] for r in results] == [200, 404, 503, 500, 422]
+    assert mock_carapi.decode_vin.await_count == 4
+
+    with patch("app.api.v1.endpoints.vehicles.carapi_service") as mock_carapi:
+        mock_carapi.decode_vin = AsyncMock(side_effect=decode)
+        response = authed_client.get("/api/v1/vehicles/vin/3VWDX7AJ5DM000003")
+
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "12"
+
+
+def test_recommendations_rate_limited(authed_client: TestClient):
+    """Claude staying rate limited is a 503 with Retry-After, not a 500."""
+    from app.services.claude_service import ClaudeRateLimitError
+
+    with patch("app.api.v1.endpoints.vehicles.neo4j_service") as mock_db, patch(
+        "app.api.v1.endpoints.vehicles.claude_service"
+    ) as mock_claude:
+        mock_db.get_vehicle_data_version = AsyncMock(return_value=3)
+        mock_db.get_vehicle_by_id = AsyncMock(return_value=_vehicle())
+        mock_db.get_cached_recommendation = AsyncMock(return_value=None)
+        mock_db.get_maintenance_records = AsyncMock(return_value=[])
+        mock_claude.get_maintenance_recommendations = AsyncMock(
+            side_effect=ClaudeRateLimitError(429, 7.2)
+        )
+        response = authed_client.get("/api/v1/vehicles/v1/recommendations")
+
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "8"
+    mock_db.save_recommendation.assert_not_called()
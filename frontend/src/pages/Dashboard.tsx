@@ -1,22 +1,23 @@
 import React, { useState, useEffect } from 'react';
 import { Link } from 'react-router-dom';
 import { useAuth } from '../components/auth/AuthContext';
-import { vehicleService } from '../services/api';
-import { Vehicle } from '../types';
+import { dashboardService } from '../services/api';
+import { DashboardData } from '../types';
 
 const Dashboard: React.FC = () => {
   const { user } = useAuth();
-  const [vehicles, setVehicles] = useState<Vehicle[]>([]);
+  const [dashboard, setDashboard] = useState<DashboardData | null>(null);
   const [vehiclesLoading, setVehiclesLoading] = useState(true);
   const [vehiclesError, setVehiclesError] = useState<string | null>(null);
 
   useEffect(() => {
-    const fetchVehicles = async () => {
+    const fetchDashboard = async () => {
       try {
         setVehiclesLoading(true);
         setVehiclesError(null);
-        const vehicleData = await vehicleService.getAll();
-        setVehicles(vehicleData);
+        // One request returns vehicles, recent records and recommendation status
+        const dashboardData = await dashboardService.get();
+        setDashboard(dashboardData);
       } catch (error) {
         setVehiclesError('Failed to load vehicles');
         // Error is already displayed to user via setVehiclesError
@@ -25,9 +26,19 @@ const Dashboard: React.FC = () => {
       }
     };
 
-    fetchVehicles();
+    fetchDashboard();
   }, []);
 
+  const vehicles = dashboard ? dashboard.vehicles.map((entry) => entry.vehicle) : [];
+  const latestRecord = dashboard
+    ? dashboard.vehicles
+        .flatMap((entry) => entry.recent_maintenance)
+        .sort((a, b) => b.service_date.localeCompare(a.service_date))[0]
+    : undefined;
+  const staleRecommendations = dashboard
+    ? dashboard.vehicles.filter((entry) => entry.maintenance_count > 0 && !entry.recommendation_fresh).length
+    : 0;
+
   return (
     <div className="container">
       <h1>Dashboard</h1>
@@ -125,6 +136,14 @@ const Dashboard: React.FC = () => {
           <div style={{ flex: 1 }}>
             <h2>Maintenance Records</h2>
             <p>Manage service history</p>
+            {dashboard && dashboard.maintenance_count > 0 && (
+              <div style={{ fontSize: '14px', color: '#666' }}>
+                <div>{dashboard.maintenance_count} record{dashboard.maintenance_count > 1 ? 's' : ''}, ${dashboard.total_spend.toFixed(2)} total</div>
+                {latestRecord && (
+                  <div>Last service: {latestRecord.service_type} on {latestRecord.service_date}</div>
+                )}
+              </div>
+            )}
           </div>
           <div>
             <Link to="/vehicles">
@@ -137,6 +156,11 @@ const Dashboard: React.FC = () => {
           <div style={{ flex: 1 }}>
             <h2>Service Recommendations</h2>
             <p>Courtesy of CarLog AI</p>
+            {staleRecommendations > 0 && (
+              <div style={{ fontSize: '14px', color: '#666' }}>
+                {staleRecommendations} vehicle{staleRecommendations > 1 ? 's have' : ' has'} new service history since the last recommendations
+              </div>
+            )}
           </div>
           <div>
             <Link to="/vehicles">
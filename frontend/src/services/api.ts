@@ -1,5 +1,5 @@
 import axios, { AxiosError } from 'axios';
-import { AuthTokens, User, UserWithVehicleCount, Vehicle, MaintenanceRecord, MaintenanceSchedule } from '../types';
+import { AuthTokens, CatalogSearchResult, DashboardData, User, UserWithVehicleCount, Vehicle, MaintenanceRecord, MaintenanceSchedule, VinDecode, VinDecodeResult } from '../types';
 
 // Utility function to extract error messages from API responses
 export const extractErrorMessage = (error: unknown): string => {
@@ -168,6 +168,21 @@ export const carApiService = {
     const response = await api.get(`/vehicles/carapi/trims?year=${year}&make=${encodeURIComponent(make)}&model=${encodeURIComponent(model)}`);
     return response.data;
   },
+
+  searchCatalog: async (query: string, limit: number = 10): Promise<{ data: CatalogSearchResult[] }> => {
+    const response = await api.get(`/vehicles/catalog/search?q=${encodeURIComponent(query)}&limit=${limit}`);
+    return response.data;
+  },
+
+  decodeVin: async (vin: string): Promise<VinDecode> => {
+    const response = await api.get(`/vehicles/vin/${encodeURIComponent(vin)}`);
+    return response.data;
+  },
+
+  decodeVins: async (vins: string[]): Promise<VinDecodeResult[]> => {
+    const response = await api.post('/vehicles/vin/decode', { vins });
+    return response.data;
+  },
 };
 
 export const adminService = {
@@ -200,6 +215,13 @@ export const adminService = {
   },
 };
 
+export const dashboardService = {
+  get: async (recentRecords = 3): Promise<DashboardData> => {
+    const response = await api.get('/dashboard', { params: { recent_records: recentRecords } });
+    return response.data;
+  },
+};
+
 export const maintenanceService = {
   getRecords: async (vehicleId: string): Promise<MaintenanceRecord[]> => {
     const response = await api.get(`/maintenance/records/${vehicleId}`);
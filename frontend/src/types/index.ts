@@ -59,6 +59,51 @@ export interface MaintenanceSchedule {
   next_service_date?: string;
 }
 
+export interface DashboardVehicle {
+  vehicle: Vehicle;
+  recent_maintenance: MaintenanceRecord[];
+  maintenance_count: number;
+  total_spend: number;
+  last_service_date?: string;
+  recommendation_generated_at?: string;
+  recommendation_fresh: boolean;
+}
+
+export interface DashboardData {
+  vehicles: DashboardVehicle[];
+  vehicle_count: number;
+  maintenance_count: number;
+  total_spend: number;
+}
+
+export interface VinDecode {
+  vin: string;
+  year: number;
+  brand: string;
+  brand_id?: number;
+  model: string;
+  model_id?: number;
+  trim?: string;
+  trim_id?: number;
+}
+
+export interface VinDecodeResult {
+  vin: string;
+  status: number;
+  vehicle?: VinDecode;
+  detail?: string;
+}
+
+export interface CatalogSearchResult {
+  year: number;
+  make: string;
+  make_id: number;
+  model: string;
+  model_id: number;
+  trims: string[];
+  fuzzy: boolean;
+}
+
 export interface AuthTokens {
   access_token: string;
   token_type: string;